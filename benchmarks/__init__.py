@@ -0,0 +1,3 @@
+"""Benchmarks for the AVL tree. Run them from the repository root, e.g.
+``python -m benchmarks.scaling``.
+"""
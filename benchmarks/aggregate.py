@@ -0,0 +1,44 @@
+"""This module compares the range sums of an AggregateAVLTree with summing the
+values of the range by iterating over them, for increasing range widths.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from src.tree.aggregate_avl_tree import AggregateAVLTree
+
+
+def main() -> None:
+    """Parse the command line arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=1_000_000, help="the number of keys in the tree")
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tree = AggregateAVLTree.from_sorted(range(args.n))
+
+    print(f"{'width':>10} {'sum(irange) (us)':>17} {'query_range (us)':>17}")
+
+    for width in (10, 1_000, 100_000):
+        lows = [rng.randrange(args.n - width) for _ in range(args.queries)]
+
+        start = time.perf_counter()
+        expected = [sum(tree.irange(low, low + width)) for low in lows]
+        iterating = (time.perf_counter() - start) / args.queries
+
+        start = time.perf_counter()
+        actual = [tree.query_range(low, low + width) for low in lows]
+        querying = (time.perf_counter() - start) / args.queries
+
+        assert actual == expected
+
+        print(f"{width:>10,} {iterating * 1e6:>17.1f} {querying * 1e6:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""This module compares the batched contains_many and add_many methods with
+calling contains and add once per value.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from src.tree.avl_tree import AVLTree
+
+
+def elapsed(function, *args) -> float:
+    """Time a single call of a function.
+
+    Args:
+        function (Callable): The function to be called.
+        *args: The arguments of the function.
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+
+    start = time.perf_counter()
+    function(*args)
+
+    return time.perf_counter() - start
+
+
+def contains_loop(tree: AVLTree, values: list) -> list:
+    """Look up every value with contains.
+
+    Args:
+        tree (AVLTree): The tree.
+        values (list): The values queried.
+
+    Returns:
+        list: Whether each value exists within the tree.
+    """
+
+    return [tree.contains(value) for value in values]
+
+
+def add_loop(tree: AVLTree, values: list) -> None:
+    """Add every value with add.
+
+    Args:
+        tree (AVLTree): The tree.
+        values (list): The values to be added.
+    """
+
+    for value in values:
+        tree.add(value)
+
+
+def main() -> None:
+    """Parse the command line arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=1_000_000, help="the number of keys in the tree")
+    parser.add_argument("--batch", type=int, default=5_000, help="the number of keys per batch")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tree = AVLTree.from_sorted(range(0, 2 * args.n, 2))
+
+    start = rng.randrange(2 * args.n - 4 * args.batch)
+    batches = (
+        ("random", [rng.randrange(2 * args.n) for _ in range(args.batch)]),
+        ("clustered", [start + rng.randrange(4 * args.batch) for _ in range(args.batch)]),
+    )
+
+    print(f"{'batch':>10} {'contains (ms)':>14} {'contains_many (ms)':>19}")
+
+    for name, values in batches:
+        loop = elapsed(contains_loop, tree, values)
+        batched = elapsed(tree.contains_many, values)
+
+        print(f"{name:>10} {loop * 1e3:>14.2f} {batched * 1e3:>19.2f}")
+
+    # Only odd values are new, so about half of each batch is duplicates
+    values = [rng.randrange(2 * args.n) for _ in range(args.batch)]
+    copy = AVLTree.from_sorted(range(0, 2 * args.n, 2))
+
+    print(f"{'batch':>10} {'add (ms)':>14} {'add_many (ms)':>19}")
+    print(
+        f"{'random':>10} {elapsed(add_loop, tree, values) * 1e3:>14.2f}"
+        f" {elapsed(copy.add_many, values) * 1e3:>19.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
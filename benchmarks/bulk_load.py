@@ -0,0 +1,61 @@
+"""This module compares building an AVL tree by calling add in a loop with the
+linear-time from_sorted and bulk_load constructors.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from src.tree.avl_tree import AVLTree
+
+
+def add_loop(keys: list) -> AVLTree:
+    """Build a tree by adding the keys one at a time.
+
+    Args:
+        keys (list): The keys to be added.
+
+    Returns:
+        AVLTree: The new tree.
+    """
+
+    tree = AVLTree()
+
+    for key in keys:
+        tree.add(key)
+
+    return tree
+
+
+def main() -> None:
+    """Parse the command line arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    ordered = list(range(args.n))
+    shuffled = ordered[:]
+    random.Random(args.seed).shuffle(shuffled)
+
+    cases = (
+        ("add loop (sorted)", add_loop, ordered),
+        ("add loop (random)", add_loop, shuffled),
+        ("from_sorted", AVLTree.from_sorted, ordered),
+        ("bulk_load (random)", AVLTree.bulk_load, shuffled),
+    )
+
+    print(f"{'build':>20} {'seconds':>10}")
+
+    for name, build, keys in cases:
+        start = time.perf_counter()
+        build(keys)
+        elapsed = time.perf_counter() - start
+
+        print(f"{name:>20} {elapsed:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
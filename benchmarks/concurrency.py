@@ -0,0 +1,198 @@
+"""This module stress tests the ConcurrentAVLTree with many threads and
+measures its throughput for several mixes of readers and writers.
+
+Every writer thread owns the keys congruent to its index, so it knows exactly
+which of its keys should be in the tree. Once the threads are done, the tree is
+checked against the union of those sets and against the AVL invariants, and
+every scan taken during the run must have seen a sorted, consistent snapshot.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import threading
+import time
+
+from src.tree.concurrent_avl_tree import ConcurrentAVLTree
+
+
+def check_invariants(root) -> None:
+    """Check that a tree is a valid AVL tree: its values are in ascending
+    order, and the height, balance factor and size of every node are correct.
+
+    Args:
+        root (Node): The root of the tree.
+
+    Raises:
+        AssertionError: If an invariant is violated.
+    """
+
+    previous = None
+    stack = []
+    node = root
+
+    while stack or node:
+        while node:
+            stack.append(node)
+            node = node.left
+
+        node = stack.pop()
+
+        assert previous is None or previous < node.value, "values are out of order"
+        previous = node.value
+
+        left_height = node.left.height if node.left else -1
+        right_height = node.right.height if node.right else -1
+        left_size = node.left.size if node.left else 0
+        right_size = node.right.size if node.right else 0
+
+        assert node.height == 1 + max(left_height, right_height), "wrong height"
+        assert node.balance_factor == right_height - left_height, "wrong balance factor"
+        assert -1 <= node.balance_factor <= 1, "unbalanced node"
+        assert node.size == 1 + left_size + right_size, "wrong size"
+
+        node = node.right
+
+
+def reader(tree: ConcurrentAVLTree, keys: int, stop: threading.Event, counts: list) -> None:
+    """Repeatedly query the tree, occasionally scanning a snapshot.
+
+    Args:
+        tree (ConcurrentAVLTree): The shared tree.
+        keys (int): The size of the key space.
+        stop (threading.Event): Set when the thread should stop.
+        counts (list): The list to which the number of operations is appended.
+    """
+
+    rng = random.Random()
+    operations = 0
+
+    while not stop.is_set():
+        key = rng.randrange(keys)
+
+        if operations % 100 == 0:
+            snapshot = tree.snapshot()
+            scanned = list(snapshot.irange(key, key + 1000))
+
+            assert scanned == sorted(set(scanned)), "scan saw an inconsistent snapshot"
+            assert len(scanned) == snapshot.count_range(key, key + 1000)
+        elif operations % 2:
+            tree.contains(key)
+        else:
+            tree.rank(key)
+
+        operations += 1
+
+    counts.append(operations)
+
+
+def writer(
+    tree: ConcurrentAVLTree,
+    index: int,
+    writers: int,
+    keys: int,
+    stop: threading.Event,
+    counts: list,
+    expected: set,
+) -> None:
+    """Repeatedly add or remove keys owned by this writer.
+
+    Args:
+        tree (ConcurrentAVLTree): The shared tree.
+        index (int): The index of the writer, which owns the keys congruent to it.
+        writers (int): The number of writers.
+        keys (int): The size of the key space.
+        stop (threading.Event): Set when the thread should stop.
+        counts (list): The list to which the number of operations is appended.
+        expected (set): The set of this writer's keys which should be in the tree.
+    """
+
+    rng = random.Random(index)
+    operations = 0
+
+    while not stop.is_set():
+        key = rng.randrange(index, keys, writers)
+
+        if key in expected:
+            assert tree.remove(key), "an owned key went missing"
+            expected.discard(key)
+        else:
+            assert tree.add(key), "an owned key appeared unexpectedly"
+            expected.add(key)
+
+        operations += 1
+
+    counts.append(operations)
+
+
+def run(readers: int, writers: int, keys: int, duration: float) -> float:
+    """Run the readers and writers against a shared tree, then check the tree.
+
+    Args:
+        readers (int): The number of reader threads.
+        writers (int): The number of writer threads.
+        keys (int): The size of the key space.
+        duration (float): The duration of the run in seconds.
+
+    Returns:
+        float: The total number of operations per second.
+    """
+
+    tree = ConcurrentAVLTree()
+    tree.extend(range(0, keys, 2))
+
+    stop = threading.Event()
+    counts = []
+    expected = [set(range(0, keys, 2)) & set(range(i, keys, writers)) for i in range(writers)]
+
+    threads = [
+        threading.Thread(target=reader, args=(tree, keys, stop, counts)) for _ in range(readers)
+    ]
+    threads += [
+        threading.Thread(
+            target=writer, args=(tree, index, writers, keys, stop, counts, expected[index])
+        )
+        for index in range(writers)
+    ]
+
+    for thread in threads:
+        thread.start()
+
+    time.sleep(duration)
+    stop.set()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(counts) == len(threads), "a thread failed"
+
+    snapshot = tree.snapshot()
+    check_invariants(snapshot.root)
+
+    if writers:
+        assert list(snapshot) == sorted(set().union(*expected)), "lost or spurious updates"
+
+    return sum(counts) / duration
+
+
+def main() -> None:
+    """Parse the command line arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--duration", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(f"{'readers':>8} {'writers':>8} {'ops/s':>12}")
+
+    for read_fraction in (1.0, 0.9, 0.5, 0.1):
+        readers = round(args.threads * read_fraction)
+        writers = args.threads - readers
+        throughput = run(readers, writers, args.keys, args.duration)
+
+        print(f"{readers:>8} {writers:>8} {throughput:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
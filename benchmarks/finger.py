@@ -0,0 +1,84 @@
+"""This module measures streams of keys in sorted, near-sorted and random
+order. For each stream, the keys are inserted into an empty tree with add, so
+the sorted stream takes the append path after the greatest value, then looked
+up again in the same order with contains, which starts from the root, and with
+the seek of a Cursor, which starts from the previous key.
+
+In a near-sorted stream, every key is displaced by up to --displacement
+positions, as with timestamps which arrive slightly out of order.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from typing import Callable, Dict, List
+
+from src.tree.avl_tree import AVLTree
+from src.tree.cursor import Cursor
+
+
+def streams(n: int, displacement: int, seed: int) -> Dict[str, List[int]]:
+    """Generate the streams of keys.
+
+    Args:
+        n (int): The number of keys.
+        displacement (int): The largest displacement of a key in the near-sorted stream.
+        seed (int): The seed of the random generator.
+
+    Returns:
+        Dict[str, List[int]]: The sorted, near-sorted and random streams, by name.
+    """
+
+    rng = random.Random(seed)
+    near = sorted(range(n), key=lambda key: key + rng.random() * displacement)
+    shuffled = list(range(n))
+    rng.shuffle(shuffled)
+
+    return {"sorted": list(range(n)), "near-sorted": near, "random": shuffled}
+
+
+def throughput(operation: Callable[[int], bool], keys: List[int]) -> float:
+    """Apply an operation to every key.
+
+    Args:
+        operation (Callable[[int], bool]): The operation.
+        keys (List[int]): The keys.
+
+    Returns:
+        float: The throughput in operations per second.
+    """
+
+    start = time.perf_counter()
+
+    for key in keys:
+        operation(key)
+
+    return len(keys) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Parse the command line arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("-n", type=int, default=200_000, help="the number of keys")
+    parser.add_argument("--displacement", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'stream':<12} {'add':>10} {'contains':>10} {'seek':>10}  (ops/s)")
+
+    for name, keys in streams(args.n, args.displacement, args.seed).items():
+        tree = AVLTree()
+        add = throughput(tree.add, keys)
+        contains = throughput(tree.contains, keys)
+        seek = throughput(Cursor(tree).seek, keys)
+
+        print(f"{name:<12} {add:>10,.0f} {contains:>10,.0f} {seek:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""This module shows what the instrumentation reveals about sequential and
+random workloads, and measures its overhead: none while disabled, and the cost
+of the counting probes and timing while enabled.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+
+from src.tree.avl_tree import AVLTree
+
+
+def workload(tree: AVLTree, keys: list) -> float:
+    """Add every key, look every key up and remove every key again.
+
+    Args:
+        tree (AVLTree): The tree.
+        keys (list): The keys.
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+
+    start = time.perf_counter()
+
+    for key in keys:
+        tree.add(key)
+
+    for key in keys:
+        tree.contains(key)
+
+    for key in keys:
+        tree.remove(key)
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Parse the command line arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=100_000, help="the number of keys")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sequential = list(range(args.n))
+    shuffled = sequential[:]
+    random.Random(args.seed).shuffle(shuffled)
+
+    for name, keys in (("sequential", sequential), ("random", shuffled)):
+        plain = workload(AVLTree(), keys)
+
+        tree = AVLTree()
+        tree.instrument()
+        instrumented = workload(tree, keys)
+
+        stats = tree.stats()
+        del stats["latency_ns"]
+
+        print(f"{name}: {plain:.2f} s plain, {instrumented:.2f} s instrumented")
+        print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""This module compares the overlap queries of an IntervalAVLTree with scanning
+every stored interval.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from src.tree.interval_avl_tree import IntervalAVLTree
+
+
+def main() -> None:
+    """Parse the command line arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=200_000, help="the number of intervals")
+    parser.add_argument("--span", type=int, default=100, help="the maximum length of an interval")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    horizon = 100 * args.n
+    tree = IntervalAVLTree()
+    intervals = []
+
+    for _ in range(args.n):
+        low = rng.randrange(horizon)
+        high = low + rng.randrange(args.span)
+
+        if tree.add(low, high):
+            intervals.append((low, high))
+
+    print(f"{'query width':>12} {'scan (us)':>12} {'overlapping (us)':>17} {'found':>8}")
+
+    for width in (0, 1_000, 100_000):
+        lows = [rng.randrange(horizon) for _ in range(args.queries)]
+
+        start = time.perf_counter()
+        expected = [
+            sorted(i for i in intervals if i[0] <= low + width and i[1] >= low) for low in lows
+        ]
+        scanning = (time.perf_counter() - start) / args.queries
+
+        start = time.perf_counter()
+        actual = [list(tree.overlapping(low, low + width)) for low in lows]
+        querying = (time.perf_counter() - start) / args.queries
+
+        assert actual == expected
+
+        found = sum(map(len, actual)) / args.queries
+        print(f"{width:>12,} {scanning * 1e6:>12.1f} {querying * 1e6:>17.1f} {found:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
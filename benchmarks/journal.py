@@ -0,0 +1,70 @@
+"""This module measures the cost of journaling: the throughput of random adds
+and removes on a plain tree and on a journaled tree with group commit, and
+the time taken to recover the journaled tree from disk.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+
+from src.tree.avl_tree import AVLTree
+
+
+def workload(tree: AVLTree, operations: list) -> float:
+    """Apply every operation to the tree.
+
+    Args:
+        tree (AVLTree): The tree.
+        operations (list): The (is_add, key) pairs.
+
+    Returns:
+        float: The throughput in operations per second.
+    """
+
+    start = time.perf_counter()
+
+    for is_add, key in operations:
+        if is_add:
+            tree.add(key)
+        else:
+            tree.remove(key)
+
+    return len(operations) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Parse the command line arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=200_000, help="the number of operations")
+    parser.add_argument("--sync-interval", type=float, default=0.05)
+    parser.add_argument("--compact-bytes", type=int, default=1 << 26)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    operations = [(rng.random() < 0.6, rng.randrange(args.n)) for _ in range(args.n)]
+
+    print(f"plain:     {workload(AVLTree(), operations):>10,.0f} ops/s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        tree = AVLTree.recover(
+            directory, sync_interval=args.sync_interval, compact_bytes=args.compact_bytes
+        )
+        throughput = workload(tree, operations)
+        tree.close()
+
+        print(f"journaled: {throughput:>10,.0f} ops/s")
+
+        start = time.perf_counter()
+        tree = AVLTree.recover(directory)
+        elapsed = time.perf_counter() - start
+        tree.close()
+
+        print(f"recovered {len(tree):,} values in {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""This module measures the memory used per key by the object-based AVLTree
+and the array-backed ArrayAVLTree with tracemalloc.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import tracemalloc
+
+from src.tree.avl_tree import AVLTree
+from src.tree.array_avl_tree import ArrayAVLTree
+
+
+def measure(tree_class: type, n: int) -> float:
+    """Insert n distinct keys into an empty tree while tracing allocations.
+    The keys are generated on the fly (a permutation of a range of large
+    integers), so the integer objects retained by the tree are counted too.
+
+    Args:
+        tree_class (type): The tree to be measured.
+        n (int): The number of keys.
+
+    Returns:
+        float: The number of bytes allocated per key.
+    """
+
+    gc.collect()
+    tracemalloc.start()
+
+    tree = tree_class()
+    add = tree.add
+
+    # 1_000_003 is prime, so the keys form a permutation of the range
+    for i in range(n):
+        add(1 << 40 | (i * 1_000_003) % n)
+
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return allocated / n
+
+
+def main() -> None:
+    """Parse the command line arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"{'tree':>14} {'bytes/key':>10}")
+
+    for tree_class in (AVLTree, ArrayAVLTree):
+        print(f"{tree_class.__name__:>14} {measure(tree_class, args.n):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
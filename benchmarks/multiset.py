@@ -0,0 +1,54 @@
+"""This module measures an AVLMultiset on a duplicate-heavy workload, a latency
+histogram, against keeping every sample sorted in a list with bisect.insort.
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import random
+import time
+
+from src.tree.avl_multiset import AVLMultiset
+
+
+def main() -> None:
+    """Parse the command line arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=1_000_000, help="the number of samples")
+    parser.add_argument("--distinct", type=int, default=1_000, help="the number of latencies")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    samples = [int(rng.expovariate(10 / args.distinct)) % args.distinct for _ in range(args.n)]
+
+    tree = AVLMultiset()
+    start = time.perf_counter()
+
+    for sample in samples:
+        tree.add(sample)
+
+    adding = time.perf_counter() - start
+
+    values = []
+    start = time.perf_counter()
+
+    for sample in samples:
+        bisect.insort(values, sample)
+
+    inserting = time.perf_counter() - start
+
+    assert list(tree) == values
+    assert tree.select(len(tree) * 99 // 100) == values[len(values) * 99 // 100]
+
+    print(f"{'samples':>10} {'nodes':>8} {'add (us)':>9} {'insort (us)':>12} {'p99':>6}")
+    print(
+        f"{len(tree):>10,} {sum(1 for _ in tree._nodes()):>8,}"
+        f" {adding / args.n * 1e6:>9.2f} {inserting / args.n * 1e6:>12.2f}"
+        f" {tree.select(len(tree) * 99 // 100):>6}"
+    )
+
+
+if __name__ == "__main__":
+    main()
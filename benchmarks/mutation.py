@@ -0,0 +1,75 @@
+"""This module measures the throughput (operations per second) of the add and
+remove methods of the AVL tree on sequential and random workloads.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from src.tree.avl_tree import AVLTree
+
+
+def measure(n: int, shuffle: bool, seed: int) -> tuple:
+    """Insert n keys into an empty tree, then remove all of them again.
+
+    Args:
+        n (int): The number of keys.
+        shuffle (bool): True to insert and remove the keys in random order,
+        otherwise, in ascending order.
+        seed (int): The seed used to shuffle the keys.
+
+    Returns:
+        tuple: The insertions per second and the removals per second.
+    """
+
+    keys = list(range(n))
+
+    if shuffle:
+        random.Random(seed).shuffle(keys)
+
+    tree = AVLTree()
+    add = tree.add
+    remove = tree.remove
+
+    start = time.perf_counter()
+
+    for key in keys:
+        add(key)
+
+    insert_time = time.perf_counter() - start
+
+    if shuffle:
+        random.Random(seed + 1).shuffle(keys)
+
+    start = time.perf_counter()
+
+    for key in keys:
+        remove(key)
+
+    remove_time = time.perf_counter() - start
+
+    return n / insert_time, n / remove_time
+
+
+def main() -> None:
+    """Parse the command line arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'workload':>10} {'insert (ops/s)':>15} {'remove (ops/s)':>15}")
+
+    for name, shuffle in (("sequential", False), ("random", True)):
+        results = [measure(args.n, shuffle, args.seed) for _ in range(args.repeat)]
+        insert_rate = max(result[0] for result in results)
+        remove_rate = max(result[1] for result in results)
+
+        print(f"{name:>10} {insert_rate:>15,.0f} {remove_rate:>15,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""This module generates load against a TreeServer running in another process
+and reports the throughput and the p50 and p99 latency of its requests for
+several levels of concurrency.
+
+Every concurrent worker sends one request at a time and waits for its
+response; the workers share a few connections, so their requests are
+pipelined and coalesced into batches by the server. The requests are lookups,
+adds and removes of random keys, in the proportions given by --mix.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import time
+
+from typing import List
+
+from src.tree.avl_tree import AVLTree
+from src.network.tree_client import TreeClient
+from src.network.tree_server import TreeServer
+
+
+def serve(n: int, port: multiprocessing.Queue) -> None:
+    """Serve a tree holding the even integers below 2n until terminated. Runs
+    in the server process.
+
+    Args:
+        n (int): The number of keys.
+        port (multiprocessing.Queue): Receives the port listened on.
+    """
+
+    async def run() -> None:
+        server = TreeServer(AVLTree.from_sorted(range(0, 2 * n, 2)))
+        port.put((await server.start())[1])
+        await server.serve_forever()
+
+    asyncio.run(run())
+
+
+async def load(port: int, concurrency: int, connections: int, args: argparse.Namespace) -> tuple:
+    """Send the requests of every worker and measure their latency.
+
+    Args:
+        port (int): The port of the server.
+        concurrency (int): The number of concurrent workers.
+        connections (int): The number of connections shared by the workers.
+        args (argparse.Namespace): The command line arguments.
+
+    Returns:
+        tuple: The elapsed time in seconds and the latency of every request in seconds.
+    """
+
+    clients = [await TreeClient.connect(port=port) for _ in range(min(concurrency, connections))]
+    rng = random.Random(args.seed)
+    contains, add, _ = args.mix
+    latencies = []
+
+    async def worker(client: TreeClient, count: int) -> None:
+        for _ in range(count):
+            key = rng.randrange(2 * args.n)
+            draw = rng.random()
+            operation = (
+                client.contains
+                if draw < contains
+                else client.add if draw < contains + add else client.remove
+            )
+
+            start = time.perf_counter()
+            await operation(key)
+            latencies.append(time.perf_counter() - start)
+
+    count = args.requests // concurrency
+    start = time.perf_counter()
+
+    await asyncio.gather(
+        *(worker(clients[index % len(clients)], count) for index in range(concurrency))
+    )
+
+    elapsed = time.perf_counter() - start
+
+    for client in clients:
+        await client.close()
+
+    return elapsed, latencies
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Get a percentile of the values.
+
+    Args:
+        values (List[float]): The values, in ascending order.
+        fraction (float): The fraction of values below the percentile.
+
+    Returns:
+        float: The percentile.
+    """
+
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main() -> None:
+    """Parse the command line arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("-n", type=int, default=1_000_000, help="the number of keys")
+    parser.add_argument(
+        "--requests", type=int, default=50_000, help="the number of requests per level"
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64, 256])
+    parser.add_argument(
+        "--connections", type=int, default=8, help="the most connections shared by the workers"
+    )
+    parser.add_argument(
+        "--mix",
+        type=float,
+        nargs=3,
+        default=[0.8, 0.1, 0.1],
+        help="the proportions of lookups, adds and removes",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    port = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(args.n, port), daemon=True)
+    server.start()
+
+    try:
+        port = port.get()
+
+        print(f"{'concurrency':>11} {'requests/s':>12} {'p50':>10} {'p99':>10}")
+
+        for concurrency in args.concurrency:
+            elapsed, latencies = asyncio.run(load(port, concurrency, args.connections, args))
+            latencies.sort()
+
+            print(
+                f"{concurrency:>11} {len(latencies) / elapsed:>12,.0f}"
+                f" {percentile(latencies, 0.5) * 1e6:>7.0f} us"
+                f" {percentile(latencies, 0.99) * 1e6:>7.0f} us"
+            )
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""This module measures the speedup of the ParallelExecutor's bulk build and
+batch query over the single-process bulk_load, add loop and contains_many, for
+an increasing number of worker processes.
+
+The speedup is bounded by the work left to the parent process: the nodes of
+the tree are always created there, and the values of a batch query are cut into
+chunks and their masks concatenated there. A batch query is only spread over
+the workers when the batch is at least as large as the tree.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+
+from src.tree.avl_tree import AVLTree
+from src.tree.parallel_executor import ParallelExecutor
+
+
+def elapsed(function, *args) -> float:
+    """Time a single call of a function. The result is kept alive until the
+    clock has stopped, so freeing a discarded tree is not timed.
+
+    Args:
+        function (Callable): The function to be called.
+        *args: The arguments of the function.
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+
+    start = time.perf_counter()
+    result = function(*args)
+    end = time.perf_counter()
+
+    del result
+
+    return end - start
+
+
+def add_loop(values: list) -> AVLTree:
+    """Build a tree by adding every value with add.
+
+    Args:
+        values (list): The values to be added.
+
+    Returns:
+        AVLTree: The tree.
+    """
+
+    tree = AVLTree()
+
+    for value in values:
+        tree.add(value)
+
+    return tree
+
+
+def main() -> None:
+    """Parse the command line arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=2_000_000, help="the number of keys to build")
+    parser.add_argument("--batch", type=int, default=2_000_000, help="the number of keys queried")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    values = [rng.randrange(4 * args.n) for _ in range(args.n)]
+    batch = [rng.randrange(4 * args.n) for _ in range(args.batch)]
+    tree = AVLTree.bulk_load(values)
+
+    print(f"{os.cpu_count()} CPUs available")
+    print(f"{'method':>24} {'build (s)':>10} {'query (s)':>10}")
+    print(
+        f"{'add / contains':>24} {elapsed(add_loop, values):>10.2f}"
+        f" {elapsed(lambda: [tree.contains(value) for value in batch]):>10.2f}"
+    )
+
+    build = elapsed(AVLTree.bulk_load, values)
+    query = elapsed(tree.contains_many, batch)
+    print(f"{'bulk_load / contains_many':>24} {build:>10.2f} {query:>10.2f}")
+
+    for workers in args.workers:
+        with ParallelExecutor(workers) as executor:
+            # Warm up the pool, so the processes are not started while timing
+            executor.bulk_load(values[: 2 * ParallelExecutor.MINIMUM_CHUNK * workers])
+
+            parallel_build = elapsed(executor.bulk_load, values)
+            parallel_query = elapsed(executor.contains_many, tree, batch)
+
+        name = f"{workers} workers"
+        print(
+            f"{name:>24} {parallel_build:>10.2f} {parallel_query:>10.2f}"
+            f"  (speedup {build / parallel_build:.2f}x / {query / parallel_query:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""This module measures the tree as a double-ended priority queue, e.g. a
+scheduler which peeks at its next deadline far more often than it runs a job.
+Every round peeks at the least value a number of times (--peeks), then either
+pops the least or the greatest value or adds a new one. The cached extremes
+(min and pop_min) are compared with searching the spine on every peek
+(find_minimum) and with a binary heap, which can only pop the least value.
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+import random
+import time
+
+from src.tree.avl_tree import AVLTree
+
+
+def tree_rounds(tree: AVLTree, operations: list, peeks: int) -> float:
+    """Run the rounds with the cached extremes.
+
+    Args:
+        tree (AVLTree): The tree.
+        operations (list): The (operation, value) pairs, see main.
+        peeks (int): The number of peeks per round.
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+
+    start = time.perf_counter()
+
+    for operation, value in operations:
+        for _ in range(peeks):
+            tree.min()
+
+        if operation == 0:
+            tree.pop_min()
+        elif operation == 1:
+            tree.pop_max()
+        else:
+            tree.add(value)
+
+    return time.perf_counter() - start
+
+
+def search_rounds(tree: AVLTree, operations: list, peeks: int) -> float:
+    """Run the rounds, searching the spine for every peek and pop.
+
+    Args:
+        tree (AVLTree): The tree.
+        operations (list): The (operation, value) pairs, see main.
+        peeks (int): The number of peeks per round.
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+
+    start = time.perf_counter()
+
+    for operation, value in operations:
+        for _ in range(peeks):
+            tree.find_minimum(tree.root)
+
+        if operation == 0:
+            tree.remove(tree.find_minimum(tree.root))
+        elif operation == 1:
+            tree.remove(tree.find_maximum(tree.root))
+        else:
+            tree.add(value)
+
+    return time.perf_counter() - start
+
+
+def heap_rounds(heap: list, operations: list, peeks: int) -> float:
+    """Run the rounds on a binary heap, popping the least value instead of
+    the greatest, which a heap cannot do.
+
+    Args:
+        heap (list): The heap.
+        operations (list): The (operation, value) pairs, see main.
+        peeks (int): The number of peeks per round.
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+
+    start = time.perf_counter()
+
+    for operation, value in operations:
+        for _ in range(peeks):
+            heap[0]
+
+        if operation < 2:
+            heapq.heappop(heap)
+        else:
+            heapq.heappush(heap, value)
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Parse the command line arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=100_000, help="the initial number of values")
+    parser.add_argument("--rounds", type=int, default=100_000)
+    parser.add_argument("--peeks", type=int, default=8, help="the number of peeks per round")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    values = rng.sample(range(1 << 40), args.n)
+    # Pops of the least and the greatest value and adds, in proportions 2:1:3
+    operations = [
+        (min(rng.randrange(6), 2), rng.randrange(1 << 40)) for _ in range(args.rounds)
+    ]
+
+    heap = list(values)
+    heapq.heapify(heap)
+
+    for name, elapsed in (
+        ("cached", tree_rounds(AVLTree.bulk_load(values), operations, args.peeks)),
+        ("search", search_rounds(AVLTree.bulk_load(values), operations, args.peeks)),
+        ("heapq", heap_rounds(heap, operations, args.peeks)),
+    ):
+        print(f"{name + ':':<7} {args.rounds / elapsed:>10,.0f} rounds/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""This module measures how the cost of a single insertion and a single lookup
+scales with the number of keys stored in the AVL tree. For an O(log n) tree the
+time per operation should stay (nearly) flat from 10^3 to 10^7 keys.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from src.tree.avl_tree import AVLTree
+
+
+def time_inserts(keys: list) -> tuple:
+    """Build a tree by inserting every key one at a time.
+
+    Args:
+        keys (list): The keys to be inserted, in insertion order.
+
+    Returns:
+        tuple: The populated tree and the mean time per insertion in seconds.
+    """
+
+    tree = AVLTree()
+
+    start = time.perf_counter()
+
+    for key in keys:
+        tree.add(key)
+
+    elapsed = time.perf_counter() - start
+
+    return tree, elapsed / len(keys)
+
+
+def time_lookups(tree: AVLTree, queries: list) -> float:
+    """Look up every queried key in the tree.
+
+    Args:
+        tree (AVLTree): The populated tree.
+        queries (list): The keys to be looked up.
+
+    Returns:
+        float: The mean time per lookup in seconds.
+    """
+
+    contains = tree.contains
+
+    start = time.perf_counter()
+
+    for key in queries:
+        contains(key)
+
+    elapsed = time.perf_counter() - start
+
+    return elapsed / len(queries)
+
+
+def run(min_exponent: int, max_exponent: int, lookups: int, seed: int) -> None:
+    """Run the scaling benchmark and print one row per tree size.
+
+    Args:
+        min_exponent (int): The smallest tree size, as a power of ten.
+        max_exponent (int): The largest tree size, as a power of ten.
+        lookups (int): The maximum number of lookups performed per tree size.
+        seed (int): The seed used to shuffle the keys.
+    """
+
+    rng = random.Random(seed)
+
+    print(f"{'keys':>10} {'insert (us/op)':>15} {'lookup (us/op)':>15}")
+
+    for exponent in range(min_exponent, max_exponent + 1):
+        n = 10**exponent
+
+        keys = list(range(0, 2 * n, 2))
+        rng.shuffle(keys)
+
+        tree, insert_time = time_inserts(keys)
+
+        # Half of the queries are hits (even keys), the other half are misses (odd keys)
+        queries = [rng.randrange(2 * n) for _ in range(min(n, lookups))]
+        lookup_time = time_lookups(tree, queries)
+
+        print(f"{n:>10} {insert_time * 1e6:>15.3f} {lookup_time * 1e6:>15.3f}")
+
+
+def main() -> None:
+    """Parse the command line arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--min-exponent", type=int, default=3)
+    parser.add_argument("--max-exponent", type=int, default=7)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run(args.min_exponent, args.max_exponent, args.lookups, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""This module compares split, join and the join-based set operations with
+moving the values one at a time, as is needed to rebalance key ranges between
+partitions.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from src.tree.avl_tree import AVLTree
+
+
+def elapsed(function, *args) -> float:
+    """Time a single call of a function. The result is kept alive until the
+    clock has stopped, so freeing a discarded tree is not timed.
+
+    Args:
+        function (Callable): The function to be called.
+        *args: The arguments of the function.
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+
+    start = time.perf_counter()
+    result = function(*args)
+    end = time.perf_counter()
+
+    del result
+
+    return end - start
+
+
+def split_loop(tree: AVLTree, value: int) -> None:
+    """Move the values greater than or equal to a value into a new tree one at
+    a time.
+
+    Args:
+        tree (AVLTree): The tree.
+        value (int): The value to split at.
+    """
+
+    right = AVLTree()
+
+    for current in list(tree.irange(value)):
+        tree.remove(current)
+        right.add(current)
+
+
+def union_loop(tree: AVLTree, other: AVLTree) -> None:
+    """Add every value of the other tree one at a time.
+
+    Args:
+        tree (AVLTree): The tree.
+        other (AVLTree): The other tree.
+    """
+
+    for value in other:
+        tree.add(value)
+
+
+def main() -> None:
+    """Parse the command line arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=1_000_000, help="the number of keys per tree")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    n = args.n
+
+    def tree(values) -> AVLTree:
+        return AVLTree.from_sorted(values)
+
+    print(f"{'operation':>26} {'one at a time (ms)':>19} {'tree (ms)':>10}")
+
+    value = rng.randrange(n)
+    loop = elapsed(split_loop, tree(range(n)), value)
+    fast = elapsed(tree(range(n)).split, value)
+    print(f"{'split':>26} {loop * 1e3:>19.2f} {fast * 1e3:>10.3f}")
+
+    loop = elapsed(union_loop, tree(range(n)), tree(range(n, 2 * n)))
+    fast = elapsed(tree(range(n)).join, tree(range(n, 2 * n)))
+    print(f"{'join':>26} {loop * 1e3:>19.2f} {fast * 1e3:>10.3f}")
+
+    for size in (n // 1000, n):
+        other = sorted(rng.sample(range(2 * n), size))
+
+        loop = elapsed(union_loop, tree(range(0, 2 * n, 2)), tree(other))
+        fast = elapsed(tree(range(0, 2 * n, 2)).union, tree(other))
+        print(f"{f'union with {size:,}':>26} {loop * 1e3:>19.2f} {fast * 1e3:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
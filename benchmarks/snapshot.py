@@ -0,0 +1,51 @@
+"""This module measures how long it takes to get a queryable tree at startup:
+rebuilding it from the source values, loading a snapshot, or memory-mapping a
+snapshot.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from src.tree.avl_tree import AVLTree
+
+
+def main() -> None:
+    """Parse the command line arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    values = list(range(0, 3 * args.n, 3))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tree.snapshot")
+        AVLTree.from_sorted(values).save(path)
+
+        cases = (
+            ("rebuild", lambda: AVLTree.bulk_load(values)),
+            ("load", lambda: AVLTree.load(path, mmap=False)),
+            ("load (mmap)", lambda: AVLTree.load(path, mmap=True)),
+        )
+
+        print(f"{'startup':>12} {'load (s)':>10} {'first lookup (us)':>18}")
+
+        for name, load in cases:
+            start = time.perf_counter()
+            tree = load()
+            loaded = time.perf_counter() - start
+
+            start = time.perf_counter()
+            tree.contains(values[len(values) // 3])
+            lookup = time.perf_counter() - start
+
+            print(f"{name:>12} {loaded:>10.3f} {lookup * 1e6:>18.1f}")
+
+            del tree
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+"""This module runs the benchmark suite of the AVL tree against two baselines, a
+sorted list maintained with bisect and a dict, and emits the results as JSON
+so that regressions can be tracked across commits.
+
+For every size n from 10^3 to 10^7 keys, each structure is first built holding
+the even integers below 2n, then a fixed number of operations is timed on it:
+insertions of new keys in sequential, random and adversarial (zig-zag around
+the median) order, lookups which hit and miss, removals, and iteration over
+ranges of consecutive keys. The memory per key is measured with tracemalloc
+for the sizes up to --memory-limit. A previous JSON report can be passed with
+--compare to print the change of every measurement.
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import gc
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from typing import Callable, Dict, List, Optional
+
+from src.tree.avl_tree import AVLTree
+
+RANGE_LENGTH = 100
+
+
+def avl_operations(keys: list) -> Dict[str, Callable]:
+    """Build an AVL tree and get its operations.
+
+    Args:
+        keys (list): The keys to be stored, in ascending order.
+
+    Returns:
+        Dict[str, Callable]: The insert, lookup, remove and scan operations.
+    """
+
+    tree = AVLTree.from_sorted(keys)
+
+    def scan(low: int) -> int:
+        return sum(1 for _ in tree.irange(low, low + 2 * RANGE_LENGTH, (True, False)))
+
+    return {"insert": tree.add, "lookup": tree.contains, "remove": tree.remove, "scan": scan}
+
+
+def bisect_operations(keys: list) -> Dict[str, Callable]:
+    """Build a sorted list and get its operations, using bisect.
+
+    Args:
+        keys (list): The keys to be stored, in ascending order.
+
+    Returns:
+        Dict[str, Callable]: The insert, lookup, remove and scan operations.
+    """
+
+    values = list(keys)
+
+    def insert(key: int) -> bool:
+        index = bisect.bisect_left(values, key)
+
+        if index < len(values) and values[index] == key:
+            return False
+
+        values.insert(index, key)
+
+        return True
+
+    def lookup(key: int) -> bool:
+        index = bisect.bisect_left(values, key)
+
+        return index < len(values) and values[index] == key
+
+    def remove(key: int) -> bool:
+        index = bisect.bisect_left(values, key)
+
+        if index == len(values) or values[index] != key:
+            return False
+
+        del values[index]
+
+        return True
+
+    def scan(low: int) -> int:
+        start = bisect.bisect_left(values, low)
+        end = bisect.bisect_left(values, low + 2 * RANGE_LENGTH)
+
+        return sum(1 for _ in values[start:end])
+
+    return {"insert": insert, "lookup": lookup, "remove": remove, "scan": scan}
+
+
+def dict_operations(keys: list) -> Dict[str, Callable]:
+    """Build a dict and get its operations. A dict is unordered, so it has no
+    range scan.
+
+    Args:
+        keys (list): The keys to be stored.
+
+    Returns:
+        Dict[str, Callable]: The insert, lookup and remove operations.
+    """
+
+    values = dict.fromkeys(keys)
+
+    def insert(key: int) -> bool:
+        if key in values:
+            return False
+
+        values[key] = None
+
+        return True
+
+    def remove(key: int) -> bool:
+        return values.pop(key, False) is None
+
+    return {"insert": insert, "lookup": values.__contains__, "remove": remove}
+
+
+STRUCTURES = {"AVLTree": avl_operations, "bisect": bisect_operations, "dict": dict_operations}
+
+
+def workloads(n: int, operations: int, rng: random.Random) -> Dict[str, tuple]:
+    """Generate the keys of every workload for a structure holding the even
+    integers below 2n.
+
+    Args:
+        n (int): The number of keys stored.
+        operations (int): The number of operations per workload.
+        rng (random.Random): The random number generator.
+
+    Returns:
+        Dict[str, tuple]: The operation and the keys of every workload, by name.
+    """
+
+    middle = n - n % 2
+    count = min(n, operations)
+
+    # Alternate just below and just above the median, moving outwards, so every insertion lands
+    # in the middle of the list (its worst case) and on alternating sides of the tree's root
+    zigzag = [middle + (1 if step % 2 else -1) * (step // 2 * 2 + 1) for step in range(count)]
+
+    return {
+        "insert_sequential": ("insert", list(range(2 * n, 2 * n + count))),
+        "insert_random": ("insert", [2 * rng.randrange(n) + 1 for _ in range(count)]),
+        "insert_adversarial": ("insert", zigzag),
+        "lookup_hit": ("lookup", [2 * rng.randrange(n) for _ in range(count)]),
+        "lookup_miss": ("lookup", [2 * rng.randrange(n) + 1 for _ in range(count)]),
+        "remove": ("remove", [2 * key for key in rng.sample(range(n), count)]),
+        "scan": ("scan", [2 * rng.randrange(max(1, n - RANGE_LENGTH)) for _ in range(count)]),
+    }
+
+
+def time_workload(operation: Callable, keys: list) -> float:
+    """Apply an operation to every key of a workload.
+
+    Args:
+        operation (Callable): The operation.
+        keys (list): The keys.
+
+    Returns:
+        float: The mean time per operation in nanoseconds.
+    """
+
+    gc.disable()
+
+    try:
+        start = time.perf_counter()
+
+        for key in keys:
+            operation(key)
+
+        elapsed = time.perf_counter() - start
+    finally:
+        gc.enable()
+
+    return elapsed / len(keys) * 1e9
+
+
+def memory_per_key(build: Callable, keys: list) -> float:
+    """Measure the memory allocated per key to build a structure. The keys
+    themselves already exist, so only the structure is counted.
+
+    Args:
+        build (Callable): The function building the structure.
+        keys (list): The keys, in ascending order.
+
+    Returns:
+        float: The number of bytes allocated per key.
+    """
+
+    gc.collect()
+    tracemalloc.start()
+
+    structure = build(keys)
+    allocated, _ = tracemalloc.get_traced_memory()
+
+    tracemalloc.stop()
+    del structure
+
+    return allocated / len(keys)
+
+
+def commit() -> Optional[str]:
+    """Get the current git commit of the repository, if there is one.
+
+    Returns:
+        Optional[str]: The commit hash, or None if it cannot be determined.
+    """
+
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return result.stdout.strip()
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Run the suite and print one line per measurement.
+
+    Args:
+        args (argparse.Namespace): The command line arguments.
+
+    Returns:
+        dict: The report, with the environment and a list of results.
+    """
+
+    rng = random.Random(args.seed)
+    results = []
+
+    print(f"{'structure':>10} {'benchmark':>19} {'n':>10} {'value':>12}")
+
+    for exponent in range(args.min_exponent, args.max_exponent + 1):
+        n = 10**exponent
+        keys = list(range(0, 2 * n, 2))
+
+        for name, workload in workloads(n, args.operations, rng).items():
+            operation, workload_keys = workload
+
+            for structure, build in STRUCTURES.items():
+                if structure not in args.structures:
+                    continue
+
+                operations = build(keys)
+
+                if operation not in operations:
+                    continue
+
+                value = time_workload(operations[operation], workload_keys)
+                results.append(
+                    {"structure": structure, "benchmark": name, "n": n, "ns_per_op": value}
+                )
+
+                print(f"{structure:>10} {name:>19} {n:>10,} {value:>9.0f} ns")
+
+                del operations
+
+        if n > args.memory_limit:
+            continue
+
+        for structure, build in STRUCTURES.items():
+            if structure in args.structures:
+                value = memory_per_key(build, keys)
+                results.append(
+                    {"structure": structure, "benchmark": "memory", "n": n, "bytes_per_key": value}
+                )
+
+                print(f"{structure:>10} {'memory':>19} {n:>10,} {value:>7.1f} B/key")
+
+    return {
+        "commit": commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": results,
+    }
+
+
+def compare(results: List[dict], path: str) -> None:
+    """Print the change of every measurement relative to a previous report.
+
+    Args:
+        results (List[dict]): The results of this run.
+        path (str): The path of the previous JSON report.
+    """
+
+    with open(path) as file:
+        previous = json.load(file)
+
+    def key(result: dict) -> tuple:
+        return result["structure"], result["benchmark"], result["n"]
+
+    def value(result: dict) -> float:
+        return result.get("ns_per_op", result.get("bytes_per_key"))
+
+    before = {key(result): value(result) for result in previous["results"]}
+
+    print(f"\ncompared with {previous.get('commit') or path}")
+    print(f"{'structure':>10} {'benchmark':>19} {'n':>10} {'change':>8}")
+
+    for result in results:
+        if before.get(key(result)):
+            change = value(result) / before[key(result)] - 1
+            print(
+                f"{result['structure']:>10} {result['benchmark']:>19} {result['n']:>10,}"
+                f" {change:>+8.1%}"
+            )
+
+
+def main() -> None:
+    """Parse the command line arguments and run the suite."""
+
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--min-exponent", type=int, default=3)
+    parser.add_argument("--max-exponent", type=int, default=7)
+    parser.add_argument(
+        "--operations", type=int, default=100_000, help="the number of operations per workload"
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=int,
+        default=1_000_000,
+        help="the largest size whose memory is measured",
+    )
+    parser.add_argument(
+        "--structures", nargs="+", default=list(STRUCTURES), choices=list(STRUCTURES)
+    )
+    parser.add_argument("--output", help="the path of the JSON report to be written")
+    parser.add_argument("--compare", help="the path of a previous JSON report")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = run(args)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        compare(report["results"], args.compare)
+
+
+if __name__ == "__main__":
+    main()
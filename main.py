@@ -5,17 +5,15 @@ import os
 os.environ["PATH"] += os.pathsep + "C:/Program Files/Graphviz/bin/"
 
 from src.tree.avl_tree import AVLTree
+from src.tree.error_policy import ErrorPolicy
 
 
 def main() -> None:
     """The main function. Call objects and methods here."""
 
-    # Create a new tree
-    tree = AVLTree()
-
-    # Add values to the tree
-    for i in range(20):
-        tree.add(i)
+    # Create a new tree from sorted values, reporting invalid operations in the terminal
+    tree = AVLTree.from_sorted(range(20))
+    tree.error_policy = ErrorPolicy.INTERACTIVE
 
     # Print the tree
     tree.print()
@@ -4,124 +4,224 @@ This is to maintain readable code.
 """
 from __future__ import annotations
 
-import functools
+import sys
 
-from typing import Optional
-
-from src.tree.node import Node
+from typing import Any, Callable, IO, Iterator, List, Optional, Tuple
 
 
 class DisplayTree:
     """Allows the user to easily display the binary tree that they have
-    created."""
-
+    created. The tree is drawn without recursion in linear time: the nodes to
+    be drawn are selected level by level, every node is given its own columns
+    by a single in-order pass, and each line is then built once and written
+    straight to the stream, so that even deep or very large trees can be
+    printed, in part or in full.
+    """
+
+    @staticmethod
     def print_tree(
-        node: Node,
-        node_info: Optional[str, Node, Node] = None,
+        node: Any,
+        node_info: Callable[[Any], Tuple[str, Any, Any]],
         inverted: Optional[bool] = False,
-        is_top: Optional[bool] = True,
-    ) -> None:
+        stream: Optional[IO[str]] = None,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        elided: Callable[[Any], str] = lambda node: "...",
+    ) -> int:
         """Prints the binary tree to the terminal. The binary tree will be
-        displayed vertically.
+        displayed vertically. A subtree cut off by a limit is drawn as a single
+        marker.
 
         Args:
-            node (Node): A data structure which stores useful information related to an avl tree.
+            node (Any): The root node, or a falsy value if the tree is empty.
+
+            node_info (Callable[[Any], Tuple[str, Any, Any]]): Get the text of a node and its left
+            and right children.
+
+            inverted (Optional[bool], optional): True to display the tree bottom-up, otherwise,
+            display the tree top-down. The lines are then written once all are built.
 
-            node_info (Optional[str, Node, Node], optional): The string value of the node's integer
-            value.
+            stream (Optional[IO[str]], optional): The writable text stream. By default, the
+            standard output.
 
-            inverted (Optional[bool], optional): True to display the tree bottom-up, otherwise, 
-            display the tree top-down.
+            max_depth (Optional[int], optional): The deepest level drawn, where the root is at
+            depth 0. By default, unlimited.
 
-            is_top (Optional[bool], optional): Check if we are at the top of the tree.
+            max_nodes (Optional[int], optional): The most nodes drawn, in level order. By default,
+            unlimited.
+
+            elided (Callable[[Any], str], optional): Get the marker of a subtree which is cut off.
+
+        Returns:
+            int: The number of nodes drawn, not counting markers.
         """
 
-        string_value, left_node, right_node = node_info(node)
+        stream = sys.stdout if stream is None else stream
 
-        string_value_width = len(string_value)
+        if not node:
+            return 0
 
-        left_text_block = (
-            [] if not left_node else DisplayTree.print_tree(left_node, node_info, inverted, False)
-        )
-        right_text_block = (
-            [] if not right_node else DisplayTree.print_tree(right_node, node_info, inverted, False)
+        labels, children, levels, drawn = DisplayTree.__select(
+            node, node_info, max_depth, max_nodes, elided
         )
+        columns = DisplayTree.__layout(labels, children)
+        lines = DisplayTree.__lines(labels, children, levels, columns, inverted)
+
+        for line in reversed(list(lines)) if inverted else lines:
+            stream.write(line + "\n")
 
-        common_lines = min(len(left_text_block), len(right_text_block))
-        sub_level_lines = max(len(right_text_block), len(left_text_block))
+        stream.write("\n")
 
-        left_sub_lines = left_text_block + [""] * (sub_level_lines - len(left_text_block))
-        right_sub_lines = right_text_block + [""] * (sub_level_lines - len(right_text_block))
+        return drawn
 
-        left_line_widths = [len(line) for line in left_sub_lines]
-        right_line_indents = [len(line) - len(line.lstrip(" ")) for line in right_sub_lines]
+    @staticmethod
+    def __select(
+        node: Any,
+        node_info: Callable[[Any], Tuple[str, Any, Any]],
+        max_depth: Optional[int],
+        max_nodes: Optional[int],
+        elided: Callable[[Any], str],
+    ) -> Tuple[List[str], List[Tuple[Optional[int], Optional[int]]], List[range], int]:
+        """Select the nodes to be drawn in level order, numbering them in that
+        order. A node beyond the limits is kept as a marker without children.
 
-        first_left_width = (left_line_widths + [0])[0]
-        first_right_indent = (right_line_indents + [0])[0]
+        Args:
+            node (Any): The root node.
+            node_info (Callable[[Any], Tuple[str, Any, Any]]): Get the text and children of a node.
+            max_depth (Optional[int]): The deepest level drawn.
+            max_nodes (Optional[int]): The most nodes drawn.
+            elided (Callable[[Any], str]): Get the marker of a subtree which is cut off.
+
+        Returns:
+            Tuple[List[str], List[Tuple[Optional[int], Optional[int]]], List[range], int]: The
+            text of every node, the numbers of its children, the numbers of the nodes of every
+            level and the number of nodes drawn.
+        """
 
-        link_spacing = min(string_value_width, 2 - string_value_width % 2)
-        left_link_bar = 1 if left_node else 0
-        right_link_bar = 1 if right_node else 0
-        min_link_width = left_link_bar + link_spacing + right_link_bar
-        value_offset = (string_value_width - link_spacing) // 2
+        nodes = [node]
+        depths = [0]
+        labels = []
+        children = []
+        levels = []
+        drawn = 0
 
-        min_spacing = 2
-        right_node_position = functools.reduce(
-            lambda r, i: max(r, i[0] + min_spacing + first_right_indent - i[1]),
-            zip(left_line_widths, right_line_indents[0:common_lines]),
-            first_left_width + min_link_width,
-        )
+        for index, node in enumerate(nodes):
+            depth = depths[index]
+
+            if depth == len(levels):
+                levels.append(index)
+
+            if drawn == max_nodes or (max_depth is not None and depth > max_depth):
+                labels.append(elided(node))
+                children.append((None, None))
+                continue
+
+            drawn += 1
+            label, left, right = node_info(node)
+            labels.append(label)
+
+            pair = []
+
+            for child in (left, right):
+                if child:
+                    pair.append(len(nodes))
+                    nodes.append(child)
+                    depths.append(depth + 1)
+                else:
+                    pair.append(None)
 
-        link_extra_width = max(0, right_node_position - first_left_width - min_link_width)
-        right_link_extra = link_extra_width // 2
-        left_link_extra = link_extra_width - right_link_extra
+            children.append(tuple(pair))
+
+        levels.append(len(nodes))
+
+        return labels, children, [range(*bounds) for bounds in zip(levels, levels[1:])], drawn
+
+    @staticmethod
+    def __layout(
+        labels: List[str], children: List[Tuple[Optional[int], Optional[int]]]
+    ) -> List[int]:
+        """Give every node its own columns, in in-order, so that every node is
+        right of its left subtree and left of its right subtree.
+
+        Args:
+            labels (List[str]): The text of every node.
+            children (List[Tuple[Optional[int], Optional[int]]]): The numbers of its children.
+
+        Returns:
+            List[int]: The first column of every node.
+        """
+
+        columns = [0] * len(labels)
+        column = 0
+        stack = []
+        index = 0
+
+        while stack or index is not None:
+            while index is not None:
+                stack.append(index)
+                index = children[index][0]
+
+            index = stack.pop()
+            columns[index] = column
+            column += len(labels[index]) + 1
+            index = children[index][1]
+
+        return columns
+
+    @staticmethod
+    def __lines(
+        labels: List[str],
+        children: List[Tuple[Optional[int], Optional[int]]],
+        levels: List[range],
+        columns: List[int],
+        inverted: bool,
+    ) -> Iterator[str]:
+        """Build the lines of the drawing top-down: for every level, the line of
+        its nodes and the line of the links to their children.
+
+        Args:
+            labels (List[str]): The text of every node.
+            children (List[Tuple[Optional[int], Optional[int]]]): The numbers of its children.
+            levels (List[range]): The numbers of the nodes of every level.
+            columns (List[int]): The first column of every node.
+            inverted (bool): True to draw the links for a bottom-up display.
+
+        Yields:
+            str: The next line.
+        """
 
-        value_indent = max(0, first_left_width + left_link_extra + left_link_bar - value_offset)
-        value_line = " " * max(0, value_indent) + string_value
         slash = "\\" if inverted else "/"
         backslash = "/" if inverted else "\\"
         u_line = "¯" if inverted else "_"
 
-        left_link = (
-            "" if not left_node else (" " * first_left_width + u_line * left_link_extra + slash)
-        )
-
-        right_link_offset = link_spacing + value_offset * (1 - left_link_bar)
-        right_link = (
-            ""
-            if not right_node
-            else (" " * right_link_offset + backslash + u_line * right_link_extra)
-        )
-
-        link_line = left_link + right_link
+        def middle(index: int) -> int:
+            return columns[index] + (len(labels[index]) - 1) // 2
 
-        left_indent_width = max(0, first_right_indent - right_node_position)
-        left_indent = " " * left_indent_width
-        indented_left_lines = [(left_indent if line else "") + line for line in left_sub_lines]
+        for level in levels:
+            value_line = []
+            link_line = []
+            value_cursor = link_cursor = 0
 
-        merge_offsets = [len(line) for line in indented_left_lines]
-        merge_offsets = [
-            left_indent_width + right_node_position - first_right_indent - w for w in merge_offsets
-        ]
-        merge_offsets = [p if right_sub_lines[i] else 0 for i, p in enumerate(merge_offsets)]
+            for index in level:
+                start = columns[index]
+                end = start + len(labels[index])
+                left, right = children[index]
 
-        merged_sub_lines = zip(range(len(merge_offsets)), merge_offsets, indented_left_lines)
-        merged_sub_lines = [(i, p, line + (" " * max(0, p))) for i, p, line in merged_sub_lines]
-        merged_sub_lines = [
-            line + right_sub_lines[i][max(0, -p) :] for i, p, line in merged_sub_lines
-        ]
+                value_line.append(" " * (start - value_cursor) + labels[index])
+                value_cursor = end
 
-        tree_lines = (
-            [left_indent + value_line]
-            + ([] if not link_line else [left_indent + link_line])
-            + merged_sub_lines
-        )
+                if left is not None:
+                    link_start = middle(left) + 1
+                    link_line.append(" " * (link_start - link_cursor))
+                    link_line.append(u_line * (start - 1 - link_start) + slash)
+                    link_cursor = start
 
-        tree_lines = reversed(tree_lines) if inverted and is_top else tree_lines
+                if right is not None:
+                    link_line.append(" " * (end - link_cursor) + backslash)
+                    link_line.append(u_line * (middle(right) - end - 1))
+                    link_cursor = middle(right)
 
-        if is_top:
-            print("\n".join(tree_lines))
-        else:
-            return tree_lines
+            yield "".join(value_line)
 
-        print()
+            if link_line:
+                yield "".join(link_line)
@@ -1,12 +1,23 @@
-"""This module allows the user to display the graph with graphviz."""
-from graphviz import Digraph
+"""This module allows the user to export the graph in the DOT language and to
+display it with graphviz."""
+from __future__ import annotations
+
+import os
+
+from typing import Callable, IO, Optional, Union
 
 from src.tree.node import Node
 
 
 class GraphTree:
-    """The binary will be visually represented using graphviz."""
-    
+    """The binary tree will be visually represented using graphviz. The DOT
+    text is written by an iterative traversal and streamed to its destination
+    in chunks, so even degenerate or very large trees can be exported without
+    recursion or building the whole graph in memory. Graphviz itself is only
+    needed to render the DOT file into an image.
+    """
+
+    @staticmethod
     def display_tree(node: Node) -> None:
         """Display the binary tree using graphviz.
 
@@ -14,27 +25,182 @@ class GraphTree:
             node (Node): The root node.
         """
 
-        graph = Digraph()
-        graph.node(str(node.value))
+        GraphTree.write_dot(node, "Digraph.gv")
+        GraphTree.render("Digraph.gv", view=True)
+
+    @staticmethod
+    def write_dot(
+        node: Optional[Node],
+        output: Union[str, os.PathLike, IO[str]],
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        key: Optional[int] = None,
+        context: int = 0,
+        annotate: bool = True,
+        label: Callable[[Node], str] = lambda node: str(node.value),
+        count: Callable[[Node], int] = lambda node: node.size,
+    ) -> int:
+        """Write the binary tree as a DOT graph. Nodes are identified by their
+        position in the traversal rather than their value. A subtree cut off
+        by a limit is drawn as a single placeholder showing how many nodes it
+        holds.
+
+        Args:
+            node (Optional[Node]): The root node.
+            output (Union[str, os.PathLike, IO[str]]): The path of the DOT file, or a writable
+            text file object.
+            max_depth (Optional[int], optional): The deepest level written, where the root (or
+            the selected subtree's root) is at depth 0. By default, unlimited.
+            max_nodes (Optional[int], optional): The most nodes written. By default, unlimited.
+            key (Optional[int], optional): Only write the subtree of the node holding this value
+            (or of the last node on its search path, if it does not exist).
+            context (int, optional): The number of ancestors of that node to include.
+            annotate (bool, optional): True to annotate every node with its height and balance
+            factor.
+            label (Callable[[Node], str], optional): The text of a node, by default its value.
+            count (Callable[[Node], int], optional): The number of nodes of a subtree, by default
+            its size.
+
+        Returns:
+            int: The number of nodes written, not counting placeholders.
+        """
+
+        if key is not None:
+            node = GraphTree.locate(node, key, context)
+
+        file = open(output, "w") if isinstance(output, (str, os.PathLike)) else output
+
+        try:
+            return GraphTree.__stream(file, node, max_depth, max_nodes, annotate, label, count)
+        finally:
+            if file is not output:
+                file.close()
+
+    @staticmethod
+    def render(path: Union[str, os.PathLike], format: str = "png", view: bool = False) -> str:
+        """Render a DOT file with graphviz, which must be installed along with
+        its executables.
+
+        Args:
+            path (Union[str, os.PathLike]): The path of the DOT file.
+            format (str, optional): The format of the image.
+            view (bool, optional): True to open the image with the default viewer.
+
+        Returns:
+            str: The path of the rendered image.
+        """
+
+        import graphviz
+
+        image = graphviz.render("dot", format, path)
+
+        if view:
+            graphviz.view(image)
+
+        return image
+
+    @staticmethod
+    def locate(node: Optional[Node], key: int, context: int) -> Optional[Node]:
+        """Find the node holding the queried value, or the last node on its
+        search path, and go back up a number of ancestors. This is the root of
+        the subtree to be drawn.
+
+        Args:
+            node (Optional[Node]): The root node.
+            key (int): The value queried.
+            context (int): The number of ancestors of the node holding the value to include.
+
+        Returns:
+            Optional[Node]: The root of the subtree to be drawn, or None if the tree is empty.
+        """
+
+        path = []
+
+        while node:
+            path.append(node)
+
+            if key == node.value:
+                break
+
+            node = node.left if key < node.value else node.right
+
+        return path[max(0, len(path) - 1 - context)] if path else None
+
+    @staticmethod
+    def __stream(
+        file: IO[str],
+        node: Optional[Node],
+        max_depth: Optional[int],
+        max_nodes: Optional[int],
+        annotate: bool,
+        label: Callable[[Node], str],
+        count: Callable[[Node], int],
+    ) -> int:
+        """Write the DOT graph of a subtree with an explicit stack, buffering
+        the lines and flushing them in chunks. A lone child is paired with an
+        invisible sibling, so left and right children are told apart.
+
+        Args:
+            file (IO[str]): The writable text file object.
+            node (Optional[Node]): The root of the subtree.
+            max_depth (Optional[int]): The deepest level written.
+            max_nodes (Optional[int]): The most nodes written.
+            annotate (bool): True to annotate every node with its height and balance factor.
+            label (Callable[[Node], str]): The text of a node.
+            count (Callable[[Node], int]): The number of nodes of a subtree.
+
+        Returns:
+            int: The number of nodes written, not counting placeholders.
+        """
+
+        lines = ["digraph AVLTree {\n"]
+        stack = [(node, 0, 0)] if node and max_nodes != 0 else []
+        identifiers = 1
+        written = 0
+
+        while stack:
+            node, identifier, depth = stack.pop()
+            written += 1
+
+            text = label(node).replace("\\", "\\\\").replace('"', '\\"')
+
+            if annotate:
+                text += f"\\nh={node.height} bf={node.balance_factor}"
+
+            lines.append(f'  n{identifier} [label="{text}"];\n')
+
+            children = []
+
+            for child in (node.left, node.right):
+                child_identifier = identifiers
+                identifiers += 1
+
+                if not child:
+                    if node.left or node.right:
+                        lines.append(f"  n{child_identifier} [style=invis];\n")
+                        lines.append(f"  n{identifier} -> n{child_identifier} [style=invis];\n")
+
+                    continue
+
+                lines.append(f"  n{identifier} -> n{child_identifier};\n")
+
+                full = max_nodes is not None and written + len(stack) + len(children) >= max_nodes
 
-        def traverse(node: Node) -> None:
-            """Recursively traverse the left and right subtrees, adding edges
-            and nodes on the way to grpahviz's graph. Afterwards, render the
-            image to the screen.
+                if full or (max_depth is not None and depth >= max_depth):
+                    lines.append(
+                        f'  n{child_identifier} [label="{count(child)} more", shape=box,'
+                        " style=dashed];\n"
+                    )
+                else:
+                    children.append((child, child_identifier, depth + 1))
 
-            Args:
-                node (Node): The current node.
-            """
+            stack.extend(reversed(children))
 
-            if node.left:
-                graph.node(str(node.left.value))
-                graph.edge(str(node.value), str(node.left.value))
-                traverse(node.left)
-            if node.right:
-                graph.node(str(node.right.value))
-                graph.edge(str(node.value), str(node.right.value))
-                traverse(node.right)
+            if len(lines) >= 8192:
+                file.write("".join(lines))
+                lines.clear()
 
-        traverse(node)
+        lines.append("}\n")
+        file.write("".join(lines))
 
-        graph.render(view=True, format="png")
+        return written
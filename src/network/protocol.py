@@ -0,0 +1,127 @@
+"""This module provides the binary protocol spoken between a TreeServer and a
+TreeClient."""
+from __future__ import annotations
+
+import asyncio
+import struct
+import sys
+
+from array import array
+from typing import List, Tuple, Union
+
+
+class Protocol:
+    """Every message is a frame: a fixed-size header holding the length of
+    the payload, the id of the request (chosen by the client, and echoed by
+    every response to it) and an operation or response code, followed by the
+    payload. Values are packed as fixed-width little-endian numbers with the
+    typecode of the tree ("q" or "d", as in a snapshot), so a request for a
+    single value is 17 bytes long.
+
+    A request to add, remove or look up a value, or to rank it, carries the
+    value and is answered by a single RESULT frame: one byte (whether the value
+    was added, removed or found) or the rank as an unsigned 64-bit integer. A
+    range request carries a byte of flags (which bounds are given) and both
+    bounds, and is answered by any number of VALUES frames, each holding a
+    chunk of the values in ascending order, followed by an END frame. A request
+    which cannot be served is answered by an ERROR frame holding the reason.
+
+    Attributes:
+        HEADER (struct.Struct): The header of a frame: payload length, request id and code.
+        MAX_PAYLOAD (int): The longest payload accepted.
+    """
+
+    HEADER = struct.Struct("<IIB")
+    MAX_PAYLOAD = 1 << 24
+
+    ADD = 1
+    REMOVE = 2
+    CONTAINS = 3
+    RANK = 4
+    RANGE = 5
+
+    RESULT = 16
+    VALUES = 17
+    END = 18
+    ERROR = 19
+
+    HAS_LOW = 1
+    HAS_HIGH = 2
+
+    @staticmethod
+    def frame(request: int, code: int, payload: bytes = b"") -> bytes:
+        """Build a frame.
+
+        Args:
+            request (int): The id of the request.
+            code (int): The operation or response code.
+            payload (bytes, optional): The payload.
+
+        Returns:
+            bytes: The frame.
+        """
+
+        return Protocol.HEADER.pack(len(payload), request, code) + payload
+
+    @staticmethod
+    async def read(reader: asyncio.StreamReader) -> Tuple[int, int, bytes]:
+        """Read the next frame from a stream.
+
+        Args:
+            reader (asyncio.StreamReader): The stream.
+
+        Raises:
+            asyncio.IncompleteReadError: If the stream ends.
+            ConnectionError: If the payload is too long.
+
+        Returns:
+            Tuple[int, int, bytes]: The id of the request, the code and the payload.
+        """
+
+        length, request, code = Protocol.HEADER.unpack(
+            await reader.readexactly(Protocol.HEADER.size)
+        )
+
+        if length > Protocol.MAX_PAYLOAD:
+            raise ConnectionError(f"payload of {length} bytes is too long")
+
+        return request, code, await reader.readexactly(length) if length else b""
+
+    @staticmethod
+    def pack_values(values: List[Union[int, float]], typecode: str) -> bytes:
+        """Pack values as a column of fixed-width little-endian numbers.
+
+        Args:
+            values (List[Union[int, float]]): The values.
+            typecode (str): The typecode of the values.
+
+        Returns:
+            bytes: The packed values.
+        """
+
+        column = array(typecode, values)
+
+        if sys.byteorder != "little":
+            column.byteswap()
+
+        return column.tobytes()
+
+    @staticmethod
+    def unpack_values(payload: bytes, typecode: str) -> List[Union[int, float]]:
+        """Unpack a column of fixed-width little-endian numbers.
+
+        Args:
+            payload (bytes): The packed values.
+            typecode (str): The typecode of the values.
+
+        Returns:
+            List[Union[int, float]]: The values.
+        """
+
+        column = array(typecode)
+        column.frombytes(payload)
+
+        if sys.byteorder != "little":
+            column.byteswap()
+
+        return column.tolist()
@@ -0,0 +1,312 @@
+"""This module allows the user to query and modify an AVL tree served by a
+TreeServer."""
+from __future__ import annotations
+
+import asyncio
+import struct
+
+from typing import AsyncIterator, Optional, Union
+
+from src.network.protocol import Protocol
+
+
+class TreeClient(object):
+    """A tree client sends requests to a TreeServer over a single connection.
+    Requests are pipelined: every call sends its request right away and waits
+    for its own response, which is matched by the request id, so many
+    coroutines can share one client and their requests are batched together
+    by the server. A client must be used from a single event loop.
+
+    Attributes:
+        typecode (str): The typecode of the values, which must match the server's.
+    """
+
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, typecode: str = "q"
+    ):
+        """Initialize the tree client on an open connection. Use connect or
+        connect_unix instead.
+
+        Args:
+            reader (asyncio.StreamReader): The stream of responses.
+            writer (asyncio.StreamWriter): The stream of requests.
+            typecode (str, optional): The typecode of the values.
+        """
+
+        self.typecode = typecode
+        self.__reader = reader
+        self.__writer = writer
+        self.__value = struct.Struct("<" + typecode)
+        self.__bounds = struct.Struct("<B" + typecode * 2)
+        self.__request = 0
+        self.__waiting = {}
+        self.__receiver = asyncio.ensure_future(self.__receive())
+
+    @classmethod
+    async def connect(
+        cls, host: str = "127.0.0.1", port: int = 0, typecode: str = "q"
+    ) -> TreeClient:
+        """Connect to a server listening on a TCP socket.
+
+        Args:
+            host (str, optional): The address of the server.
+            port (int, optional): The port of the server.
+            typecode (str, optional): The typecode of the values.
+
+        Returns:
+            TreeClient: The client.
+        """
+
+        reader, writer = await asyncio.open_connection(host, port)
+
+        return cls(reader, writer, typecode)
+
+    @classmethod
+    async def connect_unix(cls, path: str, typecode: str = "q") -> TreeClient:
+        """Connect to a server listening on a Unix socket.
+
+        Args:
+            path (str): The path of the socket.
+            typecode (str, optional): The typecode of the values.
+
+        Returns:
+            TreeClient: The client.
+        """
+
+        reader, writer = await asyncio.open_unix_connection(path)
+
+        return cls(reader, writer, typecode)
+
+    async def close(self) -> None:
+        """Close the connection. Requests still waiting for a response fail
+        with a ConnectionError."""
+
+        self.__writer.close()
+        await self.__receiver
+
+        try:
+            await self.__writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def __aenter__(self) -> TreeClient:
+        """Use the client as an asynchronous context manager, which closes it
+        on exit.
+
+        Returns:
+            TreeClient: The client.
+        """
+
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Close the client."""
+
+        await self.close()
+
+    async def add(self, value: Union[int, float]) -> bool:
+        """Add a value to the tree.
+
+        Args:
+            value (Union[int, float]): The value to be added.
+
+        Returns:
+            bool: True if the value was added, False if it already exists.
+        """
+
+        return await self.__call(Protocol.ADD, value) == b"\x01"
+
+    async def remove(self, value: Union[int, float]) -> bool:
+        """Remove a value from the tree.
+
+        Args:
+            value (Union[int, float]): The value to be removed.
+
+        Returns:
+            bool: True if the value was removed, False if it does not exist.
+        """
+
+        return await self.__call(Protocol.REMOVE, value) == b"\x01"
+
+    async def contains(self, value: Union[int, float]) -> bool:
+        """Determine whether a value exists within the tree.
+
+        Args:
+            value (Union[int, float]): The value queried.
+
+        Returns:
+            bool: True if the value exists.
+        """
+
+        return await self.__call(Protocol.CONTAINS, value) == b"\x01"
+
+    async def rank(self, value: Union[int, float]) -> int:
+        """Count the values in the tree which are less than the queried value.
+
+        Args:
+            value (Union[int, float]): The value queried.
+
+        Returns:
+            int: The number of values less than the queried value.
+        """
+
+        return struct.unpack("<Q", await self.__call(Protocol.RANK, value))[0]
+
+    async def range(
+        self, low: Optional[Union[int, float]] = None, high: Optional[Union[int, float]] = None
+    ) -> AsyncIterator[Union[int, float]]:
+        """Iterate over the values between low and high, both included, as
+        the server streams them. The server sends the whole range even if the
+        iteration stops early.
+
+        Args:
+            low (Optional[Union[int, float]], optional): The lower bound, None for no lower bound.
+            high (Optional[Union[int, float]], optional): The upper bound, None for no upper bound.
+
+        Raises:
+            ValueError: If the server rejects the request.
+            ConnectionError: If the connection is lost.
+
+        Yields:
+            Union[int, float]: The values between low and high, in ascending order.
+        """
+
+        flags = (Protocol.HAS_LOW if low is not None else 0) | (
+            Protocol.HAS_HIGH if high is not None else 0
+        )
+        payload = self.__pack(self.__bounds, flags, low or 0, high or 0)
+        queue = asyncio.Queue()
+        request = self.__send(Protocol.RANGE, payload, queue)
+        await self.__writer.drain()
+
+        try:
+            while True:
+                code, payload = await queue.get()
+
+                if code == Protocol.VALUES:
+                    for value in Protocol.unpack_values(payload, self.typecode):
+                        yield value
+                elif code == Protocol.END:
+                    break
+                else:
+                    self.__raise(code, payload)
+        finally:
+            self.__waiting.pop(request, None)
+
+    async def __call(self, code: int, value: Union[int, float]) -> bytes:
+        """Send a request for a single value and wait for its result.
+
+        Args:
+            code (int): The operation.
+            value (Union[int, float]): The value.
+
+        Raises:
+            ValueError: If the server rejects the request.
+            ConnectionError: If the connection is lost.
+
+        Returns:
+            bytes: The payload of the result.
+        """
+
+        future = asyncio.get_running_loop().create_future()
+        self.__send(code, self.__pack(self.__value, value), future)
+        await self.__writer.drain()
+        code, payload = await future
+
+        if code != Protocol.RESULT:
+            self.__raise(code, payload)
+
+        return payload
+
+    def __pack(self, layout: struct.Struct, *values: Union[int, float]) -> bytes:
+        """Pack the arguments of a request.
+
+        Args:
+            layout (struct.Struct): The layout of the payload.
+            *values (Union[int, float]): The arguments.
+
+        Raises:
+            TypeError: If the values cannot be packed with the typecode.
+
+        Returns:
+            bytes: The payload.
+        """
+
+        try:
+            return layout.pack(*values)
+        except struct.error as error:
+            raise TypeError(f"cannot send values with typecode {self.typecode!r}") from error
+
+    def __send(
+        self, code: int, payload: bytes, waiter: Union[asyncio.Future, asyncio.Queue]
+    ) -> int:
+        """Send a request, registering what waits for its responses.
+
+        Args:
+            code (int): The operation.
+            payload (bytes): The payload.
+            waiter (Union[asyncio.Future, asyncio.Queue]): The future of the result, or the queue
+            of the frames of a range.
+
+        Raises:
+            ConnectionError: If the connection is closed.
+
+        Returns:
+            int: The id of the request.
+        """
+
+        if self.__receiver.done():
+            raise ConnectionError("the connection is closed")
+
+        request = self.__request
+        self.__request = (request + 1) & 0xFFFFFFFF
+        self.__waiting[request] = waiter
+        self.__writer.write(Protocol.frame(request, code, payload))
+
+        return request
+
+    async def __receive(self) -> None:
+        """Read the responses until the connection is closed, handing each one
+        to whatever waits for it. Once the connection is closed, every waiter
+        fails with a ConnectionError."""
+
+        try:
+            while True:
+                request, code, payload = await Protocol.read(self.__reader)
+                waiter = self.__waiting.get(request)
+
+                if isinstance(waiter, asyncio.Queue):
+                    waiter.put_nowait((code, payload))
+                elif waiter is not None:
+                    del self.__waiting[request]
+
+                    if not waiter.done():
+                        waiter.set_result((code, payload))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for waiter in self.__waiting.values():
+                if isinstance(waiter, asyncio.Queue):
+                    waiter.put_nowait((None, b"the connection is closed"))
+                elif not waiter.done():
+                    waiter.set_exception(ConnectionError("the connection is closed"))
+
+            self.__waiting.clear()
+
+    @staticmethod
+    def __raise(code: Optional[int], payload: bytes) -> None:
+        """Raise the error reported by a response.
+
+        Args:
+            code (Optional[int]): The response code, None if the connection was lost.
+            payload (bytes): The reason.
+
+        Raises:
+            ConnectionError: If the connection was lost.
+            ValueError: If the server rejected the request.
+        """
+
+        if code is None:
+            raise ConnectionError(payload.decode())
+
+        raise ValueError(payload.decode())
@@ -0,0 +1,310 @@
+"""This module allows the user to serve an AVL tree over a TCP or Unix socket
+with asyncio."""
+from __future__ import annotations
+
+import asyncio
+import struct
+
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.tree.avl_tree import AVLTree
+
+from src.network.protocol import Protocol
+
+
+class TreeServer(object):
+    """A tree server answers the requests of TreeClients (see Protocol)
+    against a single tree, which is only ever accessed from the event loop, so
+    it needs no locking.
+
+    Requests are not executed as they arrive. Every request read from any
+    connection is queued, and the queue is executed on the next tick of the
+    event loop, so the requests which arrive together, from pipelining clients
+    or from many connections, are coalesced into batches, which are executed
+    with add_many, remove_many or contains_many and share their sorting and
+    descents. Requests are only reordered where they commute, so the requests
+    of a connection take effect in the order they were sent.
+
+    A range is streamed in chunks of RANGE_CHUNK values. The first chunk is
+    sent as the request is executed, before any later request, so a range
+    shorter than a chunk observes exactly the requests read before it. The
+    server yields to the event loop between the following chunks, and every
+    chunk resumes after the last value sent, so a long range neither blocks
+    other requests nor holds on to nodes which may be rotated away in the
+    meantime; it sees every value which stays in the tree while it is
+    streamed.
+
+    Attributes:
+        RANGE_CHUNK (int): The most values sent in a single frame of a range.
+        batches (int): The number of batches of add, remove and contains requests executed.
+        requests (int): The number of requests executed.
+        tree (AVLTree): The tree served.
+        typecode (str): The typecode of the values.
+    """
+
+    RANGE_CHUNK = 1024
+
+    def __init__(self, tree: Optional[AVLTree] = None, typecode: str = "q"):
+        """Initialize the tree server.
+
+        Args:
+            tree (Optional[AVLTree], optional): The tree to be served, e.g. a journaled tree. By
+            default, an empty tree.
+            typecode (str, optional): The typecode of the values, "q" for 64-bit integers or "d"
+            for double precision floats.
+        """
+
+        self.tree = tree if tree is not None else AVLTree()
+        self.typecode = typecode
+        self.batches = 0
+        self.requests = 0
+        self.__value = struct.Struct("<" + typecode)
+        self.__bounds = struct.Struct("<B" + typecode * 2)
+        self.__pending = []
+        self.__scheduled = False
+        self.__server = None
+        self.__streams = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> Tuple[str, int]:
+        """Start listening on a TCP socket.
+
+        Args:
+            host (str, optional): The address to listen on.
+            port (int, optional): The port to listen on. By default, any free port.
+
+        Returns:
+            Tuple[str, int]: The address and port listened on.
+        """
+
+        self.__server = await asyncio.start_server(self.__serve, host, port)
+
+        return self.__server.sockets[0].getsockname()[:2]
+
+    async def start_unix(self, path: str) -> None:
+        """Start listening on a Unix socket.
+
+        Args:
+            path (str): The path of the socket.
+        """
+
+        self.__server = await asyncio.start_unix_server(self.__serve, path)
+
+    async def serve_forever(self) -> None:
+        """Serve requests until the server is closed."""
+
+        await self.__server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop listening, stop streaming ranges and wait for the server to
+        close."""
+
+        self.__server.close()
+
+        for stream in list(self.__streams):
+            stream.cancel()
+
+        await self.__server.wait_closed()
+
+    async def __aenter__(self) -> TreeServer:
+        """Use the server as an asynchronous context manager, which closes it
+        on exit.
+
+        Returns:
+            TreeServer: The server.
+        """
+
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Close the server."""
+
+        await self.close()
+
+    async def __serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Read the requests of a connection until it is closed, queueing them
+        for the next batch.
+
+        Args:
+            reader (asyncio.StreamReader): The stream of requests.
+            writer (asyncio.StreamWriter): The stream of responses.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        try:
+            while True:
+                request, code, payload = await Protocol.read(reader)
+                self.__pending.append((writer, request, code, payload))
+
+                if not self.__scheduled:
+                    self.__scheduled = True
+                    loop.call_soon(self.__execute)
+
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def __execute(self) -> None:
+        """Execute the queued requests. Requests for different values commute,
+        so the requests to add, remove and look up values are gathered into a
+        segment as long as no value repeats, and the segment is executed as (at
+        most) three batches. A repeated value, or a request to rank a value or
+        to stream a range, ends the segment, so every request observes all the
+        requests read before it. A request which fails is answered with an
+        error, and the requests after it are still executed.
+        """
+
+        self.__scheduled = False
+        pending, self.__pending = self.__pending, []
+        segment = {}
+        values = set()
+
+        for writer, request, code, payload in pending:
+            self.requests += 1
+
+            try:
+                if code in (Protocol.ADD, Protocol.REMOVE, Protocol.CONTAINS):
+                    (value,) = self.__value.unpack(payload)
+
+                    if value in values:
+                        self.__segment(segment)
+                        values.clear()
+
+                    values.add(value)
+                    segment.setdefault(code, []).append((writer, request, value))
+                    continue
+
+                self.__segment(segment)
+                values.clear()
+
+                if code == Protocol.RANK:
+                    (value,) = self.__value.unpack(payload)
+                    rank = struct.pack("<Q", self.tree.rank(value))
+                    writer.write(Protocol.frame(request, Protocol.RESULT, rank))
+                elif code == Protocol.RANGE:
+                    flags, low, high = self.__bounds.unpack(payload)
+                    low = low if flags & Protocol.HAS_LOW else None
+                    high = high if flags & Protocol.HAS_HIGH else None
+
+                    last = self.__chunk(writer, request, low, high, (True, True))
+
+                    if last is not None:
+                        stream = asyncio.ensure_future(self.__stream(writer, request, last, high))
+                        self.__streams.add(stream)
+                        stream.add_done_callback(self.__streams.discard)
+                else:
+                    writer.write(Protocol.frame(request, Protocol.ERROR, b"unknown operation"))
+            except struct.error:
+                writer.write(Protocol.frame(request, Protocol.ERROR, b"malformed request"))
+            except Exception as error:
+                writer.write(Protocol.frame(request, Protocol.ERROR, str(error).encode()))
+
+        self.__segment(segment)
+
+    def __segment(self, segment: Dict[int, List[Tuple[asyncio.StreamWriter, int, Any]]]) -> None:
+        """Execute the requests of a segment as one batch per operation and
+        write the responses. If a batch fails, every request of the batch is
+        answered with an error, and the other batches are still executed. The
+        segment is emptied.
+
+        Args:
+            segment (Dict[int, List[Tuple[asyncio.StreamWriter, int, Any]]]): The connection, id
+            and value of every request, by operation.
+        """
+
+        for code, batch in segment.items():
+            self.batches += 1
+
+            try:
+                mask = self.__many(code)([value for _, _, value in batch]).mask
+            except Exception as error:
+                for writer, request, _ in batch:
+                    writer.write(Protocol.frame(request, Protocol.ERROR, str(error).encode()))
+
+                continue
+
+            for (writer, request, _), result in zip(batch, mask):
+                payload = b"\x01" if result else b"\x00"
+                writer.write(Protocol.frame(request, Protocol.RESULT, payload))
+
+        segment.clear()
+
+    def __many(self, code: int) -> Callable[[List[Any]], Any]:
+        """Get the batched method of the tree which executes an operation.
+
+        Args:
+            code (int): The operation.
+
+        Returns:
+            Callable[[List[Any]], BatchResult]: The batched method.
+        """
+
+        if code == Protocol.ADD:
+            return self.tree.add_many
+
+        if code == Protocol.REMOVE:
+            return self.tree.remove_many
+
+        return self.tree.contains_many
+
+    def __chunk(
+        self,
+        writer: asyncio.StreamWriter,
+        request: int,
+        low: Optional[Any],
+        high: Optional[Any],
+        inclusive: Tuple[bool, bool],
+    ) -> Optional[Any]:
+        """Send the next chunk of a range, followed by the END frame if it is
+        the last one.
+
+        Args:
+            writer (asyncio.StreamWriter): The stream of responses.
+            request (int): The id of the request.
+            low (Optional[Any]): The lower bound, None for no lower bound.
+            high (Optional[Any]): The upper bound, None for no upper bound.
+            inclusive (Tuple[bool, bool]): Whether the lower and upper bounds are included.
+
+        Returns:
+            Optional[Any]: The last value sent if the range goes on, otherwise None.
+        """
+
+        chunk = list(islice(self.tree.irange(low, high, inclusive), self.RANGE_CHUNK))
+
+        if chunk:
+            payload = Protocol.pack_values(chunk, self.typecode)
+            writer.write(Protocol.frame(request, Protocol.VALUES, payload))
+
+        if len(chunk) < self.RANGE_CHUNK:
+            writer.write(Protocol.frame(request, Protocol.END))
+            return None
+
+        return chunk[-1]
+
+    async def __stream(
+        self, writer: asyncio.StreamWriter, request: int, low: Any, high: Optional[Any]
+    ) -> None:
+        """Stream the rest of a range to a connection, one chunk at a time,
+        once its first chunk has been sent.
+
+        Args:
+            writer (asyncio.StreamWriter): The stream of responses.
+            request (int): The id of the request.
+            low (Any): The last value sent, which the next chunk starts after.
+            high (Optional[Any]): The upper bound, None for no upper bound.
+        """
+
+        try:
+            while low is not None:
+                await writer.drain()
+                await asyncio.sleep(0)
+
+                if writer.is_closing():
+                    break
+
+                low = self.__chunk(writer, request, low, high, (False, True))
+        except ConnectionError:
+            pass
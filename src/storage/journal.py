@@ -0,0 +1,637 @@
+"""This module allows the user to make an AVL tree durable with a write-ahead
+journal of its mutations, replayed on top of the latest snapshot."""
+from __future__ import annotations
+
+import os
+import re
+import struct
+import threading
+import zlib
+
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from src.storage.snapshot import Snapshot
+from src.tree.shadow import Shadow
+
+JOURNALED_OPERATIONS = (
+    "add",
+    "remove",
+    "extend",
+    "add_many",
+    "remove_many",
+    "pop_min",
+    "pop_max",
+    "_consume",
+)
+
+SET_OPERATIONS = ("join", "union", "intersection", "difference")
+
+
+class Journal(object):
+    """A journal records every mutation of a single tree, so that the tree
+    can be recovered after a crash. It is attached by AVLTree.recover, which
+    shadows the mutating methods on that tree instance only, like an
+    instrumentation does.
+
+    The state of a tree is kept in a directory as a sequence of generations.
+    The snapshot of generation g holds the values of the tree when generation
+    g started, and the journal of generation g holds every mutation since.
+    Each mutation is appended to the journal as a compact binary record (an
+    operation byte followed by the value, packed with the snapshot's typecode)
+    once it has been applied to the tree. Records are not written one at a
+    time: they are buffered, and a background thread writes the buffer as a
+    single checksummed batch and flushes it to disk (group commit) whenever it
+    holds sync_bytes or sync_interval seconds have passed. A crash therefore
+    loses at most the mutations of the last sync_interval seconds, unless sync
+    is called, and a batch torn by a crash is detected by its checksum and
+    discarded on recovery.
+
+    Once the journal of the current generation exceeds compact_bytes, it is
+    compacted: the values of the tree are copied into an array, a new
+    generation is started, and the background thread writes the array to the
+    new snapshot and deletes the older files. Until the snapshot is complete,
+    the older generations remain valid, so the tree can be recovered at any
+    point. The tree itself is only ever accessed by the thread using it, so
+    it need not be thread-safe, but the journal must be closed before exit.
+
+    The set operations (join, union, intersection and difference) leave the
+    tree empty and return a new tree, so the journal moves to the result, and
+    a new generation holding the result is compacted before they return, in
+    O(n) time. A split leaves the journaled tree empty, and journals that.
+    Only the values of a tree are journaled: AVLMap, IntervalAVLTree,
+    PersistentAVLTree and MappedAVLTree cannot be recovered.
+
+    Attributes:
+        FRAME (struct.Struct): The header of a batch of records: its length and checksum.
+        HEADER (struct.Struct): The header of a journal file.
+        MAGIC (bytes): The magic number identifying a journal file.
+        VERSION (int): The version of the format.
+        compact_bytes (int): The size of the journal which triggers a compaction.
+        directory (str): The directory holding the snapshots and journals.
+        generation (int): The current generation.
+        sync_bytes (int): The size of the buffered records which triggers a sync.
+        sync_interval (float): The longest time, in seconds, records remain buffered.
+        typecode (str): The typecode of the values.
+    """
+
+    FRAME = struct.Struct("<II")
+    HEADER = struct.Struct("<4sBc2xQ")
+    MAGIC = b"AVLJ"
+    VERSION = 1
+
+    ADD = 1
+    REMOVE = 2
+    CLEAR = 3
+
+    def __init__(
+        self,
+        tree: Any,
+        directory: str,
+        generation: int,
+        typecode: str,
+        sync_bytes: int,
+        sync_interval: float,
+        compact_bytes: int,
+    ):
+        """Initialize the journal, open the journal file of the generation and
+        attach the journal to the tree. Use Journal.recover instead.
+
+        Args:
+            tree (AVLTree): The tree to be journaled, holding the state of the generation.
+            directory (str): The directory holding the snapshots and journals.
+            generation (int): The current generation.
+            typecode (str): The typecode of the values.
+            sync_bytes (int): The size of the buffered records which triggers a sync.
+            sync_interval (float): The longest time, in seconds, records remain buffered.
+            compact_bytes (int): The size of the journal which triggers a compaction.
+        """
+
+        self.directory = directory
+        self.generation = generation
+        self.typecode = typecode
+        self.sync_bytes = sync_bytes
+        self.sync_interval = sync_interval
+        self.compact_bytes = compact_bytes
+        self.__tree = tree
+        self.__record = struct.Struct("<B" + typecode)
+        self.__buffer = bytearray()
+        self.__depth = 0
+        self.__error = None
+        self.__pending = None
+        self.__closing = False
+        self.__condition = threading.Condition()
+        self.__file_lock = threading.RLock()
+        self.__idle = threading.Event()
+        self.__idle.set()
+        self.__file = self.__open(generation)
+        self.__written = self.__file.tell()
+        self.__attach(tree)
+
+        self.__thread = threading.Thread(target=self.__run, name="journal", daemon=True)
+        self.__thread.start()
+
+    @staticmethod
+    def recover(
+        cls: Type,
+        directory: str,
+        typecode: str = "q",
+        sync_bytes: int = 1 << 16,
+        sync_interval: float = 0.05,
+        compact_bytes: int = 1 << 26,
+    ) -> Any:
+        """Recover a tree from a directory, which is created if needed: load
+        the latest snapshot, replay the journals of that generation and later
+        ones, discard a batch torn by a crash and delete the files which are no
+        longer needed. A journal is then attached to the tree.
+
+        Args:
+            cls (Type[AVLTree]): The type of the tree to be recovered.
+            directory (str): The directory holding the snapshots and journals.
+            typecode (str, optional): The typecode of the values, if the directory holds no
+            snapshot or journal yet.
+            sync_bytes (int, optional): The size of the buffered records which triggers a sync.
+            sync_interval (float, optional): The longest time, in seconds, records remain
+            buffered.
+            compact_bytes (int, optional): The size of the journal which triggers a compaction.
+
+        Raises:
+            ValueError: If a file is not a valid journal, is corrupt before its end, or holds
+            values of another typecode.
+
+        Returns:
+            AVLTree: The recovered tree.
+        """
+
+        os.makedirs(directory, exist_ok=True)
+
+        generations = Journal.__generations(directory)
+        base = max(generations["snapshot"], default=0)
+        tree = cls()
+        stored = None
+
+        if base:
+            values, stored = Snapshot.read(Journal.__path(directory, "snapshot", base), False)
+            tree._assign(values.tolist())
+
+        journals = [generation for generation in generations["journal"] if generation >= base]
+
+        for index, generation in enumerate(journals):
+            path = Journal.__path(directory, "journal", generation)
+            stored, end, complete = Journal.__replay(tree, path, stored)
+
+            if not complete:
+                if index < len(journals) - 1:
+                    raise ValueError(f"{path} is corrupt")
+
+                os.truncate(path, end)
+
+        for kind, kept in generations.items():
+            for generation in kept:
+                if generation < base:
+                    os.remove(Journal.__path(directory, kind, generation))
+
+        for name in os.listdir(directory):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(directory, name))
+
+        generation = max(journals, default=base)
+        typecode = stored or typecode
+        tree.journal = Journal(
+            tree, directory, generation, typecode, sync_bytes, sync_interval, compact_bytes
+        )
+
+        return tree
+
+    def __enter__(self) -> Journal:
+        """Use the journal as a context manager, which closes it on exit.
+
+        Returns:
+            Journal: The journal.
+        """
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the journal."""
+
+        self.close()
+
+    def sync(self) -> None:
+        """Write the buffered records as one batch and flush them to disk,
+        after which every mutation so far survives a crash.
+        """
+
+        with self.__file_lock:
+            with self.__condition:
+                batch = self.__buffer
+                self.__buffer = bytearray()
+
+            if batch:
+                self.__file.write(Journal.FRAME.pack(len(batch), zlib.crc32(batch)))
+                self.__file.write(batch)
+                self.__file.flush()
+                os.fsync(self.__file.fileno())
+
+    def compact(self, wait: bool = False) -> None:
+        """Start a new generation whose snapshot holds the current values of
+        the tree. The values are copied right away, in time linear in the size
+        of the tree, and written to disk in the background.
+
+        Args:
+            wait (bool, optional): True to wait until the snapshot is written.
+        """
+
+        self.__idle.wait()
+        self.__raise()
+
+        values = array(self.typecode, self.__tree)
+
+        with self.__file_lock:
+            self.sync()
+            self.__file.close()
+            self.generation += 1
+            self.__file = self.__open(self.generation)
+
+        with self.__condition:
+            self.__written = 0
+            self.__pending = (self.generation, values)
+            self.__idle.clear()
+            self.__condition.notify()
+
+        if wait:
+            self.__idle.wait()
+            self.__raise()
+
+    def close(self) -> None:
+        """Sync the buffered records, wait for a compaction in progress, stop
+        the background thread and detach the journal from the tree, which is
+        no longer journaled.
+
+        Raises:
+            OSError: If the background thread failed to write to disk.
+        """
+
+        with self.__condition:
+            self.__closing = True
+            self.__condition.notify()
+
+        self.__thread.join()
+        self.__file.close()
+        self.detach()
+
+        if self.__tree.journal is self:
+            self.__tree.journal = None
+
+        self.__raise()
+
+    def detach(self, tree: Optional[Any] = None) -> None:
+        """Remove the wrappers from the tree, restoring the methods it had
+        before the journal was attached. Wrappers shadowing the same methods,
+        e.g. those of an instrumentation attached since, are kept.
+
+        Args:
+            tree (Optional[AVLTree], optional): The tree to remove every wrapper from, if not
+            the journaled tree itself, e.g. a shallow copy of it.
+        """
+
+        for name, wrapper in reversed(self.__wrappers):
+            if tree is None:
+                Shadow.detach(self.__tree, name, wrapper)
+            else:
+                tree.__dict__.pop(name, None)
+
+    def move(self, tree: Any) -> None:
+        """Journal the mutations of another tree instead, which must hold the
+        same values, e.g. a copy replacing the journaled tree. The wrappers are
+        removed from the journaled tree, which is no longer journaled.
+
+        Args:
+            tree (AVLTree): The tree to be journaled from now on.
+        """
+
+        self.detach()
+        self.__tree.journal = None
+        self.__tree = tree
+        self.__attach(tree)
+        tree.journal = self
+
+    def __attach(self, tree: Any) -> None:
+        """Shadow the mutating methods of the tree with wrappers which record
+        them. See Shadow.
+
+        Args:
+            tree (AVLTree): The tree to be journaled.
+        """
+
+        self.__wrappers = [(name, self.__operation(name)) for name in JOURNALED_OPERATIONS]
+        self.__wrappers += [(name, self.__set_operation()) for name in SET_OPERATIONS]
+
+        for name, wrapper in self.__wrappers:
+            Shadow.attach(tree, name, wrapper)
+
+    @staticmethod
+    def __path(directory: str, kind: str, generation: int) -> str:
+        """Get the path of the snapshot or journal of a generation.
+
+        Args:
+            directory (str): The directory holding the snapshots and journals.
+            kind (str): Either "snapshot" or "journal".
+            generation (int): The generation.
+
+        Returns:
+            str: The path of the file.
+        """
+
+        extension = "avls" if kind == "snapshot" else "log"
+
+        return os.path.join(directory, f"{kind}-{generation:08d}.{extension}")
+
+    @staticmethod
+    def __generations(directory: str) -> Dict[str, List[int]]:
+        """Find the generations of the snapshots and journals in a directory.
+
+        Args:
+            directory (str): The directory holding the snapshots and journals.
+
+        Returns:
+            Dict[str, List[int]]: The generations of the snapshots and of the journals, in
+            ascending order.
+        """
+
+        generations = {"snapshot": [], "journal": []}
+
+        for name in sorted(os.listdir(directory)):
+            match = re.fullmatch(r"(snapshot|journal)-(\d+)\.(?:avls|log)", name)
+
+            if match:
+                generations[match.group(1)].append(int(match.group(2)))
+
+        return generations
+
+    @staticmethod
+    def __replay(tree: Any, path: str, typecode: Optional[str]) -> Tuple[str, int, bool]:
+        """Apply the records of a journal file to a tree, up to the end of the
+        file or the first incomplete or corrupt batch.
+
+        Args:
+            tree (AVLTree): The tree, which must not be journaled.
+            path (str): The path of the journal file.
+            typecode (Optional[str]): The typecode of the values, if known.
+
+        Raises:
+            ValueError: If the file is not a journal or holds values of another typecode.
+
+        Returns:
+            Tuple[str, int, bool]: The typecode of the values, the length of the valid part of the
+            file and whether the whole file is valid.
+        """
+
+        with open(path, "rb") as file:
+            data = memoryview(file.read())
+
+        if len(data) < Journal.HEADER.size:
+            return typecode, 0, False
+
+        magic, version, stored, _ = Journal.HEADER.unpack_from(data)
+        stored = stored.decode()
+
+        if magic != Journal.MAGIC or version != Journal.VERSION:
+            raise ValueError(f"{path} is not a journal file")
+
+        if typecode is not None and stored != typecode:
+            raise ValueError(f"{path} holds values of typecode {stored!r}, not {typecode!r}")
+
+        record = struct.Struct("<B" + stored)
+        offset = Journal.HEADER.size
+
+        while offset + Journal.FRAME.size <= len(data):
+            length, checksum = Journal.FRAME.unpack_from(data, offset)
+            start = offset + Journal.FRAME.size
+            batch = data[start:start + length]
+
+            if len(batch) < length or zlib.crc32(batch) != checksum:
+                break
+
+            for operation, value in record.iter_unpack(batch):
+                if operation == Journal.ADD:
+                    tree.add(value)
+                elif operation == Journal.REMOVE:
+                    tree.remove(value)
+                else:
+                    tree._consume()
+
+            offset = start + length
+
+        return stored, offset, offset == len(data)
+
+    @staticmethod
+    def __sync_directory(directory: str) -> None:
+        """Flush a directory to disk, so the files created, renamed or deleted
+        in it survive a crash. Some platforms cannot open directories, in which
+        case nothing is done.
+
+        Args:
+            directory (str): The directory.
+        """
+
+        if hasattr(os, "O_DIRECTORY"):
+            descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+
+            try:
+                os.fsync(descriptor)
+            finally:
+                os.close(descriptor)
+
+    def __open(self, generation: int) -> Any:
+        """Open the journal file of a generation for appending, writing its
+        header if it is new.
+
+        Args:
+            generation (int): The generation.
+
+        Returns:
+            BinaryIO: The journal file.
+        """
+
+        file = open(Journal.__path(self.directory, "journal", generation), "ab")
+
+        if not file.tell():
+            file.write(
+                Journal.HEADER.pack(
+                    Journal.MAGIC, Journal.VERSION, self.typecode.encode(), generation
+                )
+            )
+            file.flush()
+            os.fsync(file.fileno())
+            Journal.__sync_directory(self.directory)
+
+        return file
+
+    def __operation(self, name: str) -> Callable:
+        """Wrap one of the tree's mutating methods to record its arguments once
+        it has returned. Mutations which are rejected are recorded as well,
+        since replaying them rejects them again, and a pop is recorded as the
+        removal of the value it returned. Calls made by another wrapped method
+        are part of that method's record.
+
+        Args:
+            name (str): The name of the method.
+
+        Returns:
+            Callable: The wrapper.
+        """
+
+        pack = self.__record.pack
+        operation = Journal.REMOVE if name.startswith("remove") else Journal.ADD
+        batch = name in ("extend", "add_many", "remove_many")
+
+        def wrapper(*args, **kwargs):
+            if self.__depth:
+                return wrapper.__wrapped__(*args, **kwargs)
+
+            self.__raise()
+
+            if name == "_consume":
+                records = pack(Journal.CLEAR, 0)
+            elif name.startswith("pop"):
+                records = None
+            else:
+                values = args[0]
+
+                if not batch:
+                    values = [values]
+                elif type(values).__module__ == "numpy":
+                    values = values.tolist()
+                else:
+                    # The batch may be a one-shot iterator, so the method is given the copy
+                    values = list(values)
+                    args = (values,) + args[1:]
+
+                try:
+                    records = b"".join(
+                        pack(operation, value) for value in values if value is not None
+                    )
+                except struct.error as error:
+                    raise TypeError(
+                        f"cannot journal values with typecode {self.typecode!r}"
+                    ) from error
+
+            self.__depth += 1
+
+            try:
+                result = wrapper.__wrapped__(*args, **kwargs)
+            finally:
+                self.__depth -= 1
+
+            self.__append(pack(Journal.REMOVE, result) if records is None else records)
+
+            return result
+
+        return wrapper
+
+    def __set_operation(self) -> Callable:
+        """Wrap one of the tree's set operations to move the journal to the
+        tree it returns. The operation consumes the tree without recording a
+        CLEAR, and a new generation holding the result is compacted before it
+        returns, so a crash recovers either the tree or the result.
+
+        Returns:
+            Callable: The wrapper.
+        """
+
+        def wrapper(*args, **kwargs):
+            if self.__depth:
+                return wrapper.__wrapped__(*args, **kwargs)
+
+            self.__raise()
+            self.__depth += 1
+
+            try:
+                result = wrapper.__wrapped__(*args, **kwargs)
+            finally:
+                self.__depth -= 1
+
+            self.move(result)
+            self.compact(wait=True)
+
+            return result
+
+        return wrapper
+
+    def __append(self, records: bytes) -> None:
+        """Buffer records, waking the background thread once the buffer is
+        large enough, and start a compaction once the journal is.
+
+        Args:
+            records (bytes): The packed records.
+        """
+
+        with self.__condition:
+            self.__buffer += records
+            self.__written += len(records)
+
+            if len(self.__buffer) >= self.sync_bytes:
+                self.__condition.notify()
+
+        if self.__written >= self.compact_bytes and self.__idle.is_set():
+            self.compact()
+
+    def __run(self) -> None:
+        """Run the background thread: sync the buffered records whenever the
+        buffer is large enough or sync_interval has passed, and write the
+        snapshot of a new generation.
+        """
+
+        while True:
+            with self.__condition:
+                if not (
+                    self.__closing or self.__pending or len(self.__buffer) >= self.sync_bytes
+                ):
+                    self.__condition.wait(self.sync_interval)
+
+                pending, self.__pending = self.__pending, None
+                closing = self.__closing
+
+            try:
+                self.sync()
+
+                if pending:
+                    self.__snapshot(*pending)
+            except OSError as error:
+                self.__error = error
+            finally:
+                if pending:
+                    self.__idle.set()
+
+            if closing:
+                return
+
+    def __snapshot(self, generation: int, values: array) -> None:
+        """Write the snapshot of a generation, then delete the files of the
+        older generations, which it supersedes.
+
+        Args:
+            generation (int): The generation.
+            values (array): The values of the tree when the generation started.
+        """
+
+        path = Journal.__path(self.directory, "snapshot", generation)
+        Snapshot.write(path + ".tmp", values, self.typecode, sync=True)
+        os.replace(path + ".tmp", path)
+        Journal.__sync_directory(self.directory)
+
+        for kind, kept in Journal.__generations(self.directory).items():
+            for older in kept:
+                if older < generation:
+                    os.remove(Journal.__path(self.directory, kind, older))
+
+    def __raise(self) -> None:
+        """Raise the error the background thread failed with, if any.
+
+        Raises:
+            OSError: The error.
+        """
+
+        if self.__error:
+            raise self.__error
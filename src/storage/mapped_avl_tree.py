@@ -0,0 +1,352 @@
+"""This module allows the user to query a memory-mapped snapshot as if it were
+an AVL tree, without building the tree up front."""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+from src.tree.avl_tree import AVLTree
+from src.tree.node import Node
+from src.tree.batch_result import BatchResult
+from src.tree.error_policy import ErrorPolicy
+
+
+class MappedAVLTree(AVLTree):
+    """A mapped AVL tree is returned by AVLTree.load when the snapshot is
+    memory-mapped. Until it is first modified, the tree has no nodes at all:
+    read-only queries are answered directly from the mapped sorted column by
+    binary search, so loading is O(1) and each query is O(log n). The first
+    mutation (or any other access to the root) thaws the tree, i.e. builds the
+    balanced tree from the column in linear time, after which it behaves
+    exactly like an AVLTree.
+
+    Attributes:
+        keys (Optional[Sequence[int]]): The mapped sorted values, or None once the tree is thawed.
+        typecode (str): The typecode of the values in the snapshot.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[Union[int, float]],
+        typecode: str,
+        error_policy: ErrorPolicy = ErrorPolicy.RETURN,
+    ):
+        """Initialize the mapped AVL tree.
+
+        Args:
+            keys (Sequence[Union[int, float]]): The distinct values, in ascending order.
+            typecode (str): The typecode of the values.
+            error_policy (ErrorPolicy, optional): What happens when an operation is rejected.
+        """
+
+        self.keys = None
+
+        super().__init__(error_policy)
+
+        self.keys = keys
+        self.typecode = typecode
+
+    @classmethod
+    def recover(
+        cls,
+        directory: str,
+        typecode: str = "q",
+        sync_bytes: int = 1 << 16,
+        sync_interval: float = 0.05,
+        compact_bytes: int = 1 << 26,
+    ) -> MappedAVLTree:
+        """Mapped trees are loaded from a snapshot, use AVLTree.recover to make a
+        tree durable instead.
+
+        Args:
+            directory (str): The directory holding the snapshots and journals.
+            typecode (str, optional): The typecode of the values.
+            sync_bytes (int, optional): The size of the buffered records which triggers a sync.
+            sync_interval (float, optional): The longest time, in seconds, records remain
+            buffered.
+            compact_bytes (int, optional): The size of the journal which triggers a compaction.
+
+        Raises:
+            TypeError: Always.
+        """
+
+        raise TypeError("a mapped tree cannot be recovered, use AVLTree.recover instead")
+
+    @property
+    def root(self) -> Optional[Node]:
+        """Get the root of the binary tree, thawing the tree first if needed.
+
+        Returns:
+            Optional[Node]: The root of the binary tree.
+        """
+
+        if self.keys is not None:
+            self.thaw()
+
+        return self.__root
+
+    @root.setter
+    def root(self, root: Optional[Node]) -> None:
+        """Set the root of the binary tree.
+
+        Args:
+            root (Optional[Node]): The new root of the binary tree.
+        """
+
+        self.__root = root
+
+    def thaw(self) -> None:
+        """Build the balanced tree from the mapped values and release the
+        mapping. Does nothing if the tree is already thawed. The nodes are built
+        aside, and the root is published before the mapped values are released,
+        so a query running meanwhile is answered from one or the other.
+        """
+
+        if self.keys is None:
+            return None
+
+        tree = AVLTree()
+        tree._assign(self.keys.tolist())
+
+        self.__root = tree.root
+        self.keys = None
+        self._reset()
+
+    def __len__(self) -> int:
+        """Get the number of values in the tree.
+
+        Returns:
+            int: The number of values in the tree.
+        """
+
+        if self.keys is None:
+            return super().__len__()
+
+        return len(self.keys)
+
+    def contains(self, value: int) -> bool:
+        """Determine whether the queried value exists within the tree.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            bool: A boolean value based on whether the value exists or not.
+        """
+
+        if self.keys is None:
+            return super().contains(value)
+
+        index = bisect_left(self.keys, value)
+
+        return index < len(self.keys) and self.keys[index] == value
+
+    def contains_many(self, values: Iterable[int]) -> BatchResult:
+        """Determine whether each value of a batch exists within the tree.
+
+        Args:
+            values (Iterable[int]): The values queried.
+
+        Returns:
+            BatchResult: The mask of values found, the number of values found and the number of
+            missing or null values.
+        """
+
+        if self.keys is None:
+            return super().contains_many(values)
+
+        is_array = type(values).__module__ == "numpy"
+        mask = [value is not None and self.contains(value) for value in values]
+        succeeded = sum(mask)
+
+        if is_array:
+            import numpy
+
+            mask = numpy.array(mask, dtype=bool)
+
+        return BatchResult(mask, succeeded, len(mask) - succeeded)
+
+    def rank(self, value: int) -> int:
+        """Count the values in the tree which are less than the queried value.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            int: The number of values less than the queried value.
+        """
+
+        if self.keys is None:
+            return super().rank(value)
+
+        return bisect_left(self.keys, value)
+
+    def select(self, index: int) -> int:
+        """Find the value at the queried index in ascending order.
+
+        Args:
+            index (int): The index of the value.
+
+        Raises:
+            IndexError: If the index is out of range.
+
+        Returns:
+            int: The value at the queried index.
+        """
+
+        if self.keys is None:
+            return super().select(index)
+
+        return self.keys[index]
+
+    def count_range(self, low: int, high: int) -> int:
+        """Count the values in the tree between low and high (both inclusive).
+
+        Args:
+            low (int): The lower bound.
+            high (int): The upper bound.
+
+        Returns:
+            int: The number of values in [low, high].
+        """
+
+        if self.keys is None:
+            return super().count_range(low, high)
+
+        if high < low:
+            return 0
+
+        return bisect_right(self.keys, high) - bisect_left(self.keys, low)
+
+    def irange(
+        self,
+        low: Optional[int] = None,
+        high: Optional[int] = None,
+        inclusive: Tuple[bool, bool] = (True, True),
+        reverse: bool = False,
+    ) -> Iterator[int]:
+        """Lazily iterate over the values between low and high.
+
+        Args:
+            low (Optional[int], optional): The lower bound, None for no lower bound.
+            high (Optional[int], optional): The upper bound, None for no upper bound.
+            inclusive (Tuple[bool, bool], optional): Whether the lower and upper bounds are
+            included, respectively.
+            reverse (bool, optional): True to iterate in descending order.
+
+        Returns:
+            Iterator[int]: The values between low and high.
+        """
+
+        if self.keys is None:
+            return super().irange(low, high, inclusive, reverse)
+
+        keys = self.keys
+        start, end = 0, len(keys)
+
+        if low is not None:
+            start = (bisect_left if inclusive[0] else bisect_right)(keys, low)
+
+        if high is not None:
+            end = (bisect_right if inclusive[1] else bisect_left)(keys, high)
+
+        if reverse:
+            return (keys[index] for index in range(end - 1, start - 1, -1))
+
+        return (keys[index] for index in range(start, end))
+
+    def floor(self, value: int) -> Optional[int]:
+        """Find the greatest value in the tree which is less than or equal to
+        the queried value.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            Optional[int]: The floor of the value, or None if there is none.
+        """
+
+        if self.keys is None:
+            return super().floor(value)
+
+        index = bisect_right(self.keys, value)
+
+        return self.keys[index - 1] if index else None
+
+    def ceiling(self, value: int) -> Optional[int]:
+        """Find the least value in the tree which is greater than or equal to
+        the queried value.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            Optional[int]: The ceiling of the value, or None if there is none.
+        """
+
+        if self.keys is None:
+            return super().ceiling(value)
+
+        index = bisect_left(self.keys, value)
+
+        return self.keys[index] if index < len(self.keys) else None
+
+    def successor(self, value: int) -> Optional[int]:
+        """Find the least value in the tree which is strictly greater than the
+        queried value.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            Optional[int]: The successor of the value, or None if there is none.
+        """
+
+        if self.keys is None:
+            return super().successor(value)
+
+        index = bisect_right(self.keys, value)
+
+        return self.keys[index] if index < len(self.keys) else None
+
+    def predecessor(self, value: int) -> Optional[int]:
+        """Find the greatest value in the tree which is strictly less than the
+        queried value.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            Optional[int]: The predecessor of the value, or None if there is none.
+        """
+
+        if self.keys is None:
+            return super().predecessor(value)
+
+        index = bisect_left(self.keys, value)
+
+        return self.keys[index - 1] if index else None
+
+    def min(self) -> Optional[int]:
+        """Get the least value of the tree.
+
+        Returns:
+            Optional[int]: The least value, or None if the tree is empty.
+        """
+
+        if self.keys is None:
+            return super().min()
+
+        return self.keys[0] if len(self.keys) else None
+
+    def max(self) -> Optional[int]:
+        """Get the greatest value of the tree.
+
+        Returns:
+            Optional[int]: The greatest value, or None if the tree is empty.
+        """
+
+        if self.keys is None:
+            return super().max()
+
+        return self.keys[-1] if len(self.keys) else None
@@ -0,0 +1,140 @@
+"""This module provides a compact binary snapshot format for the values of a
+tree, which can be written once and loaded (or memory-mapped) quickly."""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+
+from array import array
+from typing import Iterable, Tuple, Union
+
+
+class Snapshot:
+    """A snapshot file consists of a fixed-size header followed by the values
+    of the tree in ascending order, stored as a single column of fixed-width
+    little-endian numbers. The header holds a magic number, the format
+    version, the typecode of the values ("q" for 64-bit integers or "d" for
+    double precision floats) and the number of values.
+
+    Attributes:
+        HEADER (struct.Struct): The layout of the header.
+        MAGIC (bytes): The magic number identifying a snapshot file.
+        TYPECODES (Tuple[str, ...]): The supported typecodes of the values.
+        VERSION (int): The version of the format.
+    """
+
+    HEADER = struct.Struct("<4sBc2xQ")
+    MAGIC = b"AVLS"
+    TYPECODES = ("q", "d")
+    VERSION = 1
+
+    @staticmethod
+    def typecode_of(value: Union[int, float]) -> str:
+        """Determine the typecode used to store values of the same type as the
+        given value.
+
+        Args:
+            value (Union[int, float]): A value of the tree.
+
+        Raises:
+            TypeError: If the values cannot be stored in a snapshot.
+
+        Returns:
+            str: The typecode of the values.
+        """
+
+        if isinstance(value, int):
+            return "q"
+
+        if isinstance(value, float):
+            return "d"
+
+        raise TypeError(f"cannot store values of type {type(value).__name__} in a snapshot")
+
+    @staticmethod
+    def write(
+        path: str, values: Iterable[Union[int, float]], typecode: str, sync: bool = False
+    ) -> None:
+        """Write the values, which must be in ascending order, to a snapshot
+        file.
+
+        Args:
+            path (str): The path of the snapshot file.
+            values (Iterable[Union[int, float]]): The values, in ascending order.
+            typecode (str): The typecode of the values.
+            sync (bool, optional): True to flush the file to disk before returning.
+
+        Raises:
+            ValueError: If the typecode is not supported.
+        """
+
+        if typecode not in Snapshot.TYPECODES:
+            raise ValueError(f"unsupported typecode {typecode!r}")
+
+        column = array(typecode, values)
+
+        if sys.byteorder != "little":
+            column.byteswap()
+
+        with open(path, "wb") as file:
+            header = Snapshot.HEADER.pack(
+                Snapshot.MAGIC, Snapshot.VERSION, typecode.encode(), len(column)
+            )
+            file.write(header)
+            column.tofile(file)
+
+            if sync:
+                file.flush()
+                os.fsync(file.fileno())
+
+    @staticmethod
+    def read(path: str, use_mmap: bool = True) -> Tuple[Union[memoryview, array], str]:
+        """Read the values of a snapshot file. If memory mapping is requested,
+        the values are not copied: the file is mapped into memory and a view
+        of the mapped column is returned, so only the pages which are actually
+        accessed are ever read from disk.
+
+        Args:
+            path (str): The path of the snapshot file.
+            use_mmap (bool, optional): True to map the file instead of reading it.
+
+        Raises:
+            ValueError: If the file is not a valid snapshot, or is truncated.
+
+        Returns:
+            Tuple[Union[memoryview, array], str]: The values in ascending order and their
+            typecode.
+        """
+
+        with open(path, "rb") as file:
+            magic, version, typecode, count = Snapshot.HEADER.unpack(
+                file.read(Snapshot.HEADER.size)
+            )
+            typecode = typecode.decode()
+
+            if magic != Snapshot.MAGIC or version != Snapshot.VERSION:
+                raise ValueError(f"{path} is not a snapshot file")
+
+            if typecode not in Snapshot.TYPECODES:
+                raise ValueError(f"unsupported typecode {typecode!r}")
+
+            if use_mmap and count and sys.byteorder == "little":
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                start = Snapshot.HEADER.size
+                end = start + count * array(typecode).itemsize
+
+                if len(mapped) < end:
+                    mapped.close()
+                    raise ValueError(f"{path} is truncated: expected {count} values")
+
+                return memoryview(mapped)[start:end].cast(typecode), typecode
+
+            column = array(typecode)
+            column.fromfile(file, count)
+
+        if sys.byteorder != "little":
+            column.byteswap()
+
+        return column, typecode
@@ -0,0 +1,194 @@
+"""This module allows the user to create an AVL tree which answers aggregate
+queries, such as the sum of the values in a range, in logarithmic time."""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from src.tree.avl_tree import AVLTree
+from src.tree.monoid import Monoid
+from src.tree.aggregate_node import AggregateNode
+from src.tree.error_policy import ErrorPolicy
+
+
+class AggregateAVLTree(AVLTree):
+    """An aggregate AVL tree caches a monoid (a sum, minimum, maximum, count or
+    any associative combine function) over the subtree of every node. The
+    cache is recomputed in update, which every insertion, removal, rotation,
+    bulk build, split and join already calls on the nodes whose subtrees
+    change, and in the retrace for the ancestors above the point where the
+    heights stop changing. A range query then combines the cached aggregates
+    of O(log n) subtrees instead of visiting every value in the range.
+
+    Attributes:
+        monoid (Monoid): The monoid maintained over the subtrees.
+    """
+
+    def __init__(
+        self,
+        monoid: Monoid = Monoid.sum(),
+        error_policy: ErrorPolicy = ErrorPolicy.RETURN,
+    ):
+        """Initialize the aggregate AVL tree.
+
+        Args:
+            monoid (Monoid, optional): The monoid maintained over the subtrees. By default, the
+            sum of the values.
+            error_policy (ErrorPolicy, optional): What happens when an operation is rejected.
+        """
+
+        super().__init__(error_policy)
+
+        self.monoid = monoid
+
+    def node_class(self, value: int) -> AggregateNode:
+        """Create a leaf, whose aggregate is its own measure.
+
+        Args:
+            value (int): The value of the leaf.
+
+        Returns:
+            AggregateNode: The new leaf.
+        """
+
+        node = AggregateNode(value)
+        node.aggregate = self.monoid.measure(node)
+
+        return node
+
+    def aggregate(self) -> Any:
+        """Get the aggregate of the whole tree.
+
+        Returns:
+            Any: The aggregate of every value, or the identity if the tree is empty.
+        """
+
+        return self.root.aggregate if self.root else self.monoid.identity
+
+    def query_range(self, low: int, high: int) -> Any:
+        """Get the aggregate of the values between low and high (both
+        inclusive). We descend to the highest node within the range, where the
+        search paths for low and high split. Below it, the values from low
+        onwards in its left subtree are the right subtrees hanging off the
+        search path for low, and similarly for high, so only O(log n) cached
+        aggregates are combined.
+
+        Args:
+            low (int): The lower bound.
+            high (int): The upper bound.
+
+        Returns:
+            Any: The aggregate of the values in [low, high], or the identity if there are none.
+        """
+
+        combine, identity, measure = self.monoid
+        node = self.root
+
+        while node and not low <= node.value <= high:
+            node = node.left if high < node.value else node.right
+
+        if not node or high < low:
+            return identity
+
+        lower = self.__suffix(node.left, low)
+        upper = self.__prefix(node.right, high)
+
+        return combine(combine(lower, measure(node)), upper)
+
+    def __suffix(self, node: Optional[AggregateNode], low: int) -> Any:
+        """Get the aggregate of the values greater than or equal to low in a
+        subtree.
+
+        Args:
+            node (Optional[AggregateNode]): The root of the subtree.
+            low (int): The lower bound.
+
+        Returns:
+            Any: The aggregate of the values in the subtree from low onwards.
+        """
+
+        combine, result, measure = self.monoid
+
+        while node:
+            if node.value < low:
+                node = node.right
+                continue
+
+            if node.right:
+                result = combine(node.right.aggregate, result)
+
+            result = combine(measure(node), result)
+            node = node.left
+
+        return result
+
+    def __prefix(self, node: Optional[AggregateNode], high: int) -> Any:
+        """Get the aggregate of the values less than or equal to high in a
+        subtree.
+
+        Args:
+            node (Optional[AggregateNode]): The root of the subtree.
+            high (int): The upper bound.
+
+        Returns:
+            Any: The aggregate of the values in the subtree up to high.
+        """
+
+        combine, result, measure = self.monoid
+
+        while node:
+            if node.value > high:
+                node = node.left
+                continue
+
+            if node.left:
+                result = combine(result, node.left.aggregate)
+
+            result = combine(result, measure(node))
+            node = node.right
+
+        return result
+
+    def _retrace(self, path: list, delta: int) -> None:
+        """Walk back up the path stack after an insertion or removal, see
+        AVLTree._retrace. The ancestors above the point where the heights stop
+        changing still have a new aggregate, so it is recomputed bottom-up.
+
+        Args:
+            path (list): The nodes visited on the way down, from the root.
+            delta (int): The change in the number of values, 1 or -1.
+        """
+
+        super()._retrace(path, delta)
+
+        for node in reversed(path):
+            self.__aggregate(node)
+
+    def update(self, node: AggregateNode) -> None:
+        """Update the height, balance factor, size and aggregate for the
+        current node.
+
+        Args:
+            node (AggregateNode): The node to be updated.
+        """
+
+        super().update(node)
+
+        self.__aggregate(node)
+
+    def __aggregate(self, node: AggregateNode) -> None:
+        """Recompute the aggregate of a node from those of its children.
+
+        Args:
+            node (AggregateNode): The node.
+        """
+
+        combine, _, measure = self.monoid
+        aggregate = measure(node)
+
+        if node.left:
+            aggregate = combine(node.left.aggregate, aggregate)
+
+        if node.right:
+            aggregate = combine(aggregate, node.right.aggregate)
+
+        node.aggregate = aggregate
@@ -0,0 +1,30 @@
+"""This module provides a node which caches an aggregate over its subtree."""
+from __future__ import annotations
+
+from typing import Any
+
+from src.tree.node import Node
+
+
+class AggregateNode(Node):
+    """The aggregate node is a node of an AggregateAVLTree. On top of the
+    height and size, it caches the aggregate of the tree's monoid over its
+    subtree, which is recomputed whenever the node is updated.
+
+    Attributes:
+        aggregate (Any): The combination of the measures of every node in the subtree.
+    """
+
+    __slots__ = ("aggregate",)
+
+    def __init__(self, value: int, aggregate: Any = None):
+        """Initialize the aggregate node.
+
+        Args:
+            value (int): The value or key of the node.
+            aggregate (Any, optional): The aggregate of the node on its own.
+        """
+
+        super().__init__(value)
+
+        self.aggregate = aggregate
@@ -0,0 +1,381 @@
+"""This module allows the user to create an AVL tree whose nodes are stored in
+an array-backed node pool rather than as individual objects."""
+from __future__ import annotations
+
+from typing import IO, Optional
+
+from src.tree.node_pool import NodePool
+from src.tree.error_policy import ErrorPolicy
+
+from src.console.message import Message
+from src.console.display_tree import DisplayTree
+
+
+class ArrayAVLTree(object):
+    """An AVL tree with the same behaviour as AVLTree, but whose nodes live in
+    the parallel columns of a NodePool. A node is an index into the pool and
+    the empty node is index 0. This trades the flexibility of node objects for
+    a memory footprint of roughly 17 bytes per key, so it is best used to hold
+    a very large number of fixed-width keys.
+
+    Attributes:
+        error_policy (ErrorPolicy): What happens when an operation is rejected.
+        pool (NodePool): The columns storing the keys, children and heights.
+        rejections (Dict[Message, int]): The number of rejected operations, by reason.
+        root (int): The index of the root of the binary tree, 0 if the tree is empty.
+    """
+
+    def __init__(self, typecode: str = "q", error_policy: ErrorPolicy = ErrorPolicy.RETURN):
+        """Initialize the AVL tree.
+
+        Args:
+            typecode (str, optional): The array typecode of the keys, e.g. "q" for 64-bit
+            integers or "d" for double precision floats.
+            error_policy (ErrorPolicy, optional): What happens when an operation is rejected. By
+            default, the operation silently returns False.
+        """
+
+        self.pool = NodePool(typecode)
+        self.root = 0
+        self.error_policy = error_policy
+        self.rejections = dict.fromkeys(Message, 0)
+        self.__path = []
+
+    def __len__(self) -> int:
+        """Get the number of keys in the tree.
+
+        Returns:
+            int: The number of keys in the tree.
+        """
+
+        return len(self.pool)
+
+    def add(self, value: int) -> bool:
+        """Adds the queried value to the binary tree if it is valid. The value
+        is valid if the value is not null and it is unique. If the value is
+        invalid, the operation is rejected according to the error policy. See
+        AVLTree.add.
+
+        Args:
+            value (int): The value to be added to the tree.
+
+        Returns:
+            bool: True if the value was added, False if it was rejected.
+        """
+
+        if value is None:
+            return self._reject(Message.NULL_VALUE_EXCEPTION, value)
+
+        pool = self.pool
+        node = self.root
+
+        if not node:
+            self.root = pool.allocate(value)
+            return True
+
+        keys, left, right = pool.keys, pool.left, pool.right
+
+        path = self.__path
+        path.clear()
+
+        while True:
+            path.append(node)
+            key = keys[node]
+
+            if value < key:
+                if not left[node]:
+                    left[node] = pool.allocate(value)
+                    break
+
+                node = left[node]
+            elif value > key:
+                if not right[node]:
+                    right[node] = pool.allocate(value)
+                    break
+
+                node = right[node]
+            else:
+                return self._reject(Message.COMMON_VALUE_EXCEPTION, value)
+
+        self.__retrace(path)
+
+        return True
+
+    def remove(self, value: int) -> bool:
+        """Removes the node with the queried value in the binary tree. The slot
+        of the unlinked node is returned to the pool's free list. If the value
+        is null or does not exist, the operation is rejected according to the
+        error policy. See AVLTree.remove.
+
+        Args:
+            value (int): The queried value.
+
+        Returns:
+            bool: True if the value was removed, False if it was rejected.
+        """
+
+        if value is None:
+            return self._reject(Message.NULL_VALUE_EXCEPTION, value)
+
+        pool = self.pool
+        keys, left, right, heights = pool.keys, pool.left, pool.right, pool.heights
+
+        path = self.__path
+        path.clear()
+
+        node = self.root
+
+        while node:
+            key = keys[node]
+
+            if value < key:
+                path.append(node)
+                node = left[node]
+            elif value > key:
+                path.append(node)
+                node = right[node]
+            else:
+                break
+
+        if not node:
+            return self._reject(Message.VOID_VALUE_EXCEPTION, value)
+
+        if left[node] and right[node]:
+            path.append(node)
+
+            if heights[left[node]] > heights[right[node]]:
+                successor = left[node]
+
+                while right[successor]:
+                    path.append(successor)
+                    successor = right[successor]
+            else:
+                successor = right[node]
+
+                while left[successor]:
+                    path.append(successor)
+                    successor = left[successor]
+
+            keys[node] = keys[successor]
+            node = successor
+
+        self.__replace(path, node, left[node] or right[node])
+        pool.release(node)
+        self.__retrace(path)
+
+        return True
+
+    def _reject(self, message: Message, value: int) -> bool:
+        """Count a rejected operation and respond to it according to the error
+        policy.
+
+        Args:
+            message (Message): The reason the operation was rejected.
+            value (int): The value of the rejected operation.
+
+        Returns:
+            bool: False, unless the error policy raises an exception.
+        """
+
+        self.rejections[message] += 1
+
+        return self.error_policy.reject(message, value)
+
+    def contains(self, value: int) -> bool:
+        """Determine whether the queried value exists within the tree.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            bool: A boolean value based on whether the value exists or not.
+        """
+
+        keys, left, right = self.pool.keys, self.pool.left, self.pool.right
+        node = self.root
+
+        while node:
+            key = keys[node]
+
+            if value < key:
+                node = left[node]
+            elif value > key:
+                node = right[node]
+            else:
+                return True
+
+        return False
+
+    def __replace(self, path: list, node: int, replacement: int) -> None:
+        """Replace the child of the node on top of the path stack (or the root,
+        if the path is empty) with another node.
+
+        Args:
+            path (list): The ancestors of the node to be replaced.
+            node (int): The node to be replaced.
+            replacement (int): The node which takes its place.
+        """
+
+        if not path:
+            self.root = replacement
+        elif self.pool.left[path[-1]] == node:
+            self.pool.left[path[-1]] = replacement
+        else:
+            self.pool.right[path[-1]] = replacement
+
+    def __retrace(self, path: list) -> None:
+        """Walk back up the path stack after an insertion or removal, updating
+        the heights and rebalancing the nodes until a subtree's height is
+        unchanged, as in AVLTree.
+
+        Args:
+            path (list): The nodes visited on the way down, from the root.
+        """
+
+        heights = self.pool.heights
+
+        while path:
+            node = path.pop()
+            height = heights[node]
+
+            self.update(node)
+
+            balance_factor = self.balance_factor(node)
+
+            if balance_factor < -1 or balance_factor > 1:
+                parent = self.balance(node)
+                self.__replace(path, node, parent)
+                node = parent
+
+            if heights[node] == height:
+                break
+
+    def balance_factor(self, node: int) -> int:
+        """Get the balance factor of a node, which is not stored in the pool
+        but derived from the heights of its subtrees.
+
+        Args:
+            node (int): The node.
+
+        Returns:
+            int: The height of the right subtree minus that of the left subtree.
+        """
+
+        heights = self.pool.heights
+
+        return heights[self.pool.right[node]] - heights[self.pool.left[node]]
+
+    def update(self, node: int) -> None:
+        """Update the height of the current node. The sentinel node has a
+        height of -1, so empty subtrees need no special casing.
+
+        Args:
+            node (int): The node to be updated.
+        """
+
+        heights = self.pool.heights
+        left_height = heights[self.pool.left[node]]
+        right_height = heights[self.pool.right[node]]
+
+        heights[node] = 1 + (left_height if left_height > right_height else right_height)
+
+    def balance(self, node: int) -> int:
+        """Rebalances the subtree if any balancing is needed at all. See
+        AVLTree.balance for the four cases.
+
+        Args:
+            node (int): The node to be balanced.
+
+        Returns:
+            int: The new root node.
+        """
+
+        balance_factor = self.balance_factor(node)
+
+        if balance_factor == -2:
+            if self.balance_factor(self.pool.left[node]) > 0:
+                self.pool.left[node] = self.left_rotation(self.pool.left[node])
+
+            return self.right_rotation(node)
+
+        if balance_factor == 2:
+            if self.balance_factor(self.pool.right[node]) < 0:
+                self.pool.right[node] = self.right_rotation(self.pool.right[node])
+
+            return self.left_rotation(node)
+
+        return node
+
+    def left_rotation(self, node: int) -> int:
+        """Perform a left rotation for the current node. Afterwards, update the
+        heights of the current node and its new parent, respectively.
+
+        Args:
+            node (int): The node to be left rotated.
+
+        Returns:
+            int: Returns the parent of the queried node.
+        """
+
+        left, right = self.pool.left, self.pool.right
+
+        parent = right[node]
+        right[node] = left[parent]
+        left[parent] = node
+
+        self.update(node)
+        self.update(parent)
+
+        return parent
+
+    def right_rotation(self, node: int) -> int:
+        """Perform a right rotation for the current node. Afterwards, update the
+        heights of the current node and its new parent, respectively.
+
+        Args:
+            node (int): The node to be right rotated.
+
+        Returns:
+            int: Returns the parent of the queried node.
+        """
+
+        left, right = self.pool.left, self.pool.right
+
+        parent = left[node]
+        left[node] = right[parent]
+        right[parent] = node
+
+        self.update(node)
+        self.update(parent)
+
+        return parent
+
+    def print(
+        self,
+        stream: Optional[IO[str]] = None,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+    ) -> int:
+        """Displays the binary tree in the terminal.
+
+        Best used when there are not a lot of values to display.
+
+        Args:
+            stream (Optional[IO[str]], optional): The writable text stream. By default, the
+            standard output.
+            max_depth (Optional[int], optional): The deepest level drawn. By default, unlimited.
+            max_nodes (Optional[int], optional): The most nodes drawn. By default, unlimited.
+
+        Returns:
+            int: The number of nodes drawn.
+        """
+
+        keys, left, right = self.pool.keys, self.pool.left, self.pool.right
+
+        return DisplayTree.print_tree(
+            self.root,
+            lambda node: (str(keys[node]), left[node], right[node]),
+            stream=stream,
+            max_depth=max_depth,
+            max_nodes=max_nodes,
+        )
@@ -0,0 +1,524 @@
+"""This module allows the user to create an ordered mapping backed by an AVL
+tree."""
+from __future__ import annotations
+
+import functools
+
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+from src.tree.avl_tree import AVLTree
+from src.tree.map_node import MapNode
+from src.tree.batch_result import BatchResult
+from src.tree.error_policy import ErrorPolicy
+
+from src.console.message import Message
+
+_MISSING = object()
+
+
+class AVLMap(AVLTree):
+    """An AVL map is an ordered dictionary: every node of the AVL tree carries
+    a key and a payload, and the items are kept sorted by key. It shares the
+    insertion, removal and rotation code of AVLTree, so lookups, insertions
+    and removals are O(log n), and assigning to an existing key updates its
+    payload in place without any rebalancing.
+
+    The order of the keys can be customised with either a key function (like
+    sorted's key argument) or a comparator (a function returning a negative
+    number, zero or a positive number). The methods inherited from AVLTree
+    which take or return values, such as rank, select, irange and floor,
+    operate on the sort keys, which are the keys themselves unless a key
+    function or comparator is given.
+
+    Attributes:
+        key_function (Optional[Callable[[Any], Any]]): The function mapping a key to its sort
+        key, or None if the keys are compared directly.
+    """
+
+    node_class = MapNode
+
+    def __init__(
+        self,
+        key: Optional[Callable[[Any], Any]] = None,
+        cmp: Optional[Callable[[Any, Any], int]] = None,
+        error_policy: ErrorPolicy = ErrorPolicy.RETURN,
+    ):
+        """Initialize the AVL map.
+
+        Args:
+            key (Optional[Callable[[Any], Any]], optional): A function mapping a key to its sort
+            key.
+            cmp (Optional[Callable[[Any, Any], int]], optional): A function comparing two keys.
+            error_policy (ErrorPolicy, optional): What happens when add or remove is rejected.
+
+        Raises:
+            ValueError: If both a key function and a comparator are given.
+        """
+
+        super().__init__(error_policy)
+
+        if key is not None and cmp is not None:
+            raise ValueError("provide either a key function or a comparator, not both")
+
+        self.key_function = functools.cmp_to_key(cmp) if cmp is not None else key
+
+    @classmethod
+    def from_sorted(cls, iterable: Iterable[Tuple[Any, Any]]) -> AVLMap:
+        """Build a perfectly balanced map from (key, payload) pairs in
+        ascending order of the keys in linear time. If a key is repeated, its
+        last payload is kept, as with dict.
+
+        Args:
+            iterable (Iterable[Tuple[Any, Any]]): The (key, payload) pairs, in ascending order of
+            the keys.
+
+        Raises:
+            ValueError: If the keys are not in ascending order.
+
+        Returns:
+            AVLMap: The new map.
+        """
+
+        keys = []
+        payloads = []
+
+        for key, payload in iterable:
+            if keys and key <= keys[-1]:
+                if key == keys[-1]:
+                    payloads[-1] = payload
+                    continue
+
+                raise ValueError("the keys must be in ascending order")
+
+            keys.append(key)
+            payloads.append(payload)
+
+        tree = cls()
+        tree._assign(keys)
+
+        for node, payload in zip(tree._nodes(), payloads):
+            node.payload = payload
+
+        return tree
+
+    @classmethod
+    def bulk_load(cls, iterable: Iterable[Tuple[Any, Any]]) -> AVLMap:
+        """Build a perfectly balanced map from (key, payload) pairs in any
+        order. If a key is repeated, its last payload is kept, as with dict.
+
+        Args:
+            iterable (Iterable[Tuple[Any, Any]]): The (key, payload) pairs, in any order.
+
+        Returns:
+            AVLMap: The new map.
+        """
+
+        # The sort is stable, so the last payload of a repeated key comes last
+        return cls.from_sorted(sorted(iterable, key=itemgetter(0)))
+
+    @classmethod
+    def recover(
+        cls,
+        directory: str,
+        typecode: str = "q",
+        sync_bytes: int = 1 << 16,
+        sync_interval: float = 0.05,
+        compact_bytes: int = 1 << 26,
+    ) -> AVLMap:
+        """Maps cannot be journaled, since the journal records values but not the
+        keys and payloads of a map, nor the mutations made through the mapping
+        methods.
+
+        Args:
+            directory (str): The directory holding the snapshots and journals.
+            typecode (str, optional): The typecode of the values.
+            sync_bytes (int, optional): The size of the buffered records which triggers a sync.
+            sync_interval (float, optional): The longest time, in seconds, records remain
+            buffered.
+            compact_bytes (int, optional): The size of the journal which triggers a compaction.
+
+        Raises:
+            TypeError: Always.
+        """
+
+        raise TypeError("a map cannot be journaled, its payloads would be lost")
+
+    def __sort_key(self, key: Any) -> Any:
+        """Get the sort key of a key.
+
+        Args:
+            key (Any): The key.
+
+        Returns:
+            Any: The sort key.
+        """
+
+        return key if self.key_function is None else self.key_function(key)
+
+    def __sort_keys(self, keys: Iterable[Any]) -> list:
+        """Pair the non-null keys of a batch with their sort keys, in
+        ascending order of the sort keys.
+
+        Args:
+            keys (Iterable[Any]): The keys.
+
+        Returns:
+            list: The (sort key, key) pairs.
+        """
+
+        return sorted(
+            ((self.__sort_key(key), key) for key in keys if key is not None), key=itemgetter(0)
+        )
+
+    def __getitem__(self, key: Any) -> Any:
+        """Get the payload of a key.
+
+        Args:
+            key (Any): The key.
+
+        Raises:
+            KeyError: If the key does not exist.
+
+        Returns:
+            Any: The payload of the key.
+        """
+
+        node = self._find(self.__sort_key(key))
+
+        if not node:
+            raise KeyError(key)
+
+        return node.payload
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        """Map a key to a payload. If the key already exists, its payload is
+        replaced in place and the tree is not rebalanced.
+
+        Args:
+            key (Any): The key.
+            value (Any): The payload.
+        """
+
+        node, inserted = self._insert(self.__sort_key(key))
+
+        if inserted:
+            node.key = key
+
+        node.payload = value
+
+    def __delitem__(self, key: Any) -> None:
+        """Remove a key and its payload.
+
+        Args:
+            key (Any): The key.
+
+        Raises:
+            KeyError: If the key does not exist.
+        """
+
+        if not self._delete(self.__sort_key(key)):
+            raise KeyError(key)
+
+    def __contains__(self, key: Any) -> bool:
+        """Determine whether the key exists within the map.
+
+        Args:
+            key (Any): The key.
+
+        Returns:
+            bool: A boolean value based on whether the key exists or not.
+        """
+
+        return self._find(self.__sort_key(key)) is not None
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the keys in ascending order.
+
+        Returns:
+            Iterator[Any]: The keys in ascending order.
+        """
+
+        return self.keys()
+
+    def __reversed__(self) -> Iterator[Any]:
+        """Iterate over the keys in descending order.
+
+        Returns:
+            Iterator[Any]: The keys in descending order.
+        """
+
+        return map(attrgetter("key"), self._nodes(reverse=True))
+
+    def add(self, key: Any, value: Optional[Any] = None) -> bool:
+        """Adds the key with a payload to the map if the key is valid. The key
+        is valid if it is not null and it is unique. If the key is invalid, the
+        operation is rejected according to the error policy.
+
+        Args:
+            key (Any): The key to be added to the map.
+            value (Optional[Any], optional): The payload of the key.
+
+        Returns:
+            bool: True if the key was added, False if it was rejected.
+        """
+
+        if key is None:
+            return self._reject(Message.NULL_VALUE_EXCEPTION, key)
+
+        node, inserted = self._insert(self.__sort_key(key))
+
+        if not inserted:
+            return self._reject(Message.COMMON_VALUE_EXCEPTION, key)
+
+        node.key = key
+        node.payload = value
+
+        return True
+
+    def extend(self, iterable: Iterable[Any]) -> None:
+        """Add every key of a batch which is not in the map yet, with None as
+        its payload. Keys which are already in the map are skipped silently
+        and keep their payloads.
+
+        Args:
+            iterable (Iterable[Any]): The keys to be added, in any order.
+        """
+
+        if self.key_function is None:
+            return super().extend(iterable)
+
+        for sort_key, key in self.__sort_keys(iterable):
+            node, inserted = self._insert(sort_key)
+
+            if inserted:
+                node.key = key
+
+    def add_many(self, keys: Iterable[Any]) -> BatchResult:
+        """Add a batch of keys with None as their payload, see
+        AVLTree.add_many. Keys which are already in the map keep their
+        payloads. With a key function or comparator, the keys are added one at
+        a time under their sort keys.
+
+        Args:
+            keys (Iterable[Any]): The keys to be added.
+
+        Returns:
+            BatchResult: The mask of added keys, the number of added keys and the number of
+            duplicate or null keys.
+        """
+
+        if self.key_function is None:
+            return super().add_many(keys)
+
+        return self.__apply(self.add, keys, True)
+
+    def remove_many(self, keys: Iterable[Any]) -> BatchResult:
+        """Remove a batch of keys and their payloads, see
+        AVLTree.remove_many.
+
+        Args:
+            keys (Iterable[Any]): The keys to be removed.
+
+        Returns:
+            BatchResult: The mask of removed keys, the number of removed keys and the number of
+            missing or null keys.
+        """
+
+        if self.key_function is None:
+            return super().remove_many(keys)
+
+        return self.__apply(self.remove, keys, True)
+
+    def contains_many(self, keys: Iterable[Any]) -> BatchResult:
+        """Determine whether each key of a batch exists within the map, see
+        AVLTree.contains_many.
+
+        Args:
+            keys (Iterable[Any]): The keys queried.
+
+        Returns:
+            BatchResult: The mask of keys found, the number of keys found and the number of
+            missing or null keys.
+        """
+
+        if self.key_function is None:
+            return super().contains_many(keys)
+
+        return self.__apply(self.contains, keys, False)
+
+    def __apply(
+        self, operation: Callable[[Any], bool], keys: Iterable[Any], mutation: bool
+    ) -> BatchResult:
+        """Apply an operation to every key of a batch in ascending order of
+        the sort keys. Rejected keys are counted, but the error policy is not
+        invoked for each of them.
+
+        Args:
+            operation (Callable[[Any], bool]): The operation.
+            keys (Iterable[Any]): The batch, any iterable or a NumPy array.
+            mutation (bool): Whether the operation is a mutation, whose null keys are counted as
+            rejected.
+
+        Returns:
+            BatchResult: The mask of keys the operation succeeded for and its counts.
+        """
+
+        is_array = type(keys).__module__ == "numpy"
+        batch = keys.tolist() if is_array else list(keys)
+        sort_keys = [None if key is None else self.__sort_key(key) for key in batch]
+        order = [index for index, key in enumerate(batch) if key is not None]
+        order.sort(key=sort_keys.__getitem__)
+        mask = [False] * len(batch)
+
+        policy, self.error_policy = self.error_policy, ErrorPolicy.RETURN
+
+        try:
+            for index in order:
+                mask[index] = operation(batch[index])
+        finally:
+            self.error_policy = policy
+
+        succeeded = sum(mask)
+
+        if mutation:
+            self.rejections[Message.NULL_VALUE_EXCEPTION] += len(batch) - len(order)
+
+        if is_array:
+            import numpy
+
+            mask = numpy.array(mask, dtype=bool)
+
+        return BatchResult(mask, succeeded, len(batch) - succeeded)
+
+    def remove(self, key: Any) -> bool:
+        """Removes the key and its payload from the map. If the key is null or
+        does not exist, the operation is rejected according to the error
+        policy.
+
+        Args:
+            key (Any): The queried key.
+
+        Returns:
+            bool: True if the key was removed, False if it was rejected.
+        """
+
+        if key is None:
+            return self._reject(Message.NULL_VALUE_EXCEPTION, key)
+
+        if not self._delete(self.__sort_key(key)):
+            return self._reject(Message.VOID_VALUE_EXCEPTION, key)
+
+        return True
+
+    def contains(self, key: Any) -> bool:
+        """Determine whether the key exists within the map.
+
+        Args:
+            key (Any): The key.
+
+        Returns:
+            bool: A boolean value based on whether the key exists or not.
+        """
+
+        return key in self
+
+    def get(self, key: Any, default: Optional[Any] = None) -> Any:
+        """Get the payload of a key, or a default if the key does not exist.
+
+        Args:
+            key (Any): The key.
+            default (Optional[Any], optional): The value returned if the key does not exist.
+
+        Returns:
+            Any: The payload of the key, or the default.
+        """
+
+        node = self._find(self.__sort_key(key))
+
+        return node.payload if node else default
+
+    def pop(self, key: Any, default: Any = _MISSING) -> Any:
+        """Remove a key and return its payload.
+
+        Args:
+            key (Any): The key.
+            default (Any, optional): The value returned if the key does not exist.
+
+        Raises:
+            KeyError: If the key does not exist and no default is given.
+
+        Returns:
+            Any: The payload of the removed key, or the default.
+        """
+
+        node = self._delete(self.__sort_key(key))
+
+        if node:
+            return node.payload
+
+        if default is _MISSING:
+            raise KeyError(key)
+
+        return default
+
+    def setdefault(self, key: Any, default: Optional[Any] = None) -> Any:
+        """Get the payload of a key. If the key does not exist, it is added
+        with the default as its payload first. Either way, only one descent is
+        needed.
+
+        Args:
+            key (Any): The key.
+            default (Optional[Any], optional): The payload of the key if it is added.
+
+        Returns:
+            Any: The payload of the key.
+        """
+
+        node, inserted = self._insert(self.__sort_key(key))
+
+        if inserted:
+            node.key = key
+            node.payload = default
+
+        return node.payload
+
+    def keys(self) -> Iterator[Any]:
+        """Iterate over the keys in ascending order.
+
+        Returns:
+            Iterator[Any]: The keys in ascending order.
+        """
+
+        return map(attrgetter("key"), self._nodes())
+
+    def values(self) -> Iterator[Any]:
+        """Iterate over the payloads in ascending order of their keys.
+
+        Returns:
+            Iterator[Any]: The payloads in ascending order of their keys.
+        """
+
+        return map(attrgetter("payload"), self._nodes())
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        """Iterate over the (key, payload) pairs in ascending order of the
+        keys.
+
+        Returns:
+            Iterator[Tuple[Any, Any]]: The (key, payload) pairs in ascending order of the keys.
+        """
+
+        return map(attrgetter("key", "payload"), self._nodes())
+
+    def _label(self, node: MapNode) -> str:
+        """Get the text of a node when the map is displayed, which is its key.
+
+        Args:
+            node (MapNode): The node.
+
+        Returns:
+            str: The key of the node.
+        """
+
+        return str(node.key)
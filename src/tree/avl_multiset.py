@@ -0,0 +1,526 @@
+"""This module allows the user to create a multiset, i.e. an AVL tree which
+allows repeated values."""
+from __future__ import annotations
+
+from itertools import chain, repeat
+from typing import Iterable, Iterator, Optional, Tuple
+
+from src.tree.avl_tree import AVLTree
+from src.tree.count_node import CountNode
+from src.tree.batch_result import BatchResult
+from src.tree.error_policy import ErrorPolicy
+
+from src.console.message import Message
+
+
+class AVLMultiset(AVLTree):
+    """An AVL multiset keeps one node per distinct value, which counts the
+    occurrences of the value. Adding a value which already exists only
+    increments its count, and removing it decrements the count, so neither
+    changes the shape of the tree or performs any rotation; only the subtree
+    sizes on the search path are adjusted. A node is inserted or unlinked only
+    when a value first appears or its last occurrence is removed.
+
+    The size of a node is the total count of its subtree, so len, rank,
+    select and count_range take the multiplicities into account, and
+    iteration yields every value as many times as it occurs. The split, join
+    and set operations inherited from AVLTree work on the distinct values and
+    keep the count of the node they retain.
+    """
+
+    node_class = CountNode
+
+    def __init__(self, error_policy: ErrorPolicy = ErrorPolicy.RETURN):
+        """Initialize the AVL multiset.
+
+        Args:
+            error_policy (ErrorPolicy, optional): What happens when an operation is rejected.
+        """
+
+        super().__init__(error_policy)
+
+        self.__path = []
+
+    @classmethod
+    def from_sorted(cls, iterable: Iterable[int]) -> AVLMultiset:
+        """Build a perfectly balanced multiset from values in ascending order
+        in linear time. Repeated values are counted.
+
+        Args:
+            iterable (Iterable[int]): The values, in ascending order.
+
+        Raises:
+            ValueError: If the values are not in ascending order.
+
+        Returns:
+            AVLMultiset: The new multiset.
+        """
+
+        values = list(iterable)
+
+        for index in range(1, len(values)):
+            if values[index] < values[index - 1]:
+                raise ValueError("the values must be in ascending order")
+
+        tree = cls()
+        tree._assign(values)
+
+        return tree
+
+    @classmethod
+    def bulk_load(cls, iterable: Iterable[int]) -> AVLMultiset:
+        """Build a perfectly balanced multiset from values in any order.
+
+        Args:
+            iterable (Iterable[int]): The values, in any order.
+
+        Returns:
+            AVLMultiset: The new multiset.
+        """
+
+        tree = cls()
+        tree._assign(sorted(iterable))
+
+        return tree
+
+    def count(self, value: int) -> int:
+        """Count the occurrences of the queried value.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            int: The number of occurrences of the value.
+        """
+
+        node = self._find(value)
+
+        return node.count if node else 0
+
+    def add(self, value: int) -> bool:
+        """Adds an occurrence of the queried value. If the value already exists,
+        its count is incremented along with the sizes of its ancestors, without
+        rebalancing. If the value is null, the operation is rejected according
+        to the error policy.
+
+        Args:
+            value (int): The value to be added.
+
+        Returns:
+            bool: True if the value was added, False if it was rejected.
+        """
+
+        if value is None:
+            return self._reject(Message.NULL_VALUE_EXCEPTION, value)
+
+        path = self.__path
+        path.clear()
+
+        node = self.root
+
+        while node:
+            path.append(node)
+
+            if value < node.value:
+                node = node.left
+            elif value > node.value:
+                node = node.right
+            else:
+                node.count += 1
+
+                for ancestor in path:
+                    ancestor.size += 1
+
+                return True
+
+        leaf = self.node_class(value)
+
+        if not path:
+            self.root = leaf
+        elif value < path[-1].value:
+            path[-1].left = leaf
+        else:
+            path[-1].right = leaf
+
+        self._track(leaf)
+        self._retrace(path, 1)
+
+        return True
+
+    def remove(self, value: int) -> bool:
+        """Removes an occurrence of the queried value. The count is
+        decremented, and the node is only unlinked once its last occurrence is
+        removed. If the value is null or does not exist, the operation is
+        rejected according to the error policy.
+
+        Args:
+            value (int): The value to be removed.
+
+        Returns:
+            bool: True if the value was removed, False if it was rejected.
+        """
+
+        if value is None:
+            return self._reject(Message.NULL_VALUE_EXCEPTION, value)
+
+        path = self.__path
+        path.clear()
+
+        node = self.root
+
+        while node and node.value != value:
+            path.append(node)
+            node = node.left if value < node.value else node.right
+
+        if not node:
+            return self._reject(Message.VOID_VALUE_EXCEPTION, value)
+
+        if node.count == 1:
+            self._delete(value)
+            return True
+
+        node.count -= 1
+        node.size -= 1
+
+        for ancestor in path:
+            ancestor.size -= 1
+
+        return True
+
+    def pop_min(self) -> int:
+        """Remove and return an occurrence of the least value.
+
+        Raises:
+            IndexError: If the multiset is empty.
+
+        Returns:
+            int: The least value.
+        """
+
+        return self.__pop(self.min())
+
+    def pop_max(self) -> int:
+        """Remove and return an occurrence of the greatest value.
+
+        Raises:
+            IndexError: If the multiset is empty.
+
+        Returns:
+            int: The greatest value.
+        """
+
+        return self.__pop(self.max())
+
+    def __pop(self, value: Optional[int]) -> int:
+        """Remove an occurrence of the least or greatest value, which only
+        unlinks its node once its last occurrence is removed.
+
+        Args:
+            value (Optional[int]): The least or greatest value, None if the multiset is empty.
+
+        Raises:
+            IndexError: If the multiset is empty.
+
+        Returns:
+            int: The removed value.
+        """
+
+        if value is None:
+            raise IndexError("pop from an empty multiset")
+
+        self.remove(value)
+
+        return value
+
+    def extend(self, iterable: Iterable[int]) -> None:
+        """Add every value of a batch, counting repeated values.
+
+        Args:
+            iterable (Iterable[int]): The values to be added, in any order.
+        """
+
+        for value in sorted(iterable):
+            self.add(value)
+
+    def add_many(self, values: Iterable[int]) -> BatchResult:
+        """Add a batch of values. Every non-null value is added, so only null
+        values are reported as failed.
+
+        Args:
+            values (Iterable[int]): The values to be added.
+
+        Returns:
+            BatchResult: The mask of added values, the number of added values and the number of
+            null values.
+        """
+
+        return self.__apply(self.add, values)
+
+    def remove_many(self, values: Iterable[int]) -> BatchResult:
+        """Remove an occurrence of every value of a batch.
+
+        Args:
+            values (Iterable[int]): The values to be removed.
+
+        Returns:
+            BatchResult: The mask of removed values, the number of removed values and the number
+            of missing or null values.
+        """
+
+        return self.__apply(self.remove, values)
+
+    def __apply(self, operation, values: Iterable[int]) -> BatchResult:
+        """Apply an operation to every value of a batch in ascending order.
+        Rejected values are counted, but the error policy is not invoked for
+        each of them.
+
+        Args:
+            operation (Callable[[int], bool]): The operation.
+            values (Iterable[int]): The batch, any iterable or a NumPy array.
+
+        Returns:
+            BatchResult: The mask of values the operation succeeded for and its counts.
+        """
+
+        is_array = type(values).__module__ == "numpy"
+        batch = values.tolist() if is_array else list(values)
+        order = [index for index, value in enumerate(batch) if value is not None]
+        order.sort(key=batch.__getitem__)
+        mask = [False] * len(batch)
+
+        policy, self.error_policy = self.error_policy, ErrorPolicy.RETURN
+
+        try:
+            for index in order:
+                mask[index] = operation(batch[index])
+        finally:
+            self.error_policy = policy
+
+        succeeded = sum(mask)
+        self.rejections[Message.NULL_VALUE_EXCEPTION] += len(batch) - len(order)
+
+        if is_array:
+            import numpy
+
+            mask = numpy.array(mask, dtype=bool)
+
+        return BatchResult(mask, succeeded, len(batch) - succeeded)
+
+    def rank(self, value: int) -> int:
+        """Count the occurrences of values less than the queried value.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            int: The number of occurrences of values less than the queried value.
+        """
+
+        return self.__rank(value, False)
+
+    def __rank(self, value: int, inclusive: bool) -> int:
+        """Count the occurrences of values less than (or equal to) the queried
+        value in O(log n).
+
+        Args:
+            value (int): The value queried.
+            inclusive (bool): True to also count the occurrences of the queried value.
+
+        Returns:
+            int: The number of occurrences of values less than (or equal to) the queried value.
+        """
+
+        rank = 0
+        node = self.root
+
+        while node:
+            if value < node.value or (value == node.value and not inclusive):
+                node = node.left
+            else:
+                rank += node.count + (node.left.size if node.left else 0)
+                node = node.right
+
+        return rank
+
+    def select(self, index: int) -> int:
+        """Find the value at the queried index in ascending order, where every
+        value occupies as many indices as it has occurrences.
+
+        Args:
+            index (int): The index of the value.
+
+        Raises:
+            IndexError: If the index is out of range.
+
+        Returns:
+            int: The value at the queried index.
+        """
+
+        if index < 0:
+            index += len(self)
+
+        if index < 0 or index >= len(self):
+            raise IndexError("index out of range")
+
+        node = self.root
+
+        while True:
+            left_size = node.left.size if node.left else 0
+
+            if index < left_size:
+                node = node.left
+            elif index >= left_size + node.count:
+                index -= left_size + node.count
+                node = node.right
+            else:
+                return node.value
+
+    def count_range(self, low: int, high: int) -> int:
+        """Count the occurrences of values between low and high (both
+        inclusive) in O(log n).
+
+        Args:
+            low (int): The lower bound.
+            high (int): The upper bound.
+
+        Returns:
+            int: The number of occurrences of values in [low, high].
+        """
+
+        if high < low:
+            return 0
+
+        return self.__rank(high, True) - self.__rank(low, False)
+
+    def irange(
+        self,
+        low: Optional[int] = None,
+        high: Optional[int] = None,
+        inclusive: Tuple[bool, bool] = (True, True),
+        reverse: bool = False,
+    ) -> Iterator[int]:
+        """Lazily iterate over the values between low and high, repeating
+        every value as many times as it occurs. See AVLTree.irange.
+
+        Args:
+            low (Optional[int], optional): The lower bound, None for no lower bound.
+            high (Optional[int], optional): The upper bound, None for no upper bound.
+            inclusive (Tuple[bool, bool], optional): Whether the lower and upper bounds are
+            included, respectively.
+            reverse (bool, optional): True to iterate in descending order.
+
+        Returns:
+            Iterator[int]: The values between low and high.
+        """
+
+        return chain.from_iterable(
+            repeat(node.value, node.count)
+            for node in self._nodes(low, high, inclusive, reverse)
+        )
+
+    def _assign(self, values: list) -> None:
+        """Replace the contents of the multiset with a perfectly balanced tree
+        of the distinct values, counting the repeated ones.
+
+        Args:
+            values (list): The values, in ascending order, possibly repeated.
+        """
+
+        distinct = []
+        counts = []
+
+        for value in values:
+            if distinct and value == distinct[-1]:
+                counts[-1] += 1
+            else:
+                distinct.append(value)
+                counts.append(1)
+
+        self.root = self.__build(distinct, counts, 0, len(distinct))
+        self._reset()
+
+    def __build(self, values: list, counts: list, start: int, end: int) -> Optional[CountNode]:
+        """Build a perfectly balanced subtree from a slice of distinct sorted
+        values and their counts, see AVLTree._assign.
+
+        Args:
+            values (list): The distinct values, in ascending order.
+            counts (list): The number of occurrences of each value.
+            start (int): The index of the first value of the slice.
+            end (int): The index after the last value of the slice.
+
+        Returns:
+            Optional[CountNode]: The root of the subtree, or None if the slice is empty.
+        """
+
+        if start >= end:
+            return None
+
+        middle = (start + end) // 2
+
+        node = self.node_class(values[middle], counts[middle])
+        node.left = self.__build(values, counts, start, middle)
+        node.right = self.__build(values, counts, middle + 1, end)
+
+        self.update(node)
+
+        return node
+
+    def _retrace(self, path: list, delta: int) -> None:
+        """Walk back up the path stack after an insertion or removal, see
+        AVLTree._retrace. When a removed node is replaced by its successor,
+        the successor's whole count leaves the subtrees between them, so the
+        sizes of the ancestors above the point where the heights stop changing
+        are recomputed from their children rather than adjusted by delta.
+
+        Args:
+            path (list): The nodes visited on the way down, from the root.
+            delta (int): The change in the number of nodes, 1 or -1.
+        """
+
+        super()._retrace(path, delta)
+
+        for node in reversed(path):
+            node.size = (
+                node.count
+                + (node.left.size if node.left else 0)
+                + (node.right.size if node.right else 0)
+            )
+
+    def _count_nodes(self, node: CountNode) -> int:
+        """Get the number of nodes of a subtree, i.e. its number of distinct
+        values. The size of a node counts the occurrences, so the subtree is
+        walked.
+
+        Args:
+            node (CountNode): The root of the subtree.
+
+        Returns:
+            int: The number of nodes of the subtree.
+        """
+
+        count = 0
+        stack = [node]
+
+        while stack:
+            node = stack.pop()
+            count += 1
+
+            if node.left:
+                stack.append(node.left)
+            if node.right:
+                stack.append(node.right)
+
+        return count
+
+    def update(self, node: CountNode) -> None:
+        """Update the height, balance factor and size for the current node,
+        where the size is the total count of the subtree.
+
+        Args:
+            node (CountNode): The node to be updated.
+        """
+
+        super().update(node)
+
+        node.size += node.count - 1
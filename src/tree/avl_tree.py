@@ -1,191 +1,1496 @@
 """This module allows the user to create an AVL tree."""
 from __future__ import annotations
 
+import os
+
+from copy import copy
+from operator import attrgetter
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+
 from src.tree.node import Node
+from src.tree.batch_result import BatchResult
+from src.tree.error_policy import ErrorPolicy
+from src.tree.instrumentation import Instrumentation, SEARCH_OPERATIONS
+
+from src.storage.journal import Journal
+from src.storage.snapshot import Snapshot
 
 from src.graph.graph_tree import GraphTree
 
-from src.console.message import Message
-from src.console.display_tree import DisplayTree
+from src.console.message import Message
+from src.console.display_tree import DisplayTree
+
+
+class AVLTree(object):
+    """An AVL tree is a self-balancing binary search tree. In an AVL tree, the heights of the two
+    child subtrees of any node differ by at most one; if at any time they differ by more than one,
+    rebalancing is done to restore this property. Source: https://en.wikipedia.org/wiki/AVL_tree.
+
+    Attributes:
+        balance_factor (int): The difference between the height of the left subtree and that of the
+        root (Node): The root of the binary tree.
+        right subtree of a node.
+        error_policy (ErrorPolicy): What happens when an operation is rejected.
+        instrumentation (Optional[Instrumentation]): The attached instrumentation, if any.
+        journal (Optional[Journal]): The attached journal, if any.
+        node_class (type): The type of the nodes created by the tree.
+        rejections (Dict[Message, int]): The number of rejected operations, by reason.
+        version (int): Incremented whenever the shape of the tree changes, so cursors can tell
+        when the path they remember is stale.
+    """
+
+    node_class = Node
+
+    def __init__(self, error_policy: ErrorPolicy = ErrorPolicy.RETURN):
+        """Initialize the AVL tree.
+
+        Args:
+            error_policy (ErrorPolicy, optional): What happens when an operation is rejected. By
+            default, the operation silently returns False.
+        """
+
+        self.root = None
+        self.balance_factor = 0
+        self.error_policy = error_policy
+        self.rejections = dict.fromkeys(Message, 0)
+        self.instrumentation = None
+        self.journal = None
+        self.version = 0
+        self.__minimum = None
+        self.__maximum = None
+        self.__path = []
+
+    @classmethod
+    def from_sorted(cls, iterable: Iterable[int]) -> AVLTree:
+        """Build a perfectly balanced tree from values in ascending order in
+        linear time. Repeated values are only added once.
+
+        Args:
+            iterable (Iterable[int]): The values, in ascending order.
+
+        Raises:
+            ValueError: If the values are not in ascending order.
+
+        Returns:
+            AVLTree: The new tree.
+        """
+
+        values = []
+
+        for value in iterable:
+            if values and value <= values[-1]:
+                if value == values[-1]:
+                    continue
+
+                raise ValueError("the values must be in ascending order")
+
+            values.append(value)
+
+        tree = cls()
+        tree._assign(values)
+
+        return tree
+
+    @classmethod
+    def bulk_load(cls, iterable: Iterable[int]) -> AVLTree:
+        """Build a perfectly balanced tree from values in any order. The values
+        are deduplicated and sorted first, so this takes O(n log n) time for
+        unsorted values, but only a single pass to build the tree.
+
+        Args:
+            iterable (Iterable[int]): The values, in any order.
+
+        Returns:
+            AVLTree: The new tree.
+        """
+
+        tree = cls()
+        tree._assign(sorted(set(iterable)))
+
+        return tree
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> AVLTree:
+        """Load a tree from a snapshot file written by save. If memory mapping
+        is requested, the file is mapped and a MappedAVLTree is returned, which
+        answers read-only queries directly from the mapped values by binary
+        search and only builds its nodes on the first mutation. Otherwise, the
+        values are read and the balanced tree is built in linear time. Only
+        AVLTree itself is memory-mapped, a subclass is always built as an
+        instance of that subclass.
+
+        Args:
+            path (str): The path of the snapshot file.
+            mmap (bool, optional): True to memory-map the snapshot file.
+
+        Returns:
+            AVLTree: The loaded tree.
+        """
+
+        from src.storage.mapped_avl_tree import MappedAVLTree
+
+        values, typecode = Snapshot.read(path, mmap and cls is AVLTree)
+
+        if isinstance(values, memoryview):
+            return MappedAVLTree(values, typecode)
+
+        tree = cls()
+        tree._assign(values.tolist())
+
+        return tree
+
+    def save(self, path: str, typecode: Optional[str] = None) -> None:
+        """Save the values of the tree to a snapshot file: a small header
+        followed by the values in ascending order as a fixed-width column.
+
+        Args:
+            path (str): The path of the snapshot file.
+            typecode (Optional[str], optional): The typecode of the values, "q" for 64-bit
+            integers or "d" for double precision floats. By default, it is inferred from the
+            values.
+        """
+
+        if typecode is None:
+            typecode = Snapshot.typecode_of(self.select(0)) if len(self) else "q"
+
+        Snapshot.write(path, iter(self), typecode)
+
+    @classmethod
+    def recover(
+        cls,
+        directory: str,
+        typecode: str = "q",
+        sync_bytes: int = 1 << 16,
+        sync_interval: float = 0.05,
+        compact_bytes: int = 1 << 26,
+    ) -> AVLTree:
+        """Recover a durable tree from a directory of snapshots and journals,
+        which is created if needed, and keep journaling its mutations there.
+        Mutations are written to disk in batches, at least every sync_interval
+        seconds, and the journal is compacted into a new snapshot in the
+        background. See Journal.
+
+        Args:
+            directory (str): The directory holding the snapshots and journals.
+            typecode (str, optional): The typecode of the values, "q" for 64-bit integers or
+            "d" for double precision floats, if the directory is new.
+            sync_bytes (int, optional): The size of the buffered records which triggers a sync.
+            sync_interval (float, optional): The longest time, in seconds, records remain
+            buffered.
+            compact_bytes (int, optional): The size of the journal which triggers a compaction.
+
+        Returns:
+            AVLTree: The recovered tree.
+        """
+
+        return Journal.recover(cls, directory, typecode, sync_bytes, sync_interval, compact_bytes)
+
+    def close(self) -> None:
+        """Write the journaled mutations to disk and stop journaling. Does
+        nothing if the tree is not journaled.
+        """
+
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+
+    def instrument(
+        self,
+        callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        operations: Iterable[str] = SEARCH_OPERATIONS,
+    ) -> Instrumentation:
+        """Start recording the rotations by case, the comparisons and path
+        lengths of searches, and the latency of the queried operations. The
+        instrumented methods are only shadowed on this tree, so there is no
+        cost at all until this is called. See Instrumentation.
+
+        Args:
+            callback (Optional[Callable[[str, Dict[str, Any]], None]], optional): Called after
+            every instrumented operation with its name and measurements.
+            operations (Iterable[str], optional): The names of the methods to be timed. By
+            default, add, remove and contains.
+
+        Returns:
+            Instrumentation: The instrumentation, which holds the measurements.
+        """
+
+        self.uninstrument()
+        self.instrumentation = Instrumentation(self, callback, operations)
+
+        return self.instrumentation
+
+    def uninstrument(self) -> None:
+        """Stop recording and restore the uninstrumented methods."""
+
+        if self.instrumentation:
+            self.instrumentation.detach()
+            self.instrumentation = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the measurements recorded since the tree was instrumented.
+
+        Returns:
+            Dict[str, Any]: See Instrumentation.stats, or an empty dict if the tree is not
+            instrumented.
+        """
+
+        return self.instrumentation.stats() if self.instrumentation else {}
+
+    def __len__(self) -> int:
+        """Get the number of values in the tree in O(1), which is simply the
+        size of the root's subtree.
+
+        Returns:
+            int: The number of values in the tree.
+        """
+
+        return self.root.size if self.root else 0
+
+    def rank(self, value: int) -> int:
+        """Count the values in the tree which are less than the queried value,
+        i.e. the index the value has (or would have) in ascending order. Every
+        time we descend to the right, the left subtree and the current node are
+        all less than the queried value, so their count is added to the rank.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            int: The number of values less than the queried value.
+        """
+
+        return self.__rank(value, False)
+
+    def __rank(self, value: int, inclusive: bool) -> int:
+        """Count the values in the tree which are less than (or equal to) the
+        queried value in O(log n).
+
+        Args:
+            value (int): The value queried.
+            inclusive (bool): True to also count a value equal to the queried value.
+
+        Returns:
+            int: The number of values less than (or equal to) the queried value.
+        """
+
+        rank = 0
+        node = self.root
+
+        while node:
+            if value < node.value or (value == node.value and not inclusive):
+                node = node.left
+            else:
+                rank += 1 + (node.left.size if node.left else 0)
+                node = node.right
+
+        return rank
+
+    def select(self, index: int) -> int:
+        """Find the value at the queried index in ascending order, i.e. the
+        (index + 1)-th smallest value, in O(log n). Negative indices count from
+        the greatest value, like a list.
+
+        Args:
+            index (int): The index of the value.
+
+        Raises:
+            IndexError: If the index is out of range.
+
+        Returns:
+            int: The value at the queried index.
+        """
+
+        if index < 0:
+            index += len(self)
+
+        if index < 0 or index >= len(self):
+            raise IndexError("index out of range")
+
+        node = self.root
+
+        while True:
+            left_size = node.left.size if node.left else 0
+
+            if index < left_size:
+                node = node.left
+            elif index > left_size:
+                index -= left_size + 1
+                node = node.right
+            else:
+                return node.value
+
+    def count_range(self, low: int, high: int) -> int:
+        """Count the values in the tree between low and high (both inclusive)
+        in O(log n).
+
+        Args:
+            low (int): The lower bound.
+            high (int): The upper bound.
+
+        Returns:
+            int: The number of values in [low, high].
+        """
+
+        if high < low:
+            return 0
+
+        return self.__rank(high, True) - self.__rank(low, False)
+
+    def find_minimum(self, node: Node) -> int:
+        """Find the node with the minimum value in the binary tree.
+
+        Args:
+            node (Node): The current node.
+
+        Returns:
+            int: The least value of the binary tree.
+        """
+        while node.left:
+            node = node.left
+
+        return node.value
+
+    def find_maximum(self, node: Node) -> int:
+        """Find the node with the maximum value in the binary tree.
+
+        Args:
+            node (Node): The current node.
+
+        Returns:
+            int: The greatest value of the binary tree.
+        """
+        while node.right:
+            node = node.right
+
+        return node.value
+
+    def min(self) -> Optional[int]:
+        """Get the least value of the tree in O(1). The tree keeps a reference
+        to the node holding it, which insertions and removals update in O(1)
+        and rotations never invalidate, since they move nodes without changing
+        their values. After the tree is rebuilt, it is found again in O(log n).
+
+        Returns:
+            Optional[int]: The least value, or None if the tree is empty.
+        """
+
+        if self.__minimum is None:
+            node = self.root
+
+            if not node:
+                return None
+
+            while node.left:
+                node = node.left
+
+            self.__minimum = node
+
+        return self.__minimum.value
+
+    def max(self) -> Optional[int]:
+        """Get the greatest value of the tree in O(1), see min.
+
+        Returns:
+            Optional[int]: The greatest value, or None if the tree is empty.
+        """
+
+        if self.__maximum is None:
+            node = self.root
+
+            if not node:
+                return None
+
+            while node.right:
+                node = node.right
+
+            self.__maximum = node
+
+        return self.__maximum.value
+
+    def pop_min(self) -> int:
+        """Remove and return the least value of the tree in O(log n), e.g. to
+        use the tree as a double-ended priority queue. There is no search: the
+        path to the least value is the left spine of the tree.
+
+        Raises:
+            IndexError: If the tree is empty.
+
+        Returns:
+            int: The least value.
+        """
+
+        return self.__pop(True)
+
+    def pop_max(self) -> int:
+        """Remove and return the greatest value of the tree in O(log n), see
+        pop_min.
+
+        Raises:
+            IndexError: If the tree is empty.
+
+        Returns:
+            int: The greatest value.
+        """
+
+        return self.__pop(False)
+
+    def __pop(self, minimum: bool) -> int:
+        """Unlink the node at the end of the left or right spine, which has at
+        most one child, on the other side, and retrace the spine.
+
+        Args:
+            minimum (bool): True to remove the least value, False for the greatest.
+
+        Raises:
+            IndexError: If the tree is empty.
+
+        Returns:
+            int: The removed value.
+        """
+
+        node = self.root
+
+        if not node:
+            raise IndexError("pop from an empty tree")
+
+        path = self.__path
+        path.clear()
+
+        while node.left if minimum else node.right:
+            path.append(node)
+            node = node.left if minimum else node.right
+
+        self._untrack(node, path[-1] if path else None)
+        self._replace(path[-1] if path else None, node, node.right if minimum else node.left)
+        self._retrace(path, -1)
+
+        return node.value
+
+    def _track(self, node: Node) -> None:
+        """Update the cached least and greatest nodes once a new node has been
+        linked into the tree.
+
+        Args:
+            node (Node): The new node.
+        """
+
+        if node is self.root:
+            self.__minimum = self.__maximum = node
+        elif self.__minimum is not None and node.value < self.__minimum.value:
+            self.__minimum = node
+        elif self.__maximum is not None and node.value > self.__maximum.value:
+            self.__maximum = node
+
+    def _untrack(self, node: Node, parent: Optional[Node]) -> None:
+        """Update the cached least and greatest nodes before a node with at most
+        one child is unlinked from the tree. If it is the least node, the next
+        one is its parent, unless it has a right subtree, whose least node is
+        next instead (and symmetrically for the greatest node).
+
+        Args:
+            node (Node): The node to be unlinked.
+            parent (Optional[Node]): The parent of the node, None for the root.
+        """
+
+        if node is self.__minimum:
+            child = node.right
+
+            while child and child.left:
+                child = child.left
+
+            self.__minimum = child or parent
+
+        if node is self.__maximum:
+            child = node.left
+
+            while child and child.right:
+                child = child.right
+
+            self.__maximum = child or parent
+
+    def _reset(self) -> None:
+        """Find the least and greatest nodes again once the tree has been
+        rebuilt or emptied, and invalidate every cursor."""
+
+        node = self.__minimum = self.__maximum = self.root
+        self.version += 1
+
+        if node:
+            while node.left:
+                node = node.left
+
+            self.__minimum = node
+            node = self.root
+
+            while node.right:
+                node = node.right
+
+            self.__maximum = node
+
+    def add(self, value: int) -> bool:
+        """Adds the queried value to the binary tree if it is valid. The value
+        is valid if the value is not null and it is unique. If the value is
+        invalid, the operation is rejected according to the error policy.
+
+        Args:
+            value (int): The value to be added to the tree.
+
+        Returns:
+            bool: True if the value was added, False if it was rejected.
+        """
+
+        if value is None:
+            return self._reject(Message.NULL_VALUE_EXCEPTION, value)
+
+        if not self._insert(value)[1]:
+            return self._reject(Message.COMMON_VALUE_EXCEPTION, value)
+
+        return True
+
+    def _insert(self, value: int) -> Tuple[Node, bool]:
+        """Insert the value into the binary tree. The insertion is iterative:
+        we descend from the root, recording every visited node on the path
+        stack, until we either find the value (a duplicate) or fall off the
+        tree, where a new leaf is attached. Afterwards, the path is retraced
+        bottom-up (see _retrace).
+
+        A value greater than the greatest one (or less than the least one) is
+        appended without comparing it along the way: its path is the right (or
+        left) spine, which ends at the cached greatest (or least) node. This
+        makes sequential ingest, e.g. of timestamps, cheaper.
+
+        Args:
+            value (int): The value to be added to the tree.
+
+        Returns:
+            Tuple[Node, bool]: The node holding the value, and True if it was inserted or False
+            if the value is a duplicate.
+        """
+
+        node = self.root
+
+        if not node:
+            self.root = self.node_class(value)
+            self._track(self.root)
+            return self.root, True
+
+        path = self.__path
+        path.clear()
+
+        maximum = self.__maximum
+        minimum = self.__minimum
+
+        if maximum is not None and value > maximum.value:
+            while node is not maximum:
+                path.append(node)
+                node = node.right
+
+            path.append(node)
+            leaf = node.right = self.__maximum = self.node_class(value)
+            self._retrace(path, 1)
+
+            return leaf, True
+
+        if minimum is not None and value < minimum.value:
+            while node is not minimum:
+                path.append(node)
+                node = node.left
+
+            path.append(node)
+            leaf = node.left = self.__minimum = self.node_class(value)
+            self._retrace(path, 1)
+
+            return leaf, True
+
+        while True:
+            path.append(node)
+
+            if value < node.value:
+                if not node.left:
+                    leaf = node.left = self.node_class(value)
+                    break
+
+                node = node.left
+            elif value > node.value:
+                if not node.right:
+                    leaf = node.right = self.node_class(value)
+                    break
+
+                node = node.right
+            else:
+                return node, False
+
+        self._track(leaf)
+        self._retrace(path, 1)
+
+        return leaf, True
+
+    def remove(self, value: int) -> bool:
+        """Removes the node with the queried value in the binary tree. If the
+        value is null or does not exist, the operation is rejected according to
+        the error policy.
+
+        Args:
+            value (int): The queried value.
+
+        Returns:
+            bool: True if the value was removed, False if it was rejected.
+        """
+        if value is None:
+            return self._reject(Message.NULL_VALUE_EXCEPTION, value)
+
+        if not self._delete(value):
+            return self._reject(Message.VOID_VALUE_EXCEPTION, value)
+
+        return True
+
+    def _reject(self, message: Message, value: int) -> bool:
+        """Count a rejected operation and respond to it according to the error
+        policy.
+
+        Args:
+            message (Message): The reason the operation was rejected.
+            value (int): The value of the rejected operation.
+
+        Returns:
+            bool: False, unless the error policy raises an exception.
+        """
+
+        self.rejections[message] += 1
+
+        return self.error_policy.reject(message, value)
+
+    def _delete(self, value: int) -> Optional[Node]:
+        """Delete the value from the binary tree. The removal is iterative and
+        uses the standard BST removal. The only difference here is that the AVL
+        tree utilizes a height heuristic to determine the successor node. There
+        are three cases to consider:
+
+        1. The queried node does not have any descendants, i.e. the leaf node. Then we simply
+        unlink it from its parent.
+
+        2. The queried node has one subtree. Then its only child takes its place.
+
+        3. The queried node has two subtrees. We can either use the node with the maximum value
+        of the left subtree as the successor, or the node with the minimum value of the right
+        subtree. However, we can improve this by using a height heuristic. If the left subtree
+        is taller than the right subtree, then the successor will be the greatest node in the
+        left subtree. Otherwise, the successor will be the smallest node in the right subtree.
+        The successor has at most one child, so it is unlinked as in case 1 or 2, and then takes
+        the place of the queried node. Nodes are moved rather than having their values copied,
+        so a node always keeps its own value (and any data attached to it).
+
+        Afterwards, the path from the unlinked node's parent up to the root is
+        retraced (see _retrace).
+
+        Args:
+            value (int): The queried value.
+
+        Returns:
+            Optional[Node]: The removed node, or None if the value does not exist.
+        """
+
+        path = self.__path
+        path.clear()
+
+        node = self.root
+
+        while node:
+            if value < node.value:
+                path.append(node)
+                node = node.left
+            elif value > node.value:
+                path.append(node)
+                node = node.right
+            else:
+                break
+
+        if not node:
+            return None
+
+        if node.left and node.right:
+            index = len(path)
+            path.append(node)
+
+            if node.left.height > node.right.height:
+                successor = node.left
+
+                while successor.right:
+                    path.append(successor)
+                    successor = successor.right
+            else:
+                successor = node.right
+
+                while successor.left:
+                    path.append(successor)
+                    successor = successor.left
+
+            self._replace(path[-1], successor, successor.left or successor.right)
+
+            successor.left = node.left
+            successor.right = node.right
+            successor.height = node.height
+            successor.balance_factor = node.balance_factor
+            successor.size = node.size
+
+            self._replace(path[index - 1] if index else None, node, successor)
+            path[index] = successor
+        else:
+            self._untrack(node, path[-1] if path else None)
+            self._replace(path[-1] if path else None, node, node.left or node.right)
+
+        self._retrace(path, -1)
+
+        node.left = node.right = None
+
+        return node
+
+    def extend(self, iterable: Iterable[int]) -> None:
+        """Add every value of a batch to the tree. Values which are already in
+        the tree are skipped silently. If the batch is small relative to the
+        tree, the values are inserted one at a time. Otherwise, the values of
+        the tree and the sorted batch are merged in a single linear pass and the
+        tree is rebuilt from the result, which is cheaper than paying a descent
+        and a retrace for every value. The rebuild relinks the existing nodes,
+        so whatever they carry besides their value, e.g. a map's payload, is
+        kept.
+
+        Args:
+            iterable (Iterable[int]): The values to be added, in any order.
+        """
+
+        batch = sorted(set(iterable))
+
+        if not batch:
+            return None
+
+        if not self.__prefers_rebuild(len(batch)):
+            for value in batch:
+                self._insert(value)
+
+            return None
+
+        values = []
+        batch_index = 0
+
+        for node in self._nodes():
+            value = node.value
+
+            while batch_index < len(batch) and batch[batch_index] < value:
+                values.append(batch[batch_index])
+                batch_index += 1
+
+            if batch_index < len(batch) and batch[batch_index] == value:
+                batch_index += 1
+
+            values.append(node)
+
+        values.extend(batch[batch_index:])
+
+        self._assign(values)
+
+    def add_many(self, values: Iterable[int]) -> BatchResult:
+        """Add a batch of values to the tree. The batch may be any iterable,
+        including a NumPy array. Rather than displaying a message for every
+        null or duplicate value, the outcome of each value is reported in the
+        returned mask. The batch is sorted once; if it is large relative to the
+        tree, it is merged with the nodes of the tree and the tree is rebuilt
+        in a single linear pass, otherwise the values are inserted in ascending
+        order. If a value occurs several times in the batch, only its first
+        occurrence counts as inserted.
+
+        Args:
+            values (Iterable[int]): The values to be added.
+
+        Returns:
+            BatchResult: The mask of inserted values, the number of inserted values and the
+            number of duplicate or null values.
+        """
+
+        batch, order, is_array = self.__prepare_batch(values)
+        mask = [False] * len(batch)
+
+        if not self.__prefers_rebuild(len(order)):
+            for index in order:
+                mask[index] = self._insert(batch[index])[1]
+
+            return self.__batch_result(mask, is_array, len(order), Message.COMMON_VALUE_EXCEPTION)
+
+        merged = []
+        existing = self._nodes()
+        current = next(existing, None)
+
+        for index in order:
+            value = batch[index]
+
+            while current is not None and current.value < value:
+                merged.append(current)
+                current = next(existing, None)
+
+            if current is not None and current.value == value:
+                continue
+
+            if merged and merged[-1] == value:
+                continue
+
+            merged.append(value)
+            mask[index] = True
+
+        if current is not None:
+            merged.append(current)
+            merged.extend(existing)
+
+        self._assign(merged)
+
+        return self.__batch_result(mask, is_array, len(order), Message.COMMON_VALUE_EXCEPTION)
+
+    def remove_many(self, values: Iterable[int]) -> BatchResult:
+        """Remove a batch of values from the tree. The batch may be any
+        iterable, including a NumPy array. The outcome of each value is
+        reported in the returned mask instead of displaying a message. If the
+        batch is large relative to the tree, the remaining nodes are collected
+        in a single linear pass and the tree is rebuilt, otherwise the values
+        are removed in ascending order. If a value occurs several times in the
+        batch, only its first occurrence counts as removed.
+
+        Args:
+            values (Iterable[int]): The values to be removed.
+
+        Returns:
+            BatchResult: The mask of removed values, the number of removed values and the number
+            of missing or null values.
+        """
+
+        batch, order, is_array = self.__prepare_batch(values)
+        mask = [False] * len(batch)
+
+        if not self.__prefers_rebuild(len(order)):
+            for index in order:
+                mask[index] = self._delete(batch[index]) is not None
+
+            return self.__batch_result(mask, is_array, len(order), Message.VOID_VALUE_EXCEPTION)
+
+        remaining = []
+        position = 0
+
+        for node in self._nodes():
+            current = node.value
+
+            while position < len(order) and batch[order[position]] < current:
+                position += 1
+
+            if position < len(order) and batch[order[position]] == current:
+                mask[order[position]] = True
+                position += 1
+            else:
+                remaining.append(node)
+
+        self._assign(remaining)
+
+        return self.__batch_result(mask, is_array, len(order), Message.VOID_VALUE_EXCEPTION)
+
+    def contains_many(self, values: Iterable[int]) -> BatchResult:
+        """Determine whether each value of a batch exists within the tree. The
+        batch may be any iterable, including a NumPy array. The values are
+        looked up in ascending order, and neighbouring values share their
+        descent. We keep a stack of the nodes on the previous search path where
+        the search turned left, since their values are the upper bounds of the
+        subtrees below them. The next (greater or equal) value only has to back
+        up to the lowest such node whose value is still greater than it, and
+        descend from that node's left child instead of from the root. For
+        clustered values this skips most of the search path.
+
+        Args:
+            values (Iterable[int]): The values queried.
+
+        Returns:
+            BatchResult: The mask of values found, the number of values found and the number of
+            missing or null values.
+        """
+
+        batch, order, is_array = self.__prepare_batch(values)
+        mask = [False] * len(batch)
+        lefts = []
+
+        for index in order:
+            value = batch[index]
+
+            while lefts and not value < lefts[-1].value:
+                lefts.pop()
+
+            node = lefts[-1].left if lefts else self.root
+
+            while node:
+                if value < node.value:
+                    lefts.append(node)
+                    node = node.left
+                elif value > node.value:
+                    node = node.right
+                else:
+                    mask[index] = True
+                    break
+
+        return self.__batch_result(mask, is_array)
+
+    def __prepare_batch(self, values: Iterable[int]) -> Tuple[list, list, bool]:
+        """Convert a batch into a list and sort it once. Null values are left
+        out of the order, so they are never looked up.
+
+        Args:
+            values (Iterable[int]): The batch, any iterable or a NumPy array.
+
+        Returns:
+            Tuple[list, list, bool]: The batch as a list, the indices of its non-null values in
+            ascending order of value, and whether the batch was a NumPy array.
+        """
+
+        is_array = type(values).__module__ == "numpy"
+        batch = values.tolist() if is_array else list(values)
+        order = [index for index, value in enumerate(batch) if value is not None]
+        order.sort(key=batch.__getitem__)
+
+        return batch, order, is_array
+
+    def __batch_result(
+        self,
+        mask: list,
+        is_array: bool,
+        valid: Optional[int] = None,
+        message: Optional[Message] = None,
+    ) -> BatchResult:
+        """Summarise the mask of a batched operation. For a batched mutation,
+        the rejected values are also added to the rejection counters, without
+        invoking the error policy for each of them.
+
+        Args:
+            mask (list): Whether the operation succeeded for each value of the batch.
+            is_array (bool): Whether the batch was a NumPy array.
+            valid (Optional[int], optional): The number of non-null values in the batch.
+            message (Optional[Message], optional): The reason a non-null value is rejected, or
+            None if the operation is not a mutation.
+
+        Returns:
+            BatchResult: The mask (as a NumPy array if the batch was one) and its counts.
+        """
+
+        succeeded = sum(mask)
+
+        if message is not None:
+            self.rejections[Message.NULL_VALUE_EXCEPTION] += len(mask) - valid
+            self.rejections[message] += valid - succeeded
+
+        if is_array:
+            import numpy
+
+            return BatchResult(numpy.array(mask, dtype=bool), succeeded, len(mask) - succeeded)
+
+        return BatchResult(mask, succeeded, len(mask) - succeeded)
+
+    def __prefers_rebuild(self, batch_size: int) -> bool:
+        """Decide whether a batch should be merged by rebuilding the tree. A
+        rebuild costs O(n + k) for a batch of k values, while one operation per
+        value costs O(k log n), so rebuilding wins once the batch is large
+        relative to the tree.
+
+        Args:
+            batch_size (int): The number of values in the batch.
+
+        Returns:
+            bool: True if the tree should be rebuilt.
+        """
+
+        height = self.root.height + 1 if self.root else 1
+
+        return batch_size * height >= len(self)
+
+    def _assign(self, values: list) -> None:
+        """Replace the contents of the tree with a perfectly balanced tree
+        built from distinct values in ascending order. Nodes of the tree may
+        stand in for their values, in which case they are relinked instead of
+        being created again.
+
+        Args:
+            values (list): The distinct values (or nodes holding them), in ascending order.
+        """
+
+        self.root = self.__build(values, 0, len(values))
+        self._reset()
+
+    def __build(self, values: list, start: int, end: int) -> Optional[Node]:
+        """Build a perfectly balanced subtree from a slice of sorted values.
+        The middle value becomes the root of the subtree and the values on
+        either side are built into its left and right subtrees. Each node is
+        visited once, so this takes linear time, and the recursion depth is
+        only logarithmic.
+
+        Args:
+            values (list): The distinct values (or nodes holding them), in ascending order.
+            start (int): The index of the first value of the slice.
+            end (int): The index after the last value of the slice.
+
+        Returns:
+            Optional[Node]: The root of the subtree, or None if the slice is empty.
+        """
+
+        if start >= end:
+            return None
+
+        middle = (start + end) // 2
+        node = values[middle]
+
+        if not isinstance(node, Node):
+            node = self.node_class(node)
+
+        node.left = self.__build(values, start, middle)
+        node.right = self.__build(values, middle + 1, end)
+
+        self.update(node)
+
+        return node
+
+    def split(self, value: int) -> Tuple[AVLTree, AVLTree]:
+        """Split the tree at the queried value into the tree of values less
+        than it and the tree of values greater than or equal to it. Only the
+        nodes on the search path are relinked, by joining the subtrees hanging
+        off the path on either side, so this takes O(log n) time. The nodes
+        are reused, so this tree is left empty.
+
+        Args:
+            value (int): The value to split at.
+
+        Returns:
+            Tuple[AVLTree, AVLTree]: The trees of values less than, and greater than or equal to,
+            the queried value.
+        """
+
+        left, node, right = self.__split(self._consume(), value)
+
+        if node:
+            right = self.__join(None, node, right)
+
+        return self.__derive(left), self.__derive(right)
+
+    def join(self, other: AVLTree) -> AVLTree:
+        """Concatenate this tree with a tree whose values are all greater. The
+        minimum of the other tree becomes the joining node, and is linked in
+        at the point of the taller tree's spine where the heights match, so
+        this takes O(log n) time. Both trees are left empty, since their nodes
+        are reused.
+
+        Args:
+            other (AVLTree): The tree of greater values.
+
+        Raises:
+            ValueError: If the trees overlap.
+
+        Returns:
+            AVLTree: The tree of the values of both trees.
+        """
+
+        if self.root and other.root:
+            if self.max() >= other.min():
+                raise ValueError("the values of the other tree must be greater")
+
+        return self.__derive(self.__join_pair(self._consume(), other._consume()))
+
+    def union(self, other: AVLTree) -> AVLTree:
+        """Get the tree of the values in either tree. The other tree is split
+        at the root of this tree, and the halves are merged with the subtrees
+        on either side recursively before being joined again, which takes
+        O(m log(n / m + 1)) time for trees of sizes m <= n. Values found in
+        both trees keep the node of this tree. Both trees are left empty, since
+        their nodes are reused.
+
+        Args:
+            other (AVLTree): The other tree.
+
+        Returns:
+            AVLTree: The union of the trees.
+        """
+
+        if other is self:
+            return self.__derive(self._consume())
+
+        return self.__derive(self.__union(self._consume(), other._consume()))
+
+    def intersection(self, other: AVLTree) -> AVLTree:
+        """Get the tree of the values in both trees, in O(m log(n / m + 1))
+        time like union. Both trees are left empty, since their nodes are
+        reused.
+
+        Args:
+            other (AVLTree): The other tree.
+
+        Returns:
+            AVLTree: The intersection of the trees.
+        """
+
+        if other is self:
+            return self.__derive(self._consume())
+
+        return self.__derive(self.__intersection(self._consume(), other._consume()))
+
+    def difference(self, other: AVLTree) -> AVLTree:
+        """Get the tree of the values in this tree but not in the other one, in
+        O(m log(n / m + 1)) time like union. Both trees are left empty, since
+        their nodes are reused.
+
+        Args:
+            other (AVLTree): The other tree.
+
+        Returns:
+            AVLTree: The difference of the trees.
+        """
 
+        if other is self:
+            self._consume()
+            return self.__derive(None)
 
-class AVLTree(object):
-    """An AVL tree is a self-balancing binary search tree. In an AVL tree, the heights of the two
-    child subtrees of any node differ by at most one; if at any time they differ by more than one,
-    rebalancing is done to restore this property. Source: https://en.wikipedia.org/wiki/AVL_tree.
+        return self.__derive(self.__difference(self._consume(), other._consume()))
 
-    Attributes:
-        balance_factor (int): The difference between the height of the left subtree and that of the
-        root (Node): The root of the binary tree.
-        right subtree of a node.
-    """
+    def _consume(self) -> Optional[Node]:
+        """Take the nodes of the tree for a split, join or set operation, which
+        relinks them into new trees. The tree is left empty.
 
-    def __init__(self):
-        """Initialize the AVL tree."""
+        Returns:
+            Optional[Node]: The root of the binary tree.
+        """
 
+        root = self.root
         self.root = None
-        self.balance_factor = 0
+        self._reset()
 
-    def find_minimum(self, node: Node) -> int:
-        """Find the node with the minimum value in the binary tree.
+        return root
+
+    def _link(self, node: Node, left: Optional[Node], right: Optional[Node]) -> Node:
+        """Make the left and right subtrees the children of a node and update
+        it. Split, join and the set operations only modify nodes through this
+        method and balance.
 
         Args:
-            node (Node): The current node.
+            node (Node): The node.
+            left (Optional[Node]): The new left subtree.
+            right (Optional[Node]): The new right subtree.
 
         Returns:
-            int: The least value of the binary tree.
+            Node: The updated node.
         """
-        while node.left:
-            node = node.left
 
-        return node.value
+        node.left = left
+        node.right = right
 
-    def find_maximum(self, node: Node) -> int:
-        """Find the node with the maximum value in the binary tree.
+        self.update(node)
+
+        return node
+
+    def __derive(self, root: Optional[Node]) -> AVLTree:
+        """Create a tree of the same kind as this one which holds the given
+        nodes.
 
         Args:
-            node (Node): The current node.
+            root (Optional[Node]): The root of the new tree.
 
         Returns:
-            int: The greatest value of the binary tree.
+            AVLTree: The new tree.
         """
-        while node.right:
-            node = node.right
 
-        return node.value
+        tree = copy(self)
+        tree.root = root
+        tree.rejections = dict.fromkeys(Message, 0)
+        tree.__path = []
+        tree._reset()
 
-    def add(self, value: int) -> None:
-        """Adds the queried value to the binary tree if it is valid. The value
-        is valid if the value is not null and it is unique. Display an
-        exception message if the value is invalid.
+        if self.instrumentation:
+            self.instrumentation.detach(tree)
+            tree.instrumentation = None
+
+        if self.journal:
+            self.journal.detach(tree)
+            tree.journal = None
+
+        return tree
+
+    def __split(
+        self, node: Optional[Node], value: int
+    ) -> Tuple[Optional[Node], Optional[Node], Optional[Node]]:
+        """Split a subtree into the subtrees of values less than and greater
+        than the queried value, and the node holding the value itself.
 
         Args:
-            value (int): The value to be added to the tree.
+            node (Optional[Node]): The root of the subtree.
+            value (int): The value to split at.
 
         Returns:
-            None: Nothing is returned.
+            Tuple[Optional[Node], Optional[Node], Optional[Node]]: The subtree of lesser values,
+            the node holding the value (None if it does not exist) and the subtree of greater
+            values.
         """
 
-        if value is None:
-            Message.print(Message.NULL_VALUE_EXCEPTION)
-            return None
+        if not node:
+            return None, None, None
 
-        if self.contains(value):
-            Message.print(Message.COMMON_VALUE_EXCEPTION)
-            return None
+        if value < node.value:
+            left, match, right = self.__split(node.left, value)
+            return left, match, self.__join(right, node, node.right)
 
-        if not self.root:
-            self.root = Node(value)
-            return None
+        if value > node.value:
+            left, match, right = self.__split(node.right, value)
+            return self.__join(node.left, node, left), match, right
 
-        self.root = self.__add(self.root, value)
+        return node.left, node, node.right
 
-    def __add(self, node: Node, value: int) -> Node:
-        """Adds the queried value to the binary tree. It calls itself
-        recursively to determine where in the binary should the value be
-        inserted. The base case is if we have reached an empty or null node,
-        that means we have found the correct subtree, and hence, the correct
-        place to insert the node. Afterwards, we backtrack and update the
-        heights and rebalance all affected nodes (if needed). The new root will
-        be the determined after rotations (if any).
+    def __join(self, left: Optional[Node], node: Node, right: Optional[Node]) -> Node:
+        """Join two subtrees with a node whose value lies between them. If
+        their heights differ by more than one, the node is linked in along the
+        inner spine of the taller subtree, where the heights match, and the
+        spine is rebalanced on the way back up. This takes time proportional
+        to the difference in heights.
 
         Args:
-            node (Node): Initally, the root node.
-            value (int): The value to be added to the tree.
+            left (Optional[Node]): The subtree of lesser values.
+            node (Node): The joining node.
+            right (Optional[Node]): The subtree of greater values.
 
         Returns:
-            Node: The root node after rebalancing the tree.
+            Node: The root of the joined subtree.
         """
 
-        if not node:
-            return Node(value)
+        left_height = left.height if left else -1
+        right_height = right.height if right else -1
 
-        if value < node.value:
-            node.left = self.__add(node.left, value)
+        if left_height > right_height + 1:
+            return self.__join_right(left, node, right, right_height)
+
+        if right_height > left_height + 1:
+            return self.__join_left(left, node, right, left_height)
+
+        return self._link(node, left, right)
+
+    def __join_right(self, left: Node, node: Node, right: Optional[Node], height: int) -> Node:
+        """Join along the right spine of the taller left subtree.
+
+        Args:
+            left (Node): The subtree of lesser values.
+            node (Node): The joining node.
+            right (Optional[Node]): The subtree of greater values.
+            height (int): The height of the right subtree.
+
+        Returns:
+            Node: The root of the joined subtree.
+        """
+
+        child = left.right
+
+        if (child.height if child else -1) <= height + 1:
+            child = self._link(node, child, right)
         else:
-            node.right = self.__add(node.right, value)
+            child = self.__join_right(child, node, right, height)
 
-        self.update(node)
+        return self.balance(self._link(left, left.left, child))
+
+    def __join_left(self, left: Optional[Node], node: Node, right: Node, height: int) -> Node:
+        """Join along the left spine of the taller right subtree.
+
+        Args:
+            left (Optional[Node]): The subtree of lesser values.
+            node (Node): The joining node.
+            right (Node): The subtree of greater values.
+            height (int): The height of the left subtree.
+
+        Returns:
+            Node: The root of the joined subtree.
+        """
+
+        child = right.left
+
+        if (child.height if child else -1) <= height + 1:
+            child = self._link(node, left, child)
+        else:
+            child = self.__join_left(left, node, child, height)
 
-        return self.balance(node)
+        return self.balance(self._link(right, child, right.right))
 
-    def remove(self, value: int) -> None:
-        """Removes the node with the queried value in the binary tree.
+    def __join_pair(self, left: Optional[Node], right: Optional[Node]) -> Optional[Node]:
+        """Join two subtrees without a joining node, by taking the minimum of
+        the right subtree as the joining node.
 
         Args:
-            value (int): The queried value.
+            left (Optional[Node]): The subtree of lesser values.
+            right (Optional[Node]): The subtree of greater values.
 
         Returns:
-            None: Nothing is returned.
+            Optional[Node]: The root of the joined subtree.
         """
-        if value is None:
-            Message.print(Message.NULL_VALUE_EXCEPTION)
-            return None
 
-        if not self.contains(value):
-            Message.print(Message.VOID_VALUE_EXCEPTION)
-            return None
+        if not right:
+            return left
 
-        self.root = self.__remove(self.root, value)
+        right, minimum = self.__pop_minimum(right)
 
-    def __remove(self, node: Node, value: int) -> None:
-        """Implement the remove method using the standard recursive
-        implementation of remove for a normal BST. The only difference here is
-        that the AVL tree utilizes a height heuristic to determine the
-        successor node. The successor node will be determined in terms of the
-        height of the two subtrees belonging to the queried node. There are
-        four cases to consider:
+        return self.__join(left, minimum, right)
+
+    def __pop_minimum(self, node: Node) -> Tuple[Optional[Node], Node]:
+        """Detach the node holding the minimum value of a subtree.
+
+        Args:
+            node (Node): The root of the subtree.
+
+        Returns:
+            Tuple[Optional[Node], Node]: The root of the remaining subtree and the minimum node.
+        """
 
-        1. The queried node does not have any descendants, i.e. the leaf node. Then we could simply
-        look at case 2 and case 3.
+        if not node.left:
+            return node.right, node
 
-        2. The queried node has one subtree, the left subtree. Then return the immediate left child
-        of the left subtree.
+        left, minimum = self.__pop_minimum(node.left)
 
-        3. The queried node has one subtree, the right subtree. Then return the immediate right
-        child of the right subtree.
+        return self.__join(left, node, node.right), minimum
 
-        4.The queried node has two subtrees. We can either return the maximum value as the new
-        successor, or the minimum value as the new successor. However, we can improve this by
-        using a height heuristic. If the left subtree is taller than the right subtree, then
-        the new successor will be the greatest value in the left subtree. Otherwise, the
-        new successor will be the smallest value in the right subtree.
+    def __union(self, node: Optional[Node], other: Optional[Node]) -> Optional[Node]:
+        """Merge two subtrees, keeping the nodes of the first one for values
+        in both.
 
         Args:
-            node (Node): Initially the root node, until we find the node to be removed.
-            value (int): The value to be found in the tree.
+            node (Optional[Node]): The root of the first subtree.
+            other (Optional[Node]): The root of the second subtree.
 
         Returns:
-            None: Return the rebalanced root node.
+            Optional[Node]: The root of the union.
         """
+
         if not node:
+            return other
+
+        if not other:
+            return node
+
+        left, _, right = self.__split(other, node.value)
+        node_left, node_right = node.left, node.right
+
+        return self.__join(self.__union(node_left, left), node, self.__union(node_right, right))
+
+    def __intersection(self, node: Optional[Node], other: Optional[Node]) -> Optional[Node]:
+        """Keep the values of the first subtree which are also in the second.
+
+        Args:
+            node (Optional[Node]): The root of the first subtree.
+            other (Optional[Node]): The root of the second subtree.
+
+        Returns:
+            Optional[Node]: The root of the intersection.
+        """
+
+        if not node or not other:
             return None
 
-        if value < node.value:
-            node.left = self.__remove(node.left, value)
-        elif value > node.value:
-            node.right = self.__remove(node.right, value)
+        left, match, right = self.__split(other, node.value)
+        left = self.__intersection(node.left, left)
+        right = self.__intersection(node.right, right)
+
+        if match:
+            return self.__join(left, node, right)
+
+        return self.__join_pair(left, right)
+
+    def __difference(self, node: Optional[Node], other: Optional[Node]) -> Optional[Node]:
+        """Keep the values of the first subtree which are not in the second.
+
+        Args:
+            node (Optional[Node]): The root of the first subtree.
+            other (Optional[Node]): The root of the second subtree.
+
+        Returns:
+            Optional[Node]: The root of the difference.
+        """
+
+        if not node or not other:
+            return node
+
+        left, _, right = self.__split(node, other.value)
+        other_left, other_right = other.left, other.right
+
+        return self.__join_pair(
+            self.__difference(left, other_left), self.__difference(right, other_right)
+        )
+
+    def _replace(self, parent: Optional[Node], node: Node, replacement: Optional[Node]) -> None:
+        """Replace a child of the parent (or the root, if there is no parent)
+        with another node.
+
+        Args:
+            parent (Optional[Node]): The parent of the node to be replaced.
+            node (Node): The node to be replaced.
+            replacement (Optional[Node]): The node which takes its place.
+        """
+
+        if not parent:
+            self.root = replacement
+        elif parent.left is node:
+            parent.left = replacement
         else:
-            if not node.left:
-                return node.right
-            elif not node.right:
-                return node.left
-            else:
-                if node.left.height > node.right.height:
-                    _max = self.find_maximum(node.left)
-                    node.value = _max
-                    node.left = self.__remove(node.left, _max)
-                else:
-                    _min = self.find_minimum(node.right)
-                    node.value = _min
-                    node.right = self.__remove(node.right, _min)
+            parent.right = replacement
 
-        self.update(node)
+    def _retrace(self, path: list, delta: int) -> None:
+        """Walk back up the path stack after an insertion or removal, updating
+        the heights and rebalancing the nodes along the way. We can stop as
+        soon as a subtree's height is unchanged, since none of its ancestors
+        can be affected. After an insertion, a rotation always restores the
+        subtree's previous height, so at most one (single or double) rotation
+        is performed. After a removal, rotations may propagate up to the root.
+        The remaining ancestors only need their subtree size adjusted.
+
+        Args:
+            path (list): The nodes visited on the way down, from the root.
+            delta (int): The change in the number of values, 1 or -1.
+        """
+
+        self.version += 1
+
+        while path:
+            node = path.pop()
+            height = node.height
+
+            self.update(node)
+
+            if node.balance_factor < -1 or node.balance_factor > 1:
+                parent = self.balance(node)
+                self._replace(path[-1] if path else None, node, parent)
+                node = parent
+
+            if node.height == height:
+                break
+
+        for node in path:
+            node.size += delta
+
+    def _find(self, value: int) -> Optional[Node]:
+        """Find the node holding the queried value.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            Optional[Node]: The node holding the value, or None if it does not exist.
+        """
+
+        node = self.root
 
-        return self.balance(node)
+        while node:
+            if value < node.value:
+                node = node.left
+            elif value > node.value:
+                node = node.right
+            else:
+                return node
+
+        return None
 
     def contains(self, value: int) -> bool:
-        """Determine whether the queried value exists within the tree.
+        """Determine whether the queried value exists within the tree. Since
+        the tree is a binary search tree, we only have to descend along a
+        single path: go left if the queried value is smaller than the current
+        node's value, go right if it is greater, and stop once it is found or
+        we fall off the tree (see _find).
 
         Args:
             value (int): The value queried.
@@ -194,52 +1499,301 @@ class AVLTree(object):
             bool: A boolean value based on whether the value exists or not.
         """
 
-        return self.__contains(self.root, value)
+        return self._find(value) is not None
 
-    def __contains(self, node: Node, value: int) -> bool:
-        """Recursively search the left and right subtree to check if the value
-        exists within the binary tree. The base case is if we have reached an
-        empty node, we return false, because a null node indicates that we have
-        reached the end of a subtree, therefore, the value does not exist in
-        the subtree.
+    def __contains__(self, value: int) -> bool:
+        """Determine whether the queried value exists within the tree, so that
+        the in operator searches the tree instead of scanning it. See contains.
 
         Args:
-            node (Node): The current node.
             value (int): The value queried.
 
         Returns:
             bool: A boolean value based on whether the value exists or not.
         """
 
-        if not node:
-            return False
+        return self.contains(value)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the values of the tree in ascending order.
+
+        Returns:
+            Iterator[int]: The values in ascending order.
+        """
+
+        return self.irange()
+
+    def __reversed__(self) -> Iterator[int]:
+        """Iterate over the values of the tree in descending order.
+
+        Returns:
+            Iterator[int]: The values in descending order.
+        """
+
+        return self.irange(reverse=True)
+
+    def irange(
+        self,
+        low: Optional[int] = None,
+        high: Optional[int] = None,
+        inclusive: Tuple[bool, bool] = (True, True),
+        reverse: bool = False,
+    ) -> Iterator[int]:
+        """Lazily iterate over the values between low and high. Instead of
+        recursing, we keep an explicit stack of the nodes whose values are
+        still to be visited. Finding the first value takes O(log n) and every
+        further value takes O(1) amortized, so a scan over k values costs
+        O(log n + k) no matter how large the tree is.
+
+        Args:
+            low (Optional[int], optional): The lower bound, None for no lower bound.
+            high (Optional[int], optional): The upper bound, None for no upper bound.
+            inclusive (Tuple[bool, bool], optional): Whether the lower and upper bounds are
+            included, respectively.
+            reverse (bool, optional): True to iterate in descending order.
+
+        Returns:
+            Iterator[int]: The values between low and high.
+        """
+
+        return map(attrgetter("value"), self._nodes(low, high, inclusive, reverse))
+
+    def _nodes(
+        self,
+        low: Optional[int] = None,
+        high: Optional[int] = None,
+        inclusive: Tuple[bool, bool] = (True, True),
+        reverse: bool = False,
+    ) -> Iterator[Node]:
+        """Lazily iterate over the nodes whose values are between low and high.
+
+        Args:
+            low (Optional[int], optional): The lower bound, None for no lower bound.
+            high (Optional[int], optional): The upper bound, None for no upper bound.
+            inclusive (Tuple[bool, bool], optional): Whether the lower and upper bounds are
+            included, respectively.
+            reverse (bool, optional): True to iterate in descending order.
+
+        Returns:
+            Iterator[Node]: The nodes whose values are between low and high.
+        """
+
+        if reverse:
+            return self.__descending(low, high, inclusive)
+
+        return self.__ascending(low, high, inclusive)
+
+    def __ascending(
+        self, low: Optional[int], high: Optional[int], inclusive: Tuple[bool, bool]
+    ) -> Iterator[Node]:
+        """Iterate over the nodes between low and high in ascending order.
+        The stack initially holds the nodes on the search path for low whose
+        values are within the lower bound, the smallest on top. Whenever a node
+        is popped, the left spine of its right subtree is pushed.
+
+        Args:
+            low (Optional[int]): The lower bound, None for no lower bound.
+            high (Optional[int]): The upper bound, None for no upper bound.
+            inclusive (Tuple[bool, bool]): Whether the lower and upper bounds are included.
+
+        Yields:
+            Node: The next node in ascending order.
+        """
+
+        low_inclusive, high_inclusive = inclusive
+
+        stack = []
+        node = self.root
+
+        while node:
+            if low is None or low < node.value or (low_inclusive and low == node.value):
+                stack.append(node)
+                node = node.left
+            else:
+                node = node.right
+
+        while stack:
+            node = stack.pop()
+
+            if high is not None and (
+                high < node.value or (not high_inclusive and high == node.value)
+            ):
+                return
+
+            yield node
+
+            node = node.right
+
+            while node:
+                stack.append(node)
+                node = node.left
+
+    def __descending(
+        self, low: Optional[int], high: Optional[int], inclusive: Tuple[bool, bool]
+    ) -> Iterator[Node]:
+        """Iterate over the nodes between low and high in descending order.
+        This mirrors the ascending iteration: the stack starts with the nodes
+        on the search path for high, and right spines take the place of left
+        spines.
+
+        Args:
+            low (Optional[int]): The lower bound, None for no lower bound.
+            high (Optional[int]): The upper bound, None for no upper bound.
+            inclusive (Tuple[bool, bool]): Whether the lower and upper bounds are included.
+
+        Yields:
+            Node: The next node in descending order.
+        """
+
+        low_inclusive, high_inclusive = inclusive
+
+        stack = []
+        node = self.root
+
+        while node:
+            if high is None or high > node.value or (high_inclusive and high == node.value):
+                stack.append(node)
+                node = node.right
+            else:
+                node = node.left
+
+        while stack:
+            node = stack.pop()
+
+            if low is not None and (
+                low > node.value or (not low_inclusive and low == node.value)
+            ):
+                return
+
+            yield node
+
+            node = node.left
+
+            while node:
+                stack.append(node)
+                node = node.right
+
+    def floor(self, value: int) -> Optional[int]:
+        """Find the greatest value in the tree which is less than or equal to
+        the queried value.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            Optional[int]: The floor of the value, or None if there is none.
+        """
+
+        result = None
+        node = self.root
+
+        while node:
+            if value < node.value:
+                node = node.left
+            elif value > node.value:
+                result = node.value
+                node = node.right
+            else:
+                return node.value
+
+        return result
+
+    def ceiling(self, value: int) -> Optional[int]:
+        """Find the least value in the tree which is greater than or equal to
+        the queried value.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            Optional[int]: The ceiling of the value, or None if there is none.
+        """
+
+        result = None
+        node = self.root
+
+        while node:
+            if value > node.value:
+                node = node.right
+            elif value < node.value:
+                result = node.value
+                node = node.left
+            else:
+                return node.value
+
+        return result
+
+    def successor(self, value: int) -> Optional[int]:
+        """Find the least value in the tree which is strictly greater than the
+        queried value. The queried value does not have to be in the tree.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            Optional[int]: The successor of the value, or None if there is none.
+        """
+
+        result = None
+        node = self.root
+
+        while node:
+            if value < node.value:
+                result = node.value
+                node = node.left
+            else:
+                node = node.right
+
+        return result
+
+    def predecessor(self, value: int) -> Optional[int]:
+        """Find the greatest value in the tree which is strictly less than the
+        queried value. The queried value does not have to be in the tree.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            Optional[int]: The predecessor of the value, or None if there is none.
+        """
 
-        if node.value == value:
-            return True
+        result = None
+        node = self.root
 
-        if self.__contains(node.left, value):
-            return True
+        while node:
+            if value > node.value:
+                result = node.value
+                node = node.right
+            else:
+                node = node.left
 
-        if self.__contains(node.right, value):
-            return True
+        return result
 
     def update(self, node: Node) -> None:
-        """Update the height and balance factor for the current node. Retrieve
-        the left subtree height and the right subtree height. Then the height
-        of the current node will be the maximum between the two subtree heights
-        + 1 (we still have to consider the current node!) as per the definition
-        of 'height' in the context of binary trees. The balance factor is simply the difference
-        between the heights of the two subtrees, as per the definition.
+        """Update the height, balance factor and size for the current node.
+        Retrieve the left subtree height and the right subtree height. Then the
+        height of the current node will be the maximum between the two subtree
+        heights + 1 (we still have to consider the current node!) as per the
+        definition of 'height' in the context of binary trees. The balance factor is simply the
+        difference between the heights of the two subtrees, as per the definition. The size is
+        the number of nodes in the subtree, i.e. the sizes of both subtrees + 1.
 
         Args:
             node (Node): The node to be updated.
         """
 
-        left_height = -1 if not node.left else node.left.height
-        right_height = -1 if not node.right else node.right.height
+        left_height, left_size = -1, 0
+        right_height, right_size = -1, 0
+
+        if node.left:
+            left_height, left_size = node.left.height, node.left.size
+
+        if node.right:
+            right_height, right_size = node.right.height, node.right.size
 
         node.height = 1 + max(left_height, right_height)
         node.balance_factor = right_height - left_height
+        node.size = 1 + left_size + right_size
 
     def balance(self, node: Node) -> Node:
         """Rebalances the tree if any balancing is needed at all. There are.
@@ -264,6 +1818,10 @@ class AVLTree(object):
             Otherwise, the node has a balance factor of values in [-1, 0, 1], meaning the node is
             already balanced.
 
+        The rotations are called directly rather than through the case methods
+        below, since this method sits on the hot path of every insertion and
+        removal.
+
         Args:
             node (Node): Rhe node to be balanced.
 
@@ -272,16 +1830,16 @@ class AVLTree(object):
         """
 
         if node.balance_factor == -2:
-            if node.left.balance_factor <= 0:
-                return self.left_left_case(node)
+            if node.left.balance_factor > 0:
+                node.left = self.left_rotation(node.left)
 
-            return self.left_right_case(node)
+            return self.right_rotation(node)
 
         if node.balance_factor == 2:
-            if node.right.balance_factor >= 0:
-                return self.right_right_case(node)
+            if node.right.balance_factor < 0:
+                node.right = self.right_rotation(node.right)
 
-            return self.right_left_case(node)
+            return self.left_rotation(node)
 
         return node
 
@@ -389,13 +1947,69 @@ class AVLTree(object):
 
         return parent
 
-    def print(self) -> None:
+    def print(
+        self,
+        stream: Optional[IO[str]] = None,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        key: Optional[int] = None,
+        context: int = 0,
+    ) -> int:
         """Displays the binary tree in the terminal.
 
-        Best used when there are not a lot of values to display.
+        Best used when there are not a lot of values to display. For a large
+        tree, the limits draw only part of it, and every subtree cut off is
+        drawn as a marker holding its number of nodes.
+
+        Args:
+            stream (Optional[IO[str]], optional): The writable text stream. By default, the
+            standard output.
+            max_depth (Optional[int], optional): The deepest level drawn, where the root (or the
+            selected subtree's root) is at depth 0. By default, unlimited.
+            max_nodes (Optional[int], optional): The most nodes drawn. By default, unlimited.
+            key (Optional[int], optional): Only draw the subtree of the node holding this value
+            (or of the last node on its search path, if it does not exist).
+            context (int, optional): The number of ancestors of that node to include.
+
+        Returns:
+            int: The number of nodes drawn.
+        """
+
+        node = self.root if key is None else GraphTree.locate(self.root, key, context)
+
+        return DisplayTree.print_tree(
+            node,
+            lambda node: (self._label(node), node.left, node.right),
+            stream=stream,
+            max_depth=max_depth,
+            max_nodes=max_nodes,
+            elided=lambda node: f"[{self._count_nodes(node)}]",
+        )
+
+    def _label(self, node: Node) -> str:
+        """Get the text of a node when the tree is displayed.
+
+        Args:
+            node (Node): The node.
+
+        Returns:
+            str: The text of the node.
+        """
+
+        return str(node.value)
+
+    def _count_nodes(self, node: Node) -> int:
+        """Get the number of nodes of a subtree, shown in place of a subtree
+        which is cut off when the tree is displayed.
+
+        Args:
+            node (Node): The root of the subtree.
+
+        Returns:
+            int: The number of nodes of the subtree.
         """
 
-        DisplayTree.print_tree(self.root, lambda node: (str(node.value), node.left, node.right))
+        return node.size
 
     def graph(self) -> None:
         """Displays the binary tree using graph viz.
@@ -403,3 +2017,42 @@ class AVLTree(object):
         Best used when there are a lot of values to be displayed.
         """
         GraphTree.display_tree(self.root)
+
+    def export_dot(
+        self,
+        output: Union[str, os.PathLike, IO[str]],
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        key: Optional[int] = None,
+        context: int = 0,
+        annotate: bool = True,
+    ) -> int:
+        """Write the binary tree as a DOT graph without rendering it, e.g. to
+        inspect a large tree offline or on a headless server. See
+        GraphTree.write_dot.
+
+        Args:
+            output (Union[str, os.PathLike, IO[str]]): The path of the DOT file, or a writable
+            text file object.
+            max_depth (Optional[int], optional): The deepest level written. By default, unlimited.
+            max_nodes (Optional[int], optional): The most nodes written. By default, unlimited.
+            key (Optional[int], optional): Only write the subtree of the node holding this value.
+            context (int, optional): The number of ancestors of that node to include.
+            annotate (bool, optional): True to annotate every node with its height and balance
+            factor.
+
+        Returns:
+            int: The number of nodes written.
+        """
+
+        return GraphTree.write_dot(
+            self.root,
+            output,
+            max_depth,
+            max_nodes,
+            key,
+            context,
+            annotate,
+            label=self._label,
+            count=self._count_nodes,
+        )
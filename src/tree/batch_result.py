@@ -0,0 +1,23 @@
+"""This module provides the result of a batched operation on an AVL tree."""
+from __future__ import annotations
+
+from typing import NamedTuple, Sequence
+
+
+class BatchResult(NamedTuple):
+    """The result of a batched operation, such as AVLTree.add_many. Instead of
+    displaying a message for every rejected value, the outcome of each value is
+    recorded in a mask, which is aligned with the batch.
+
+    Attributes:
+        mask (Sequence[bool]): Whether the operation succeeded for each value of the batch, i.e.
+        the value was inserted, removed or found. A NumPy array if the batch was a NumPy array,
+        otherwise a list.
+        succeeded (int): The number of values which were inserted, removed or found.
+        failed (int): The number of values which were duplicates (add), missing (remove,
+        contains) or null.
+    """
+
+    mask: Sequence[bool]
+    succeeded: int
+    failed: int
@@ -0,0 +1,469 @@
+"""This module allows the user to share an AVL tree between threads."""
+from __future__ import annotations
+
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from src.tree.node import Node
+from src.tree.avl_tree import AVLTree
+from src.tree.persistent_avl_tree import PersistentAVLTree
+from src.tree.rw_lock import ReadWriteLock
+from src.tree.batch_result import BatchResult
+from src.tree.error_policy import ErrorPolicy
+
+from src.console.message import Message
+
+
+class ConcurrentAVLTree(object):
+    """A concurrent AVL tree wraps an AVLTree so that it can be shared between
+    threads. Queries hold a reader-writer lock for reading, so many of them can
+    run at the same time, while mutations hold it for writing.
+
+    The versions of the tree are those of a PersistentAVLTree: a mutation
+    never modifies a version, but copies the O(log n) nodes on its path into a
+    new version, which shares every other node and then becomes the current
+    one. Long scans (iteration and irange) therefore do not hold the lock at
+    all. Instead, they run on a snapshot, which is simply the current version:
+    it is never modified, so a scan always sees a consistent version without
+    blocking writers, and writers never wait for scans or copy the tree.
+
+    Only sets of values can be shared: a plain AVLTree is adopted along with
+    its nodes, its instrumentation and its journal, which every new version
+    takes over.
+    """
+
+    def __init__(self, tree: Optional[AVLTree] = None):
+        """Initialize the concurrent AVL tree.
+
+        Args:
+            tree (Optional[AVLTree], optional): The AVLTree or PersistentAVLTree to be shared,
+            which must no longer be used directly. By default, an empty tree.
+
+        Raises:
+            TypeError: If the tree holds anything but values, e.g. an AVLMultiset or an AVLMap.
+        """
+
+        self.__tree = ConcurrentAVLTree.__adopt(tree if tree is not None else AVLTree())
+        self.__lock = ReadWriteLock()
+
+    @staticmethod
+    def __adopt(tree: AVLTree) -> PersistentAVLTree:
+        """Make a tree the first version of the shared tree. Its nodes become
+        those of a persistent tree, which shares them with no other tree.
+
+        Args:
+            tree (AVLTree): The tree to be shared.
+
+        Raises:
+            TypeError: If the tree holds anything but values.
+
+        Returns:
+            PersistentAVLTree: The first version.
+        """
+
+        if isinstance(tree, PersistentAVLTree):
+            return tree
+
+        if not isinstance(tree, AVLTree) or type(tree).node_class is not Node:
+            raise TypeError(f"{type(tree).__name__} cannot be shared, only sets of values can")
+
+        version = PersistentAVLTree(tree.error_policy)
+        version.root = tree.root
+        version.rejections = tree.rejections
+        version._reset()
+
+        if tree.instrumentation:
+            tree.instrumentation.move(version)
+
+        if tree.journal:
+            tree.journal.move(version)
+
+        return version
+
+    @property
+    def rejections(self) -> Dict[Message, int]:
+        """Get the number of rejected operations, by reason.
+
+        Returns:
+            Dict[Message, int]: The number of rejected operations, by reason.
+        """
+
+        with self.__lock.read():
+            return dict(self.__tree.rejections)
+
+    def snapshot(self) -> PersistentAVLTree:
+        """Get the current version of the tree in O(1). The snapshot is never
+        modified by later mutations, so it can be read without any locking.
+
+        Returns:
+            PersistentAVLTree: The current version of the tree.
+        """
+
+        with self.__lock.read():
+            return self.__tree
+
+    def __apply(self, operation: str, value: int) -> bool:
+        """Derive the next version by applying a mutation to the current one.
+        Must be called while holding the lock for writing.
+
+        Args:
+            operation (str): The name of the mutation, add or remove.
+            value (int): The value of the mutation.
+
+        Returns:
+            bool: True if the mutation was applied, False if it was rejected.
+        """
+
+        tree = getattr(self.__tree, operation)(value)
+
+        if tree is self.__tree:
+            return False
+
+        self.__tree = tree
+
+        return True
+
+    def __apply_many(self, operation: str, values: Iterable[int]) -> BatchResult:
+        """Apply a mutation to every value of a batch in ascending order.
+        Rejected values are counted, but the error policy is not invoked for
+        each of them. Must be called while holding the lock for writing.
+
+        Args:
+            operation (str): The name of the mutation, add or remove.
+            values (Iterable[int]): The batch, any iterable or a NumPy array.
+
+        Returns:
+            BatchResult: The mask of values the mutation was applied to and its counts.
+        """
+
+        is_array = type(values).__module__ == "numpy"
+        batch = values.tolist() if is_array else list(values)
+        order = sorted(
+            (index for index, value in enumerate(batch) if value is not None),
+            key=batch.__getitem__,
+        )
+        mask = [False] * len(batch)
+        tree = self.__tree
+
+        policy, tree.error_policy = tree.error_policy, ErrorPolicy.RETURN
+
+        try:
+            for index in order:
+                mask[index] = self.__apply(operation, batch[index])
+        finally:
+            tree.error_policy = self.__tree.error_policy = policy
+
+        succeeded = sum(mask)
+        self.__tree.rejections[Message.NULL_VALUE_EXCEPTION] += len(batch) - len(order)
+
+        if is_array:
+            import numpy
+
+            mask = numpy.array(mask, dtype=bool)
+
+        return BatchResult(mask, succeeded, len(batch) - succeeded)
+
+    def __pop(self, value: Optional[int]) -> int:
+        """Remove the least or greatest value. Must be called while holding
+        the lock for writing.
+
+        Args:
+            value (Optional[int]): The least or greatest value, None if the tree is empty.
+
+        Raises:
+            IndexError: If the tree is empty.
+
+        Returns:
+            int: The value.
+        """
+
+        if value is None:
+            raise IndexError("pop from an empty tree")
+
+        self.__tree = self.__tree.remove(value)
+
+        return value
+
+    def add(self, value: int) -> bool:
+        """Adds the queried value to the tree. See AVLTree.add.
+
+        Args:
+            value (int): The value to be added to the tree.
+
+        Returns:
+            bool: True if the value was added, False if it was rejected.
+        """
+
+        with self.__lock.write():
+            return self.__apply("add", value)
+
+    def remove(self, value: int) -> bool:
+        """Removes the queried value from the tree. See AVLTree.remove.
+
+        Args:
+            value (int): The queried value.
+
+        Returns:
+            bool: True if the value was removed, False if it was rejected.
+        """
+
+        with self.__lock.write():
+            return self.__apply("remove", value)
+
+    def extend(self, iterable: Iterable[int]) -> None:
+        """Add every value of a batch to the tree. See AVLTree.extend.
+
+        Args:
+            iterable (Iterable[int]): The values to be added, in any order.
+        """
+
+        with self.__lock.write():
+            self.__tree = self.__tree.extend(iterable)
+
+    def add_many(self, values: Iterable[int]) -> BatchResult:
+        """Add a batch of values to the tree. See AVLTree.add_many.
+
+        Args:
+            values (Iterable[int]): The values to be added.
+
+        Returns:
+            BatchResult: The mask of inserted values and its counts.
+        """
+
+        with self.__lock.write():
+            return self.__apply_many("add", values)
+
+    def remove_many(self, values: Iterable[int]) -> BatchResult:
+        """Remove a batch of values from the tree. See AVLTree.remove_many.
+
+        Args:
+            values (Iterable[int]): The values to be removed.
+
+        Returns:
+            BatchResult: The mask of removed values and its counts.
+        """
+
+        with self.__lock.write():
+            return self.__apply_many("remove", values)
+
+    def pop_min(self) -> int:
+        """Remove and return the least value. See AVLTree.pop_min.
+
+        Returns:
+            int: The least value.
+        """
+
+        with self.__lock.write():
+            return self.__pop(self.__tree.min())
+
+    def pop_max(self) -> int:
+        """Remove and return the greatest value. See AVLTree.pop_max.
+
+        Returns:
+            int: The greatest value.
+        """
+
+        with self.__lock.write():
+            return self.__pop(self.__tree.max())
+
+    def contains(self, value: int) -> bool:
+        """Determine whether the queried value exists within the tree.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            bool: A boolean value based on whether the value exists or not.
+        """
+
+        with self.__lock.read():
+            return self.__tree.contains(value)
+
+    def __contains__(self, value: int) -> bool:
+        """Determine whether the queried value exists within the tree, so that
+        the in operator searches the tree instead of scanning a snapshot.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            bool: A boolean value based on whether the value exists or not.
+        """
+
+        return self.contains(value)
+
+    def contains_many(self, values: Iterable[int]) -> BatchResult:
+        """Determine whether each value of a batch exists within the tree. See
+        AVLTree.contains_many.
+
+        Args:
+            values (Iterable[int]): The values queried.
+
+        Returns:
+            BatchResult: The mask of values found and its counts.
+        """
+
+        with self.__lock.read():
+            return self.__tree.contains_many(values)
+
+    def __len__(self) -> int:
+        """Get the number of values in the tree.
+
+        Returns:
+            int: The number of values in the tree.
+        """
+
+        with self.__lock.read():
+            return len(self.__tree)
+
+    def rank(self, value: int) -> int:
+        """Count the values in the tree which are less than the queried value.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            int: The number of values less than the queried value.
+        """
+
+        with self.__lock.read():
+            return self.__tree.rank(value)
+
+    def select(self, index: int) -> int:
+        """Find the value at the queried index in ascending order.
+
+        Args:
+            index (int): The index of the value.
+
+        Returns:
+            int: The value at the queried index.
+        """
+
+        with self.__lock.read():
+            return self.__tree.select(index)
+
+    def count_range(self, low: int, high: int) -> int:
+        """Count the values in the tree between low and high (both inclusive).
+
+        Args:
+            low (int): The lower bound.
+            high (int): The upper bound.
+
+        Returns:
+            int: The number of values in [low, high].
+        """
+
+        with self.__lock.read():
+            return self.__tree.count_range(low, high)
+
+    def floor(self, value: int) -> Optional[int]:
+        """Find the greatest value less than or equal to the queried value.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            Optional[int]: The floor of the value, or None if there is none.
+        """
+
+        with self.__lock.read():
+            return self.__tree.floor(value)
+
+    def ceiling(self, value: int) -> Optional[int]:
+        """Find the least value greater than or equal to the queried value.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            Optional[int]: The ceiling of the value, or None if there is none.
+        """
+
+        with self.__lock.read():
+            return self.__tree.ceiling(value)
+
+    def successor(self, value: int) -> Optional[int]:
+        """Find the least value strictly greater than the queried value.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            Optional[int]: The successor of the value, or None if there is none.
+        """
+
+        with self.__lock.read():
+            return self.__tree.successor(value)
+
+    def predecessor(self, value: int) -> Optional[int]:
+        """Find the greatest value strictly less than the queried value.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            Optional[int]: The predecessor of the value, or None if there is none.
+        """
+
+        with self.__lock.read():
+            return self.__tree.predecessor(value)
+
+    def min(self) -> Optional[int]:
+        """Get the least value in O(1).
+
+        Returns:
+            Optional[int]: The least value, or None if the tree is empty.
+        """
+
+        with self.__lock.read():
+            return self.__tree.min()
+
+    def max(self) -> Optional[int]:
+        """Get the greatest value in O(1).
+
+        Returns:
+            Optional[int]: The greatest value, or None if the tree is empty.
+        """
+
+        with self.__lock.read():
+            return self.__tree.max()
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over a snapshot of the values in ascending order.
+
+        Returns:
+            Iterator[int]: The values in ascending order.
+        """
+
+        return iter(self.snapshot())
+
+    def __reversed__(self) -> Iterator[int]:
+        """Iterate over a snapshot of the values in descending order.
+
+        Returns:
+            Iterator[int]: The values in descending order.
+        """
+
+        return reversed(self.snapshot())
+
+    def irange(
+        self,
+        low: Optional[int] = None,
+        high: Optional[int] = None,
+        inclusive: Tuple[bool, bool] = (True, True),
+        reverse: bool = False,
+    ) -> Iterator[int]:
+        """Lazily iterate over a snapshot of the values between low and high.
+        See AVLTree.irange.
+
+        Args:
+            low (Optional[int], optional): The lower bound, None for no lower bound.
+            high (Optional[int], optional): The upper bound, None for no upper bound.
+            inclusive (Tuple[bool, bool], optional): Whether the lower and upper bounds are
+            included, respectively.
+            reverse (bool, optional): True to iterate in descending order.
+
+        Returns:
+            Iterator[int]: The values between low and high.
+        """
+
+        return self.snapshot().irange(low, high, inclusive, reverse)
@@ -0,0 +1,29 @@
+"""This module provides a node which counts the occurrences of its value."""
+from __future__ import annotations
+
+from src.tree.node import Node
+
+
+class CountNode(Node):
+    """The count node is a node of an AVLMultiset. It holds a single distinct
+    value together with the number of times the value occurs, and its size is
+    the total count of its subtree rather than the number of nodes.
+
+    Attributes:
+        count (int): The number of occurrences of the value.
+    """
+
+    __slots__ = ("count",)
+
+    def __init__(self, value: int, count: int = 1):
+        """Initialize the count node.
+
+        Args:
+            value (int): The value of the node.
+            count (int, optional): The number of occurrences of the value.
+        """
+
+        super().__init__(value)
+
+        self.count = count
+        self.size = count
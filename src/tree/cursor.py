@@ -0,0 +1,124 @@
+"""This module allows the user to search an AVL tree with a finger, which
+makes lookups near the previous one cheaper than starting from the root."""
+from __future__ import annotations
+
+from typing import Optional
+
+from src.tree.avl_tree import AVLTree
+
+
+class Cursor(object):
+    """A cursor (or finger) remembers its position in a tree: the path from
+    the root to the node it last visited, along with the open interval of
+    values each node on the path can hold, bounded by its nearest ancestors on
+    either side. A seek climbs the path only until it reaches a subtree whose
+    interval contains the queried value, and descends from there. When
+    successive values are close, as with timestamps or sequential ids, that
+    subtree is small: a seek to a value d positions away typically visits
+    O(log d) nodes instead of O(log n), and a sequential scan visits O(1)
+    nodes per seek on average. Values which jump across the tree still cost
+    O(log n), as the climb then goes back up to the root.
+
+    Each level climbed costs more than a level descended by contains, so a
+    cursor pays off for sorted or clustered lookups, above all in large trees,
+    and should not be used for random ones (see benchmarks/finger.py).
+
+    Nodes carry no parent pointers, so the path is only valid until the shape
+    of the tree changes. Every such change increments the tree's version, and
+    a cursor which sees a new version starts again from the root.
+
+    Attributes:
+        tree (AVLTree): The tree walked by the cursor.
+    """
+
+    def __init__(self, tree: AVLTree):
+        """Initialize the cursor, which is not positioned yet.
+
+        Args:
+            tree (AVLTree): The tree to be walked.
+        """
+
+        self.tree = tree
+        self.__path = []
+        self.__lows = []
+        self.__highs = []
+        self.__version = None
+        self.__value = None
+
+    @property
+    def value(self) -> Optional[int]:
+        """Get the value the cursor was last positioned at: the least value
+        greater than or equal to the last value sought.
+
+        Returns:
+            Optional[int]: The value, or None if there is none.
+        """
+
+        return self.__value
+
+    def seek(self, value: int) -> bool:
+        """Position the cursor at the least value greater than or equal to the
+        queried value, starting from the previous position.
+
+        Args:
+            value (int): The value queried.
+
+        Returns:
+            bool: True if the value exists within the tree.
+        """
+
+        tree = self.tree
+        path = self.__path
+        lows = self.__lows
+        highs = self.__highs
+
+        if self.__version != tree.version:
+            path.clear()
+            lows.clear()
+            highs.clear()
+            self.__version = tree.version
+
+        while path:
+            low = lows[-1]
+            high = highs[-1]
+
+            if (low is None or low < value) and (high is None or value < high):
+                node = path[-1]
+                break
+
+            path.pop()
+            lows.pop()
+            highs.pop()
+        else:
+            node, low, high = tree.root, None, None
+
+            if not node:
+                self.__value = None
+                return False
+
+            path.append(node)
+            lows.append(low)
+            highs.append(high)
+
+        while True:
+            if value < node.value:
+                if not node.left:
+                    self.__value = node.value
+                    return False
+
+                high = node.value
+                node = node.left
+            elif value > node.value:
+                if not node.right:
+                    self.__value = high
+                    return False
+
+                low = node.value
+                node = node.right
+            else:
+                self.__value = value
+                return True
+
+            path.append(node)
+            lows.append(low)
+            highs.append(high)
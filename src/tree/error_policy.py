@@ -0,0 +1,53 @@
+"""This module provides the ways in which a tree can respond to an invalid
+operation, such as adding a duplicate value."""
+from __future__ import annotations
+
+from enum import Enum
+from typing import Any
+
+from src.console.message import Message
+
+
+class ErrorPolicy(Enum):
+    """The error policy determines what happens when an operation on a tree is
+    rejected, i.e. a null value is given, an existing value is added or a
+    missing value is removed.
+
+    Attributes:
+        RAISE (str): Raise a KeyError for a missing value, otherwise a ValueError.
+        RETURN (str): Silently return False from the operation.
+        SILENT (str): An alias of RETURN.
+        INTERACTIVE (str): Display the message in the terminal and return False. Only meant for
+        interactive use, since writing to the terminal is slow.
+    """
+
+    RAISE = "raise"
+    RETURN = "return"
+    SILENT = "return"
+    INTERACTIVE = "interactive"
+
+    def reject(self, message: Message, value: Any) -> bool:
+        """Respond to a rejected operation according to the policy.
+
+        Args:
+            message (Message): The reason the operation was rejected.
+            value (Any): The value of the rejected operation.
+
+        Raises:
+            KeyError: If the policy is RAISE and the value is missing.
+            ValueError: If the policy is RAISE and the value is null or a duplicate.
+
+        Returns:
+            bool: False, to be returned by the rejected operation.
+        """
+
+        if self is ErrorPolicy.RAISE:
+            if message is Message.VOID_VALUE_EXCEPTION:
+                raise KeyError(value)
+
+            raise ValueError(message.value)
+
+        if self is ErrorPolicy.INTERACTIVE:
+            Message.print(message)
+
+        return False
@@ -0,0 +1,341 @@
+"""This module allows the user to record what an AVL tree does: rotations,
+comparisons, path lengths and the latency of its operations."""
+from __future__ import annotations
+
+import time
+
+from collections import Counter, defaultdict
+from operator import eq, ge, gt, le, lt, ne
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from src.tree.shadow import Shadow
+
+ROTATION_CASES = ("left_left_case", "left_right_case", "right_right_case", "right_left_case")
+
+SEARCH_OPERATIONS = ("add", "remove", "contains")
+
+SEARCH_HOOKS = ("_find", "_insert", "_delete")
+
+
+def _comparison(operator: Callable[[Any, Any], bool]) -> Callable:
+    """Make a comparison method of _Probe, which counts the comparison and
+    compares the value.
+
+    Args:
+        operator (Callable[[Any, Any], bool]): The comparison operator.
+
+    Returns:
+        Callable: The comparison method.
+    """
+
+    def compare(probe: _Probe, other: Any) -> bool:
+        probe.count(other)
+        return operator(probe.value, other)
+
+    return compare
+
+
+class _Probe(object):
+    """A probe stands in for the value given to a search hook, and counts the
+    comparisons made with it and the nodes it is compared against. Successive
+    comparisons with the same node's value count as a single node.
+
+    Attributes:
+        comparisons (int): The number of comparisons made.
+        last (Any): The value the probe was last compared with.
+        length (int): The number of nodes compared against.
+        value (Any): The value searched for.
+    """
+
+    __slots__ = ("value", "comparisons", "length", "last")
+
+    def __init__(self, value: Any):
+        """Initialize the probe.
+
+        Args:
+            value (Any): The value searched for.
+        """
+
+        self.value = value
+        self.comparisons = 0
+        self.length = 0
+        self.last = self
+
+    def count(self, other: Any) -> None:
+        """Count a comparison with the value of a node.
+
+        Args:
+            other (Any): The value of the node.
+        """
+
+        self.comparisons += 1
+
+        if other is not self.last:
+            self.last = other
+            self.length += 1
+
+    __lt__ = _comparison(lt)
+    __le__ = _comparison(le)
+    __gt__ = _comparison(gt)
+    __ge__ = _comparison(ge)
+    __eq__ = _comparison(eq)
+    __ne__ = _comparison(ne)
+
+    def __hash__(self) -> int:
+        """Hash the probe like its value.
+
+        Returns:
+            int: The hash of the value.
+        """
+
+        return hash(self.value)
+
+    def __repr__(self) -> str:
+        """Represent the probe like its value, e.g. in an error message.
+
+        Returns:
+            str: The representation of the value.
+        """
+
+        return repr(self.value)
+
+
+class Instrumentation(object):
+    """An instrumentation records the work done by a single tree. It is
+    attached with AVLTree.instrument, which shadows the instrumented methods
+    on that tree instance only, so the class and every other tree keep running
+    the uninstrumented code, and detaching removes the wrappers again: nothing
+    is checked or counted while instrumentation is disabled.
+
+    While attached, every rotation is counted by its case (classified from the
+    balance factors, as in AVLTree.balance). The search hooks (_find, _insert
+    and _delete), which every search goes through once its sort key is known,
+    are given a probe in place of the value, which counts the comparisons the
+    search itself makes and the nodes it compares against (its path length),
+    so nothing is searched twice. The spines walked by _insert's append and
+    prepend fast paths involve no comparisons and are therefore not counted,
+    and neither are the searches of trees which walk the tree in their own
+    methods, such as AVLMultiset.add and PersistentAVLTree. Every instrumented
+    operation is timed, and its latency counted in a histogram with
+    power-of-two buckets: bucket b holds latencies of 2^(b-1) to 2^b - 1
+    nanoseconds. If a callback is given, it is called after every operation
+    with the operation's name and its measurements, e.g. to export metrics.
+    Instrumentation is not thread-safe.
+
+    Attributes:
+        callback (Optional[Callable[[str, Dict[str, Any]], None]]): Called after every
+        instrumented operation.
+        comparisons (int): The number of value comparisons made by searches.
+        path_length (int): The total path length of the searches.
+        latencies (Dict[str, Counter]): The latency histogram of every operation.
+        operations (Tuple[str, ...]): The names of the instrumented methods.
+        path_lengths (Counter): The number of searches by the number of nodes visited.
+        rotations (Counter): The number of rotations, by case.
+    """
+
+    def __init__(
+        self,
+        tree: Any,
+        callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        operations: Iterable[str] = SEARCH_OPERATIONS,
+    ):
+        """Initialize the instrumentation and attach it to the tree.
+
+        Args:
+            tree (AVLTree): The tree to be instrumented.
+            callback (Optional[Callable[[str, Dict[str, Any]], None]], optional): Called after
+            every instrumented operation with its name and measurements.
+            operations (Iterable[str], optional): The names of the methods to be timed. By
+            default, add, remove and contains.
+        """
+
+        self.callback = callback
+        self.operations = tuple(operations)
+        self.rotations = Counter(dict.fromkeys(ROTATION_CASES, 0))
+        self.comparisons = 0
+        self.path_length = 0
+        self.path_lengths = Counter()
+        self.latencies = defaultdict(Counter)
+        self.__tree = tree
+        self.__attach(tree)
+
+    def move(self, tree: Any) -> None:
+        """Instrument another tree instead, e.g. the new version of a
+        persistent tree which replaces it, keeping the measurements. The
+        wrappers are removed from the instrumented tree, which is no longer
+        instrumented.
+
+        Args:
+            tree (AVLTree): The tree to be instrumented from now on.
+        """
+
+        self.detach()
+        self.__tree.instrumentation = None
+        self.__tree = tree
+        self.__attach(tree)
+        tree.instrumentation = self
+
+    def __attach(self, tree: Any) -> None:
+        """Shadow the instrumented methods of the tree with wrappers. See
+        Shadow.
+
+        Args:
+            tree (AVLTree): The tree to be instrumented.
+        """
+
+        self.__wrappers = [("balance", self.__balance()), ("node_class", self.__node_class())]
+        self.__wrappers += [(name, self.__search()) for name in SEARCH_HOOKS]
+        self.__wrappers += [(name, self.__operation(name)) for name in self.operations]
+
+        for name, wrapper in self.__wrappers:
+            Shadow.attach(tree, name, wrapper)
+
+    def detach(self, tree: Optional[Any] = None) -> None:
+        """Remove the wrappers from the tree, restoring the methods it had
+        before it was instrumented. Wrappers shadowing the same methods, e.g.
+        those of a journal attached since, are kept.
+
+        Args:
+            tree (Optional[AVLTree], optional): The tree to remove every wrapper from, if not
+            the instrumented tree itself, e.g. a shallow copy of it.
+        """
+
+        for name, wrapper in reversed(self.__wrappers):
+            if tree is None:
+                Shadow.detach(self.__tree, name, wrapper)
+            else:
+                tree.__dict__.pop(name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get a snapshot of the measurements.
+
+        Returns:
+            Dict[str, Any]: The rotations by case, the number of comparisons, the path lengths
+            (total, maximum and histogram) and the latency histogram of every operation.
+        """
+
+        searches = sum(self.path_lengths.values())
+        total = sum(length * count for length, count in self.path_lengths.items())
+
+        return {
+            "rotations": dict(self.rotations),
+            "comparisons": self.comparisons,
+            "path_length": {
+                "searches": searches,
+                "total": total,
+                "mean": total / searches if searches else 0.0,
+                "max": max(self.path_lengths, default=0),
+                "histogram": dict(sorted(self.path_lengths.items())),
+            },
+            "latency_ns": {
+                name: dict(sorted(histogram.items())) for name, histogram in self.latencies.items()
+            },
+        }
+
+    def reset(self) -> None:
+        """Clear the measurements."""
+
+        self.rotations.update(dict.fromkeys(ROTATION_CASES, 0))
+        self.comparisons = 0
+        self.path_length = 0
+        self.path_lengths.clear()
+
+        for histogram in self.latencies.values():
+            histogram.clear()
+
+    def __balance(self) -> Callable:
+        """Wrap the tree's balance method to count the rotations by case.
+
+        Returns:
+            Callable: The wrapper.
+        """
+
+        rotations = self.rotations
+
+        def wrapper(node):
+            if node.balance_factor == -2:
+                if node.left.balance_factor > 0:
+                    rotations["left_right_case"] += 1
+                else:
+                    rotations["left_left_case"] += 1
+            elif node.balance_factor == 2:
+                if node.right.balance_factor < 0:
+                    rotations["right_left_case"] += 1
+                else:
+                    rotations["right_right_case"] += 1
+
+            return wrapper.__wrapped__(node)
+
+        return wrapper
+
+    def __node_class(self) -> Callable:
+        """Wrap the tree's node class, so that a node created by _insert holds
+        the value rather than its probe.
+
+        Returns:
+            Callable: The wrapper.
+        """
+
+        def wrapper(value, *args):
+            return wrapper.__wrapped__(value.value if type(value) is _Probe else value, *args)
+
+        return wrapper
+
+    def __search(self) -> Callable:
+        """Wrap one of the tree's search hooks to count the comparisons and
+        path length of the search. A hook called by another one is part of its
+        search.
+
+        Returns:
+            Callable: The wrapper.
+        """
+
+        path_lengths = self.path_lengths
+
+        def wrapper(value, *args):
+            if type(value) is _Probe:
+                return wrapper.__wrapped__(value, *args)
+
+            probe = _Probe(value)
+            result = wrapper.__wrapped__(probe, *args)
+            self.comparisons += probe.comparisons
+            self.path_length += probe.length
+            path_lengths[probe.length] += 1
+
+            return result
+
+        return wrapper
+
+    def __operation(self, name: str) -> Callable:
+        """Wrap one of the tree's methods to time it, and measure the
+        rotations, comparisons and path length of the searches it makes.
+
+        Args:
+            name (str): The name of the method.
+
+        Returns:
+            Callable: The wrapper.
+        """
+
+        histogram = self.latencies[name]
+
+        def wrapper(*args, **kwargs):
+            rotations = sum(self.rotations.values())
+            comparisons = self.comparisons
+            path_length = self.path_length
+            start = time.perf_counter_ns()
+            result = wrapper.__wrapped__(*args, **kwargs)
+            latency = time.perf_counter_ns() - start
+            histogram[latency.bit_length()] += 1
+
+            if self.callback:
+                measurements = {"latency_ns": latency, "result": result}
+                measurements["rotations"] = sum(self.rotations.values()) - rotations
+                measurements["path_length"] = self.path_length - path_length
+                measurements["comparisons"] = self.comparisons - comparisons
+
+                self.callback(name, measurements)
+
+            return result
+
+        return wrapper
@@ -0,0 +1,140 @@
+"""This module allows the user to store intervals in an AVL tree and find the
+intervals overlapping a point or another interval."""
+from __future__ import annotations
+
+from typing import Iterator, Optional, Tuple
+
+from src.tree.aggregate_avl_tree import AggregateAVLTree
+from src.tree.monoid import Monoid
+from src.tree.error_policy import ErrorPolicy
+
+from src.console.message import Message
+
+
+class IntervalAVLTree(AggregateAVLTree):
+    """An interval AVL tree stores closed intervals [low, high], ordered by
+    their lower and then upper endpoints, so each value of the tree is a
+    (low, high) tuple. Every node caches the greatest upper endpoint in its
+    subtree, which is a maximum aggregate and is therefore kept up to date
+    through update and the rotations. A subtree whose greatest upper endpoint
+    is below the queried range cannot overlap it and is skipped, as is every
+    interval after the first one starting above the range.
+    """
+
+    def __init__(self, error_policy: ErrorPolicy = ErrorPolicy.RETURN):
+        """Initialize the interval AVL tree.
+
+        Args:
+            error_policy (ErrorPolicy, optional): What happens when an operation is rejected.
+        """
+
+        super().__init__(Monoid.maximum(lambda node: node.value[1]), error_policy)
+
+    @classmethod
+    def recover(
+        cls,
+        directory: str,
+        typecode: str = "q",
+        sync_bytes: int = 1 << 16,
+        sync_interval: float = 0.05,
+        compact_bytes: int = 1 << 26,
+    ) -> IntervalAVLTree:
+        """Interval trees cannot be journaled, since the journal records single
+        values rather than intervals.
+
+        Args:
+            directory (str): The directory holding the snapshots and journals.
+            typecode (str, optional): The typecode of the values.
+            sync_bytes (int, optional): The size of the buffered records which triggers a sync.
+            sync_interval (float, optional): The longest time, in seconds, records remain
+            buffered.
+            compact_bytes (int, optional): The size of the journal which triggers a compaction.
+
+        Raises:
+            TypeError: Always.
+        """
+
+        raise TypeError("an interval tree cannot be journaled, it records single values only")
+
+    def add(self, low: int, high: int) -> bool:
+        """Adds the interval [low, high] to the tree. If either endpoint is
+        null or the interval already exists, the operation is rejected
+        according to the error policy.
+
+        Args:
+            low (int): The lower endpoint.
+            high (int): The upper endpoint.
+
+        Raises:
+            ValueError: If the lower endpoint is greater than the upper endpoint.
+
+        Returns:
+            bool: True if the interval was added, False if it was rejected.
+        """
+
+        if low is None or high is None:
+            return self._reject(Message.NULL_VALUE_EXCEPTION, (low, high))
+
+        if low > high:
+            raise ValueError(f"the interval [{low}, {high}] is empty")
+
+        return super().add((low, high))
+
+    def remove(self, low: int, high: int) -> bool:
+        """Removes the interval [low, high] from the tree. If the interval does
+        not exist, the operation is rejected according to the error policy.
+
+        Args:
+            low (int): The lower endpoint.
+            high (int): The upper endpoint.
+
+        Returns:
+            bool: True if the interval was removed, False if it was rejected.
+        """
+
+        if low is None or high is None:
+            return self._reject(Message.NULL_VALUE_EXCEPTION, (low, high))
+
+        return super().remove((low, high))
+
+    def overlapping(self, low: int, high: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """Lazily iterate, in ascending order, over the intervals overlapping
+        the point low, or the closed interval [low, high] if high is given. An
+        interval [a, b] overlaps [low, high] if a <= high and b >= low. The
+        in-order traversal only descends into subtrees whose greatest upper
+        endpoint reaches low, and stops at the first interval starting after
+        high, so only the nodes on the paths to the reported intervals are
+        visited.
+
+        Args:
+            low (int): The point, or the lower endpoint of the queried interval.
+            high (Optional[int], optional): The upper endpoint of the queried interval.
+
+        Yields:
+            Iterator[Tuple[int, int]]: The overlapping intervals, as (low, high) tuples.
+        """
+
+        if high is None:
+            high = low
+
+        stack = []
+        node = self.root
+
+        while True:
+            while node and node.aggregate >= low:
+                stack.append(node)
+                node = node.left
+
+            if not stack:
+                return
+
+            node = stack.pop()
+            start, end = node.value
+
+            if start > high:
+                return
+
+            if end >= low:
+                yield node.value
+
+            node = node.right
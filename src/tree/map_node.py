@@ -0,0 +1,36 @@
+"""This module provides a node which, on top of its value, carries a key and a
+payload, so the tree can be used as a mapping.
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from src.tree.node import Node
+
+
+class MapNode(Node):
+    """The map node is a node of an AVLMap. Its value is the sort key, which
+    determines the node's position in the tree, while the key and payload are
+    the key and value of the mapping. Unless the map has a key function, the
+    sort key is the key itself.
+
+    Attributes:
+        key (Any): The key of the mapping.
+        payload (Any): The value the key is mapped to.
+    """
+
+    __slots__ = ("key", "payload")
+
+    def __init__(self, value: Any, payload: Optional[Any] = None, key: Optional[Any] = None):
+        """Initialize the map node.
+
+        Args:
+            value (Any): The sort key of the node.
+            payload (Optional[Any], optional): The value the key is mapped to.
+            key (Optional[Any], optional): The key of the mapping, defaults to the sort key.
+        """
+
+        super().__init__(value)
+
+        self.key = value if key is None else key
+        self.payload = payload
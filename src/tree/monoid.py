@@ -0,0 +1,80 @@
+"""This module provides the monoids an AggregateAVLTree can maintain over its
+subtrees."""
+from __future__ import annotations
+
+import math
+import operator
+
+from operator import attrgetter
+from typing import Any, Callable, NamedTuple
+
+from src.tree.node import Node
+
+
+class Monoid(NamedTuple):
+    """A monoid is an associative combine function with an identity element.
+    Every node caches the combination of the measures of all nodes in its
+    subtree, in ascending order, so the combine function does not have to be
+    commutative.
+
+    Attributes:
+        combine (Callable[[Any, Any], Any]): The associative function combining two aggregates.
+        identity (Any): The aggregate of no nodes, e.g. 0 for a sum.
+        measure (Callable[[Node], Any]): The aggregate of a single node. By default, its value.
+    """
+
+    combine: Callable[[Any, Any], Any]
+    identity: Any
+    measure: Callable[[Node], Any] = attrgetter("value")
+
+    @staticmethod
+    def sum(measure: Callable[[Node], Any] = attrgetter("value")) -> Monoid:
+        """Get the monoid summing the measures of the nodes.
+
+        Args:
+            measure (Callable[[Node], Any], optional): The measure of a node. By default, its
+            value.
+
+        Returns:
+            Monoid: The sum monoid.
+        """
+
+        return Monoid(operator.add, 0, measure)
+
+    @staticmethod
+    def minimum(measure: Callable[[Node], Any] = attrgetter("value")) -> Monoid:
+        """Get the monoid of the least measure of the nodes.
+
+        Args:
+            measure (Callable[[Node], Any], optional): The measure of a node. By default, its
+            value.
+
+        Returns:
+            Monoid: The minimum monoid.
+        """
+
+        return Monoid(min, math.inf, measure)
+
+    @staticmethod
+    def maximum(measure: Callable[[Node], Any] = attrgetter("value")) -> Monoid:
+        """Get the monoid of the greatest measure of the nodes.
+
+        Args:
+            measure (Callable[[Node], Any], optional): The measure of a node. By default, its
+            value.
+
+        Returns:
+            Monoid: The maximum monoid.
+        """
+
+        return Monoid(max, -math.inf, measure)
+
+    @staticmethod
+    def count() -> Monoid:
+        """Get the monoid counting the nodes.
+
+        Returns:
+            Monoid: The count monoid.
+        """
+
+        return Monoid(operator.add, 0, lambda node: 1)
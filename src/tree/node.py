@@ -8,16 +8,21 @@ from typing import Optional
 
 class Node(object):
     """The node is a data structure which stores useful information related to
-    an avl (self-balancing) tree.
+    an avl (self-balancing) tree. The attributes are declared in __slots__, so
+    a node does not carry a per-instance __dict__.
     
     Attributes:
+        balance_factor (int): The height of the right subtree minus that of the left subtree.
         height (int): The height of the node. The height is defined as the maximum path length of
         left (Node): The left child or descendant of the node.
         right (Node): The right child or descendant of the node.
+        size (int): The number of nodes in the subtree rooted at the node.
         value (int): The value or key of the node.
         the node to a leaf of the tree.
     """
 
+    __slots__ = ("value", "height", "left", "right", "balance_factor", "size")
+
     def __init__(
         self,
         value: int,
@@ -39,3 +44,5 @@ class Node(object):
         self.height = height
         self.left = left
         self.right = right
+        self.balance_factor = 0
+        self.size = 1
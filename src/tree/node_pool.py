@@ -0,0 +1,94 @@
+"""This module provides a way to store the nodes of a binary tree in parallel
+arrays instead of individual objects, which drastically reduces the memory
+used per key.
+"""
+from __future__ import annotations
+
+from array import array
+
+
+class NodePool(object):
+    """The node pool stores every node as an index into four parallel arrays
+    (columns): the key, the index of the left child, the index of the right
+    child and the height. Index 0 is reserved as a sentinel for the empty
+    (null) node, whose height is -1, so an index can be tested for truthiness
+    just like a node reference. Removed slots are kept in a free list, which is
+    threaded through the left column, and reused by later allocations.
+
+    Attributes:
+        free (int): The index of the first free slot, or 0 if there are none.
+        heights (array): The height of every node.
+        keys (array): The key of every node.
+        left (array): The index of the left child of every node.
+        right (array): The index of the right child of every node.
+        size (int): The number of allocated (live) nodes.
+    """
+
+    def __init__(self, typecode: str = "q") -> None:
+        """Initialize the node pool with the sentinel node.
+
+        Args:
+            typecode (str, optional): The array typecode of the keys, e.g. "q" for 64-bit
+            integers or "d" for double precision floats.
+        """
+
+        self.keys = array(typecode, [0])
+        self.left = array("I", [0])
+        self.right = array("I", [0])
+        self.heights = array("b", [-1])
+        self.free = 0
+        self.size = 0
+
+    def allocate(self, key: int) -> int:
+        """Allocate a new leaf node holding the key. A free slot is reused if
+        there is one, otherwise the columns are extended.
+
+        Args:
+            key (int): The key of the new node.
+
+        Returns:
+            int: The index of the new node.
+        """
+
+        index = self.free
+
+        # The key is written first, so a key which does not fit the typecode leaves the pool as
+        # it was
+        if index:
+            self.keys[index] = key
+            self.free = self.left[index]
+            self.left[index] = 0
+            self.right[index] = 0
+            self.heights[index] = 0
+            self.size += 1
+
+            return index
+
+        self.keys.append(key)
+        self.size += 1
+        self.left.append(0)
+        self.right.append(0)
+        self.heights.append(0)
+
+        return len(self.keys) - 1
+
+    def release(self, index: int) -> None:
+        """Return the slot of a removed node to the free list.
+
+        Args:
+            index (int): The index of the removed node.
+        """
+
+        self.size -= 1
+        self.left[index] = self.free
+        self.right[index] = 0
+        self.free = index
+
+    def __len__(self) -> int:
+        """Get the number of allocated nodes.
+
+        Returns:
+            int: The number of allocated nodes.
+        """
+
+        return self.size
@@ -0,0 +1,288 @@
+"""This module allows the user to spread the bulk build and the batch queries of
+an AVL tree over several processes."""
+from __future__ import annotations
+
+import os
+
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Iterable, List, Optional, Sequence, Tuple, Type, Union
+
+from src.tree.avl_tree import AVLTree
+from src.tree.batch_result import BatchResult
+from src.storage.snapshot import Snapshot
+
+# The values of the tree queried by contains_many, set in every worker by its initializer
+_keys = None
+
+
+class ParallelExecutor(object):
+    """A parallel executor runs the CPU-bound parts of bulk_load and
+    contains_many on a pool of worker processes.
+
+    Nodes are Python objects, so they cannot be shared between processes, and
+    shipping them back would cost as much as creating them. Instead, the work
+    is shipped in a compact form: chunks of values are sent to the workers as
+    fixed-width arrays (the column format of a snapshot) whenever the values
+    are integers or floats.
+
+    A bulk build is a parallel sample sort. The parent picks one pivot per
+    worker from a sample of the values. Every worker sorts and deduplicates
+    its chunk and cuts the run at the pivots, then every worker merges and
+    deduplicates the pieces of one range of values. The ranges are disjoint
+    and ordered, so the parent only concatenates them and builds the balanced
+    tree in a single pass: it never sorts, merges or deduplicates.
+
+    For a batch query, every worker answers its share of the batch by binary
+    search over the sorted values of the tree, which are handed to each worker
+    once, when its process starts. The pool for bulk builds is started once
+    and reused, and should be shut down once it is no longer needed, e.g. by
+    using the executor as a context manager.
+
+    Attributes:
+        MINIMUM_CHUNK (int): The fewest values worth sending to a worker. Smaller inputs are
+        handled in the calling process.
+        SAMPLES (int): The number of values sampled per worker to pick the pivots.
+        workers (int): The number of worker processes.
+    """
+
+    MINIMUM_CHUNK = 50_000
+    SAMPLES = 64
+
+    def __init__(self, workers: Optional[int] = None):
+        """Initialize the parallel executor.
+
+        Args:
+            workers (Optional[int], optional): The number of worker processes. By default, the
+            number of CPUs.
+        """
+
+        self.workers = workers or os.cpu_count() or 1
+        self.__pool = ProcessPoolExecutor(self.workers)
+
+    def __enter__(self) -> ParallelExecutor:
+        """Use the executor as a context manager, which shuts it down on exit.
+
+        Returns:
+            ParallelExecutor: The executor.
+        """
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Shut down the executor."""
+
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """Shut down the worker processes."""
+
+        self.__pool.shutdown()
+
+    def bulk_load(self, iterable: Iterable[int], cls: Type[AVLTree] = AVLTree) -> AVLTree:
+        """Build a perfectly balanced tree from values in any order, as
+        AVLTree.bulk_load does, with the sorting and deduplication done by the
+        workers, see ParallelExecutor.
+
+        Args:
+            iterable (Iterable[int]): The values, in any order.
+            cls (Type[AVLTree], optional): The type of the tree to be built.
+
+        Returns:
+            AVLTree: The new tree.
+        """
+
+        values = list(iterable)
+        chunks = self.__chunks(values)
+
+        if len(chunks) < 2:
+            return cls.bulk_load(values)
+
+        sample = sorted(values[:: max(1, len(values) // (self.SAMPLES * len(chunks)))])
+        pivots = [sample[len(sample) * index // len(chunks)] for index in range(1, len(chunks))]
+        pieces = self.__pool.map(ParallelExecutor._sort_chunk, chunks, [pivots] * len(chunks))
+        merged = []
+
+        # The ranges are disjoint and in ascending order, so their runs are simply concatenated
+        for run in self.__pool.map(ParallelExecutor._merge_runs, zip(*pieces)):
+            merged.extend(run)
+
+        tree = cls()
+        tree._assign(merged)
+
+        return tree
+
+    def contains_many(self, tree: AVLTree, values: Iterable[int]) -> BatchResult:
+        """Determine whether each value of a batch exists within the tree, as
+        AVLTree.contains_many does, with the lookups done by the workers. The
+        values of the tree are collected once per call and handed to a pool of
+        workers started for the call, through its initializer, so each worker
+        receives them once (and inherits them without pickling where processes
+        are forked). This costs more than looking the batch up in the tree
+        unless the batch is at least as large as the tree, so smaller batches
+        are looked up in the calling process.
+
+        Args:
+            tree (AVLTree): The tree queried.
+            values (Iterable[int]): The values queried, any iterable or a NumPy array.
+
+        Returns:
+            BatchResult: The mask of values found, the number of values found and the number of
+            missing or null values.
+        """
+
+        is_array = type(values).__module__ == "numpy"
+        batch = values.tolist() if is_array else list(values)
+        if len(batch) < len(tree):
+            return tree.contains_many(values)
+
+        chunks = self.__chunks(batch)
+
+        if len(chunks) < 2:
+            return tree.contains_many(values)
+
+        found = bytearray()
+
+        with ProcessPoolExecutor(
+            len(chunks), initializer=ParallelExecutor._load_keys, initargs=(self.__column(tree),)
+        ) as pool:
+            for mask in pool.map(ParallelExecutor._contains_chunk, chunks):
+                found += mask
+
+        succeeded = found.count(1)
+
+        if is_array:
+            import numpy
+
+            return BatchResult(
+                numpy.frombuffer(found, dtype=bool).copy(), succeeded, len(found) - succeeded
+            )
+
+        return BatchResult(list(map(bool, found)), succeeded, len(found) - succeeded)
+
+    def __chunks(self, values: list) -> List[Union[array, list]]:
+        """Cut the values into one contiguous chunk per worker, but no smaller
+        than MINIMUM_CHUNK values.
+
+        Args:
+            values (list): The values.
+
+        Returns:
+            List[Union[array, list]]: The chunks, as compact arrays where possible.
+        """
+
+        count = min(self.workers, len(values) // self.MINIMUM_CHUNK)
+
+        if count < 2:
+            return [values]
+
+        size = -(-len(values) // count)
+
+        return [self.__column(values[start:start + size]) for start in range(0, len(values), size)]
+
+    @staticmethod
+    def __column(values: Iterable[int]) -> Union[array, list]:
+        """Pack values into a fixed-width array, which is pickled as raw bytes,
+        or leave them in a list if they are not all integers or all floats. A
+        float column would silently round large integers, so mixed values are
+        never packed.
+
+        Args:
+            values (Iterable[int]): The values.
+
+        Returns:
+            Union[array, list]: The packed values.
+        """
+
+        values = values if isinstance(values, list) else list(values)
+
+        if not values:
+            return array("q")
+
+        if len(set(map(type, values))) > 1:
+            return values
+
+        try:
+            return array(Snapshot.typecode_of(values[0]), values)
+        except (TypeError, OverflowError):
+            return values
+
+    @staticmethod
+    def _sort_chunk(chunk: Sequence[int], pivots: List[int]) -> List[Union[array, list]]:
+        """Sort and deduplicate a chunk of values, and cut the run into the
+        ranges between the pivots. Runs in a worker.
+
+        Args:
+            chunk (Sequence[int]): The values.
+            pivots (List[int]): The lower bounds of every range but the first, in ascending order.
+
+        Returns:
+            List[Union[array, list]]: The distinct values of every range in ascending order,
+            packed like the chunk.
+        """
+
+        run = sorted(set(chunk))
+        bounds = [0] + [bisect_left(run, pivot) for pivot in pivots] + [len(run)]
+        pieces = [run[start:end] for start, end in zip(bounds, bounds[1:])]
+
+        if isinstance(chunk, array):
+            return [array(chunk.typecode, piece) for piece in pieces]
+
+        return pieces
+
+    @staticmethod
+    def _merge_runs(runs: Tuple[Union[array, list], ...]) -> Union[array, list]:
+        """Merge the sorted runs of a range and deduplicate them. The sort
+        finds the runs, so merging k of them takes O(n log k) time. Runs in a
+        worker.
+
+        Args:
+            runs (Tuple[Union[array, list], ...]): The distinct values of the range from every
+            chunk, each in ascending order.
+
+        Returns:
+            Union[array, list]: The distinct values of the range in ascending order, packed like
+            the runs.
+        """
+
+        merged = list(dict.fromkeys(sorted(chain.from_iterable(runs))))
+
+        return array(runs[0].typecode, merged) if isinstance(runs[0], array) else merged
+
+    @staticmethod
+    def _load_keys(keys: Sequence[int]) -> None:
+        """Keep the values of the tree for the lookups. Runs in a worker, once,
+        when its process starts.
+
+        Args:
+            keys (Sequence[int]): The values of the tree, in ascending order.
+        """
+
+        global _keys
+
+        _keys = keys
+
+    @staticmethod
+    def _contains_chunk(chunk: Sequence[int]) -> bytes:
+        """Look up a chunk of values by binary search over the values of the
+        tree. Runs in a worker.
+
+        Args:
+            chunk (Sequence[int]): The values queried.
+
+        Returns:
+            bytes: 1 for every value found, 0 for every missing or null value.
+        """
+
+        keys = _keys
+        mask = bytearray(len(chunk))
+        size = len(keys)
+
+        for index, value in enumerate(chunk):
+            if value is not None:
+                position = bisect_left(keys, value)
+                mask[index] = position < size and keys[position] == value
+
+        return bytes(mask)
@@ -0,0 +1,351 @@
+"""This module allows the user to create a persistent (immutable) AVL tree,
+where every update returns a new version of the tree."""
+from __future__ import annotations
+
+from typing import Iterable, List, Optional, Tuple
+
+from src.tree.avl_tree import AVLTree
+from src.tree.node import Node
+from src.tree.batch_result import BatchResult
+
+from src.console.message import Message
+
+
+class PersistentAVLTree(AVLTree):
+    """A persistent AVL tree is never modified in place. Instead, add and
+    remove return a new tree, which shares every untouched node with the old
+    one. Only the nodes on the search path (and at most two more per rotation)
+    are copied, so an update creates O(log n) new nodes and every old version
+    remains valid and cheap to keep, e.g. to hand out point-in-time views or to
+    roll back. The queries are inherited from AVLTree.
+
+    A new version replaces the one it was derived from, so it takes over the
+    instrumentation and journal attached to it, if any. Older versions are no
+    longer instrumented or journaled.
+    """
+
+    @classmethod
+    def recover(
+        cls,
+        directory: str,
+        typecode: str = "q",
+        sync_bytes: int = 1 << 16,
+        sync_interval: float = 0.05,
+        compact_bytes: int = 1 << 26,
+    ) -> PersistentAVLTree:
+        """Persistent trees cannot be recovered, since their split, join and
+        set operations keep their operands, which a journal cannot express. A
+        journal attached to an AVLTree is still taken over by the versions of a
+        ConcurrentAVLTree sharing it.
+
+        Args:
+            directory (str): The directory holding the snapshots and journals.
+            typecode (str, optional): The typecode of the values.
+            sync_bytes (int, optional): The size of the buffered records which triggers a sync.
+            sync_interval (float, optional): The longest time, in seconds, records remain
+            buffered.
+            compact_bytes (int, optional): The size of the journal which triggers a compaction.
+
+        Raises:
+            TypeError: Always.
+        """
+
+        raise TypeError("a persistent tree cannot be recovered, recover an AVLTree instead")
+
+    def add(self, value: int) -> PersistentAVLTree:
+        """Get a new version of the tree with the queried value added. If the
+        value is null or already exists, the operation is rejected according
+        to the error policy and the tree itself is returned.
+
+        Args:
+            value (int): The value to be added.
+
+        Returns:
+            PersistentAVLTree: The new version of the tree.
+        """
+
+        if value is None:
+            self._reject(Message.NULL_VALUE_EXCEPTION, value)
+            return self
+
+        tree = self.__derive()
+        path, node = self.__copy_path(tree, value)
+
+        if node:
+            self._reject(Message.COMMON_VALUE_EXCEPTION, value)
+            return self
+
+        self.__publish(tree)
+        leaf = Node(value)
+
+        if not path:
+            tree.root = leaf
+        elif value < path[-1].value:
+            path[-1].left = leaf
+        else:
+            path[-1].right = leaf
+
+        tree._retrace(path, 1)
+
+        return tree
+
+    def remove(self, value: int) -> PersistentAVLTree:
+        """Get a new version of the tree with the queried value removed. If the
+        value is null or does not exist, the operation is rejected according to
+        the error policy and the tree itself is returned. The removal mirrors
+        AVLTree's, except that every node which would be modified is copied
+        first.
+
+        Args:
+            value (int): The value to be removed.
+
+        Returns:
+            PersistentAVLTree: The new version of the tree.
+        """
+
+        if value is None:
+            self._reject(Message.NULL_VALUE_EXCEPTION, value)
+            return self
+
+        tree = self.__derive()
+        path, node = self.__copy_path(tree, value)
+
+        if not node:
+            self._reject(Message.VOID_VALUE_EXCEPTION, value)
+            return self
+
+        self.__publish(tree)
+
+        if not (node.left and node.right):
+            tree._replace(path[-1] if path else None, node, node.left or node.right)
+            tree._retrace(path, -1)
+
+            return tree
+
+        # The removed node is copied as a placeholder, so the path to the successor can be
+        # copied below it, and is then replaced by a copy of the successor
+        index = len(path)
+        placeholder = self.__copy(node)
+        tree._replace(path[-1] if path else None, node, placeholder)
+        path.append(placeholder)
+
+        if node.left.height > node.right.height:
+            successor = node.left
+
+            while successor.right:
+                copy = self.__copy(successor)
+                tree._replace(path[-1], successor, copy)
+                path.append(copy)
+                successor = successor.right
+        else:
+            successor = node.right
+
+            while successor.left:
+                copy = self.__copy(successor)
+                tree._replace(path[-1], successor, copy)
+                path.append(copy)
+                successor = successor.left
+
+        tree._replace(path[-1], successor, successor.left or successor.right)
+
+        replacement = self.__copy(successor)
+        replacement.left = placeholder.left
+        replacement.right = placeholder.right
+        replacement.height = placeholder.height
+        replacement.balance_factor = placeholder.balance_factor
+        replacement.size = placeholder.size
+
+        tree._replace(path[index - 1] if index else None, placeholder, replacement)
+        path[index] = replacement
+
+        tree._retrace(path, -1)
+
+        return tree
+
+    def extend(self, iterable: Iterable[int]) -> PersistentAVLTree:
+        """Get a new version of the tree with every value of a batch added.
+        Values which already exist are skipped silently.
+
+        Args:
+            iterable (Iterable[int]): The values to be added, in any order.
+
+        Returns:
+            PersistentAVLTree: The new version of the tree.
+        """
+
+        tree = self
+
+        for value in sorted(set(iterable)):
+            if not tree.contains(value):
+                tree = tree.add(value)
+
+        return tree
+
+    def add_many(self, values: Iterable[int]) -> BatchResult:
+        """Persistent trees cannot be modified in place, use extend instead.
+
+        Args:
+            values (Iterable[int]): The values to be added.
+
+        Raises:
+            TypeError: Always.
+        """
+
+        raise TypeError("a persistent tree cannot be modified in place, use extend instead")
+
+    def remove_many(self, values: Iterable[int]) -> BatchResult:
+        """Persistent trees cannot be modified in place, use remove instead.
+
+        Args:
+            values (Iterable[int]): The values to be removed.
+
+        Raises:
+            TypeError: Always.
+        """
+
+        raise TypeError("a persistent tree cannot be modified in place, use remove instead")
+
+    def pop_min(self) -> int:
+        """Persistent trees cannot be modified in place, use remove(tree.min())
+        instead.
+
+        Raises:
+            TypeError: Always.
+        """
+
+        raise TypeError("a persistent tree cannot be modified in place, use remove instead")
+
+    def pop_max(self) -> int:
+        """Persistent trees cannot be modified in place, use remove(tree.max())
+        instead.
+
+        Raises:
+            TypeError: Always.
+        """
+
+        raise TypeError("a persistent tree cannot be modified in place, use remove instead")
+
+    def balance(self, node: Node) -> Node:
+        """Rebalances the subtree using AVLTree's rotations. The node itself is
+        always a fresh copy, but the rotations also modify its heavy child (and,
+        for a double rotation, that child's inner child), which may still be
+        shared with other versions, so those are copied first.
+
+        Args:
+            node (Node): The node to be balanced.
+
+        Returns:
+            Node: The new root node.
+        """
+
+        if node.balance_factor == -2:
+            node.left = self.__copy(node.left)
+
+            if node.left.balance_factor > 0:
+                node.left.right = self.__copy(node.left.right)
+        elif node.balance_factor == 2:
+            node.right = self.__copy(node.right)
+
+            if node.right.balance_factor < 0:
+                node.right.left = self.__copy(node.right.left)
+
+        return super().balance(node)
+
+    def _consume(self) -> Optional[Node]:
+        """Get the nodes of the tree for a split, join or set operation. Since
+        those operations never modify the nodes of a persistent tree, the tree
+        keeps them, so every operand remains a valid version.
+
+        Returns:
+            Optional[Node]: The root of the binary tree.
+        """
+
+        return self.root
+
+    def _link(self, node: Node, left: Optional[Node], right: Optional[Node]) -> Node:
+        """Link a copy of the node to the left and right subtrees, so the split,
+        join and set operations share every untouched subtree with their
+        operands.
+
+        Args:
+            node (Node): The node.
+            left (Optional[Node]): The new left subtree.
+            right (Optional[Node]): The new right subtree.
+
+        Returns:
+            Node: The updated copy of the node.
+        """
+
+        return super()._link(Node(node.value), left, right)
+
+    def __derive(self) -> PersistentAVLTree:
+        """Create a new version of the tree which, for now, shares all of its
+        nodes with this version.
+
+        Returns:
+            PersistentAVLTree: The new version of the tree.
+        """
+
+        tree = type(self)(self.error_policy)
+        tree.root = self.root
+        tree.rejections = self.rejections
+
+        return tree
+
+    def __publish(self, tree: PersistentAVLTree) -> None:
+        """Hand the instrumentation and journal of this version over to the new
+        version which replaces it, before it is rebalanced.
+
+        Args:
+            tree (PersistentAVLTree): The new version of the tree.
+        """
+
+        if self.instrumentation:
+            self.instrumentation.move(tree)
+
+        if self.journal:
+            self.journal.move(tree)
+
+    def __copy_path(self, tree: PersistentAVLTree, value: int) -> Tuple[List[Node], Optional[Node]]:
+        """Search for the queried value, copying every node on the way down
+        into the new version of the tree.
+
+        Args:
+            tree (PersistentAVLTree): The new version of the tree.
+            value (int): The value queried.
+
+        Returns:
+            Tuple[List[Node], Optional[Node]]: The copied nodes on the search path, from the
+            root, and the (uncopied) node holding the value, or None if it does not exist.
+        """
+
+        path = []
+        parent = None
+        node = self.root
+
+        while node and node.value != value:
+            copy = self.__copy(node)
+            tree._replace(parent, node, copy)
+            path.append(copy)
+
+            parent = copy
+            node = node.left if value < node.value else node.right
+
+        return path, node
+
+    def __copy(self, node: Node) -> Node:
+        """Copy a node, so that it can be modified without affecting the
+        versions which share the original.
+
+        Args:
+            node (Node): The node to be copied.
+
+        Returns:
+            Node: The copy of the node.
+        """
+
+        copy = Node(node.value, node.height, node.left, node.right)
+        copy.balance_factor = node.balance_factor
+        copy.size = node.size
+
+        return copy
@@ -0,0 +1,93 @@
+"""This module provides a reader-writer lock, which allows many threads to
+read a shared structure at the same time while writers get exclusive access."""
+from __future__ import annotations
+
+import threading
+
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class ReadWriteLock(object):
+    """A reader-writer lock allows any number of concurrent readers or a single
+    writer. Writers are preferred: once a writer is waiting, new readers wait
+    until it is done, so a steady stream of readers cannot starve the writers.
+    The lock is not reentrant.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the reader-writer lock."""
+
+        self.__condition = threading.Condition(threading.Lock())
+        self.__readers = 0
+        self.__writing = False
+        self.__waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        """Acquire the lock for reading, waiting while a writer holds or is
+        waiting for the lock."""
+
+        with self.__condition:
+            while self.__writing or self.__waiting_writers:
+                self.__condition.wait()
+
+            self.__readers += 1
+
+    def release_read(self) -> None:
+        """Release the lock after reading."""
+
+        with self.__condition:
+            self.__readers -= 1
+
+            if not self.__readers:
+                self.__condition.notify_all()
+
+    def acquire_write(self) -> None:
+        """Acquire the lock for writing, waiting until there are no readers
+        and no other writer."""
+
+        with self.__condition:
+            self.__waiting_writers += 1
+
+            while self.__writing or self.__readers:
+                self.__condition.wait()
+
+            self.__waiting_writers -= 1
+            self.__writing = True
+
+    def release_write(self) -> None:
+        """Release the lock after writing."""
+
+        with self.__condition:
+            self.__writing = False
+            self.__condition.notify_all()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """Hold the lock for reading for the duration of a with block.
+
+        Yields:
+            None: Nothing is yielded.
+        """
+
+        self.acquire_read()
+
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """Hold the lock for writing for the duration of a with block.
+
+        Yields:
+            None: Nothing is yielded.
+        """
+
+        self.acquire_write()
+
+        try:
+            yield
+        finally:
+            self.release_write()
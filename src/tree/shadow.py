@@ -0,0 +1,65 @@
+"""This module allows the user to shadow the methods of a single tree instance
+with wrappers, which can be stacked and removed in any order."""
+from __future__ import annotations
+
+from typing import Any, Callable
+
+
+class Shadow(object):
+    """A shadow replaces a method of a single tree instance with a wrapper,
+    leaving the class and every other tree untouched. Instrumentation and
+    Journal both shadow methods this way, so their wrappers may be stacked on
+    the same method, and either may be detached first. A wrapper calls the
+    method it wraps through its own __wrapped__ attribute: removing the top
+    wrapper restores the method below it, while removing a wrapper further
+    down relinks the wrapper above it to the method below, so no other
+    wrapper is lost or brought back.
+    """
+
+    @staticmethod
+    def attach(tree: Any, name: str, wrapper: Callable) -> None:
+        """Shadow a method of the tree with a wrapper.
+
+        Args:
+            tree (AVLTree): The tree.
+            name (str): The name of the method.
+            wrapper (Callable): The wrapper, which calls the method through its __wrapped__
+            attribute.
+        """
+
+        wrapper.__wrapped__ = getattr(tree, name)
+        wrapper.shadows = name in tree.__dict__
+
+        setattr(tree, name, wrapper)
+
+    @staticmethod
+    def detach(tree: Any, name: str, wrapper: Callable) -> None:
+        """Remove a wrapper from a method of the tree, wherever it is in the
+        stack of wrappers. Does nothing if the wrapper was already removed.
+
+        Args:
+            tree (AVLTree): The tree.
+            name (str): The name of the method.
+            wrapper (Callable): The wrapper.
+        """
+
+        current = tree.__dict__.get(name)
+
+        if current is wrapper:
+            if wrapper.shadows:
+                setattr(tree, name, wrapper.__wrapped__)
+            else:
+                del tree.__dict__[name]
+
+            return None
+
+        while current is not None:
+            inner = getattr(current, "__wrapped__", None)
+
+            if inner is wrapper:
+                current.__wrapped__ = wrapper.__wrapped__
+                current.shadows = wrapper.shadows
+
+                return None
+
+            current = inner